@@ -0,0 +1,175 @@
+"""ローカル API（serve_api.py）のスループットとレイテンシを測る。
+
+    python scripts/bench_api.py [--concurrency 8] [--duration 10] [--raw-dir ...]
+    python scripts/bench_api.py --url http://127.0.0.1:8000   # 起動済みのサーバーに
+
+--url を省略すると serve_api.py を別プロセスで起動する。circuits.csv の全サーキットの
+driver / constructor / trend について、データのあるものはフィルターなし・session・
+年範囲の URL を作り、--concurrency 本のスレッドが keep-alive の接続で
+ランダムに取得し続ける。
+--revalidate の割合のリクエストは、前回の ETag を If-None-Match に付ける（304 になる）。
+
+測定の前に、フィルターなしのレスポンスが --out-dir の静的 JSON と
+同じレコードかを確認する（静的ファイルがあるサーキットだけ）。
+"""
+import argparse
+import http.client
+import json
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import pandas as pd
+
+from laptrend.load import CONSTRUCTOR_DIR, OUT_DIR, RAW_DIR, TREND_DIR
+
+SERVER = Path(__file__).with_name("serve_api.py")
+
+
+def start_server(args) -> tuple[subprocess.Popen, str]:
+    cmd = [
+        sys.executable, str(SERVER), "--port", "0", "--quiet",
+        "--raw-dir", str(args.raw_dir), "--cache-size", str(args.cache_size),
+    ]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    for line in proc.stdout:
+        if line.startswith("Serving"):
+            print(line.strip())
+            url = line.split(" on ", 1)[1].split("/data/", 1)[0]
+            return proc, url
+    proc.wait()
+    raise RuntimeError("serve_api.py の起動に失敗しました")
+
+
+def make_paths(base: str, circuits: list[str]) -> list[str]:
+    """データのあるサーキット・種類ごとに、フィルターなし / ありの URL を作る。"""
+    variants = {
+        "/data/{}_driver_laps.json": ["", "?session=Q", "?session=R&from=2010"],
+        "/data/constructors/{}.json": ["", "?session=Q&from=2000&to=2020"],
+        "/data/{}_lap_times.json": ["", "?from=2010"],
+    }
+    u = urlsplit(base)
+    conn = http.client.HTTPConnection(u.hostname, u.port)
+    paths = []
+    for c in circuits:
+        for template, queries in variants.items():
+            conn.request("HEAD", template.format(c))
+            res = conn.getresponse()
+            res.read()
+            if res.status == 200:
+                paths += [template.format(c) + q for q in queries]
+    conn.close()
+    return paths
+
+
+def verify(base: str, circuits: list[str], args) -> int:
+    """フィルターなしのレスポンスと静的ファイルを比べ、食い違いの数を返す。"""
+    u = urlsplit(base)
+    conn = http.client.HTTPConnection(u.hostname, u.port)
+    errors = checked = 0
+    for c in circuits:
+        for path, static in [
+            (f"/data/{c}_driver_laps.json", args.out_dir / f"{c}_driver_laps.json"),
+            (f"/data/constructors/{c}.json", args.constructor_dir / f"{c}.json"),
+            (f"/data/{c}_lap_times.json", args.trend_dir / f"{c}_lap_times.json"),
+        ]:
+            if not static.exists():
+                continue
+            conn.request("GET", path)
+            res = conn.getresponse()
+            body = res.read()
+            checked += 1
+            if res.status != 200 or json.loads(body) != json.loads(static.read_bytes()):
+                errors += 1
+                print(f"[NG] {path}: 静的ファイル {static} と一致しません（status {res.status}）")
+    conn.close()
+    print(f"verified {checked} responses against static files, {errors} mismatches")
+    return errors
+
+
+def worker(base, paths, args, seed, deadline, latencies, statuses, sizes):
+    rng = random.Random(seed)
+    u = urlsplit(base)
+    conn = http.client.HTTPConnection(u.hostname, u.port)
+    etags = {}
+    while time.perf_counter() < deadline:
+        path = rng.choice(paths)
+        headers = {}
+        if path in etags and rng.random() < args.revalidate:
+            headers["If-None-Match"] = etags[path]
+        start = time.perf_counter()
+        conn.request("GET", path, headers=headers)
+        res = conn.getresponse()
+        body = res.read()
+        latencies.append(time.perf_counter() - start)
+        statuses[res.status] += 1
+        sizes.append(len(body))
+        if res.getheader("ETag"):
+            etags[path] = res.getheader("ETag")
+    conn.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="起動済みサーバーの URL（省略時は起動する）")
+    parser.add_argument("--raw-dir", type=Path, default=RAW_DIR)
+    parser.add_argument("--out-dir", type=Path, default=OUT_DIR)
+    parser.add_argument("--constructor-dir", type=Path, default=CONSTRUCTOR_DIR)
+    parser.add_argument("--trend-dir", type=Path, default=TREND_DIR)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="秒")
+    parser.add_argument("--revalidate", type=float, default=0.3, help="If-None-Match を付ける割合")
+    parser.add_argument("--cache-size", type=int, default=1024)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    circuits = sorted(
+        pd.read_csv(args.raw_dir / "circuits.csv", usecols=["circuitRef"])["circuitRef"]
+    )
+    proc = None
+    base = args.url
+    if base is None:
+        proc, base = start_server(args)
+    try:
+        errors = verify(base, circuits, args)
+        paths = make_paths(base, circuits)
+
+        latencies, sizes = [], []
+        statuses = Counter()
+        deadline = time.perf_counter() + args.duration
+        threads = [
+            threading.Thread(
+                target=worker,
+                args=(base, paths, args, args.seed + i, deadline, latencies, statuses, sizes),
+            )
+            for i in range(args.concurrency)
+        ]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    ms = sorted(x * 1000 for x in latencies)
+    n = len(ms)
+    pct = lambda p: ms[min(n - 1, int(p * n))] if n else float("nan")
+    print(f"urls            : {len(paths)} (from {len(circuits)} circuits)")
+    print(f"requests        : {n} in {elapsed:.1f} s with {args.concurrency} connections")
+    print(f"throughput      : {n / elapsed:8.0f} req/s, {sum(sizes) / elapsed / 1e6:.1f} MB/s")
+    print(f"latency (ms)    : p50 {pct(0.5):.2f}  p95 {pct(0.95):.2f}  p99 {pct(0.99):.2f}  max {ms[-1] if n else 0:.2f}")
+    print(f"status          : {dict(sorted(statuses.items()))}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
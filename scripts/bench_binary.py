@@ -0,0 +1,65 @@
+"""バイナリ形式（--binary）と JSON の読み込み時間を、大きいサーキットで比べる。
+
+driver_laps / constructors の .json が大きい順に --top 件を選び、ファイル 1 つごとに
+  - json.loads（ページが fetch().json() でしていること）
+  - decode_laps()（np.frombuffer で列を取り出すだけ。型付き配列と同じくコピーなし）
+  - decode_laps() + to_records()（JSON と同じレコードの配列まで戻す場合）
+の最良時間を表示する。先に python scripts/build.py --binary で書き出しておく。
+
+    python scripts/bench_binary.py [--top 5] [--repeat 20]
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+from check_binary import binary_pairs
+from laptrend.binlaps import decode_laps, to_records
+from laptrend.load import BINARY_DIR, OUT_DIR
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out-dir", type=Path, default=OUT_DIR)
+    parser.add_argument("--binary-dir", type=Path, default=BINARY_DIR)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    pairs = binary_pairs(args.out_dir, args.binary_dir)
+    if not pairs:
+        raise SystemExit(f"{args.binary_dir} に .bin がありません（build.py --binary で書き出す）")
+    pairs.sort(key=lambda p: p[1].stat().st_size, reverse=True)
+
+    print(
+        f"{'file':<40} {'records':>7} {'json KB':>8} {'bin KB':>7}"
+        f" {'json.loads':>11} {'frombuffer':>11} {'+records':>9} {'speedup':>8}"
+    )
+    for binary_path, json_path in pairs[: args.top]:
+        text = json_path.read_bytes()
+        data = binary_path.read_bytes()
+        n = len(json.loads(text))
+
+        t_json = best_of(lambda: json.loads(text), args.repeat)
+        t_bin = best_of(lambda: decode_laps(data), args.repeat)
+        t_records = best_of(lambda: to_records(decode_laps(data)), args.repeat)
+
+        name = str(json_path.relative_to(args.out_dir))
+        print(
+            f"{name:<40} {n:7d} {len(text) / 1024:8.1f} {len(data) / 1024:7.1f}"
+            f" {t_json * 1000:8.3f} ms {t_bin * 1000:8.3f} ms {t_records * 1000:6.3f} ms"
+            f" {t_json / t_bin:7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
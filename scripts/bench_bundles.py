@@ -0,0 +1,141 @@
+"""サーキット切り替え 1 回分の「3 ファイル取得」と「bundle 1 ファイル取得」を比べる。
+
+  - サイズ: 3 ファイル合計と bundles/{circuit}.json（素 / gzip）
+  - レイテンシ: ローカルの HTTP サーバーから取得して json.loads するまでの時間。
+    1 リクエストごとに --rtt-ms の待ちを入れて、ネットワークの往復を模擬する
+    （ページは 3 つの useEffect から取得するので、3 ファイルは並列と逐次の両方を測る）。
+あわせて bundle の中身が 3 ファイルと同じレコードかを確認する。
+
+    python scripts/bench_bundles.py [--rtt-ms 50] [--circuits monza spa ...]
+"""
+import argparse
+import gzip
+import json
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from laptrend.load import BUNDLE_DIR, CONSTRUCTOR_DIR, OUT_DIR, TREND_DIR
+
+
+class DelayedHandler(SimpleHTTPRequestHandler):
+    rtt = 0.0
+
+    def do_GET(self):
+        time.sleep(self.rtt)
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+def fetch_json(url: str):
+    with urllib.request.urlopen(url) as res:
+        return json.loads(res.read())
+
+
+def stage_files(root: Path, circuit: str, args) -> dict[str, Path]:
+    """ページの URL と同じ配置で root にコピーし、{種類: コピー先} を返す。"""
+    sources = {
+        "trend": (args.trend_dir / f"{circuit}_lap_times.json", f"data/{circuit}_lap_times.json"),
+        "driverLaps": (args.out_dir / f"{circuit}_driver_laps.json", f"data/{circuit}_driver_laps.json"),
+        "constructorLaps": (args.constructor_dir / f"{circuit}.json", f"data/constructors/{circuit}.json"),
+        "bundle": (args.bundle_dir / f"{circuit}.json", f"data/bundles/{circuit}.json"),
+    }
+    staged = {}
+    for kind, (src, rel) in sources.items():
+        if not src.exists():
+            continue
+        dst = root / rel
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(src, dst)
+        staged[kind] = dst
+    return staged
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out-dir", type=Path, default=OUT_DIR)
+    parser.add_argument("--constructor-dir", type=Path, default=CONSTRUCTOR_DIR)
+    parser.add_argument("--trend-dir", type=Path, default=TREND_DIR)
+    parser.add_argument("--bundle-dir", type=Path, default=BUNDLE_DIR)
+    parser.add_argument("--circuits", nargs="+")
+    parser.add_argument("--rtt-ms", type=float, default=50.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    circuits = args.circuits or sorted(p.stem for p in args.bundle_dir.glob("*.json"))
+    if not circuits:
+        print(f"no bundles in {args.bundle_dir} (run scripts/build.py first)")
+        return 1
+
+    DelayedHandler.rtt = args.rtt_ms / 1000
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), partial(DelayedHandler, directory=str(root))
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}/"
+
+        totals = {"files_raw": 0, "files_gz": 0, "bundle_raw": 0, "bundle_gz": 0}
+        t_files = t_seq = t_bundle = 0.0
+        errors = 0
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            for circuit in circuits:
+                staged = stage_files(root, circuit, args)
+                bundle_path = staged.pop("bundle")
+                urls = {k: base + p.relative_to(root).as_posix() for k, p in staged.items()}
+                bundle_url = base + bundle_path.relative_to(root).as_posix()
+
+                # 中身の確認（無いファイルは空の配列扱い）
+                bundle = fetch_json(bundle_url)
+                for kind in ("trend", "driverLaps", "constructorLaps"):
+                    expected = fetch_json(urls[kind]) if kind in urls else []
+                    if bundle[kind] != expected:
+                        errors += 1
+                        print(f"[NG] {circuit}: {kind} が個別ファイルと一致しません")
+
+                for p in staged.values():
+                    data = p.read_bytes()
+                    totals["files_raw"] += len(data)
+                    totals["files_gz"] += len(gzip.compress(data, mtime=0))
+                data = bundle_path.read_bytes()
+                totals["bundle_raw"] += len(data)
+                totals["bundle_gz"] += len(gzip.compress(data, mtime=0))
+
+                t_files += best_of(lambda: list(pool.map(fetch_json, urls.values())), args.repeat)
+                t_seq += best_of(lambda: [fetch_json(u) for u in urls.values()], args.repeat)
+                t_bundle += best_of(lambda: fetch_json(bundle_url), args.repeat)
+
+        server.shutdown()
+
+    n = len(circuits)
+    print(f"circuits        : {n} (rtt {args.rtt_ms:.0f} ms per request)")
+    print(f"3 files         : {totals['files_raw']:10d} bytes, {totals['files_gz']:9d} gzip, "
+          f"{t_files / n * 1000:7.1f} ms/switch (parallel), "
+          f"{t_seq / n * 1000:.1f} ms (sequential)")
+    print(f"bundle          : {totals['bundle_raw']:10d} bytes, {totals['bundle_gz']:9d} gzip, "
+          f"{t_bundle / n * 1000:7.1f} ms/switch")
+    print(f"mismatches      : {errors}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
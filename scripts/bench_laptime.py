@@ -0,0 +1,75 @@
+"""ラップタイム変換のマイクロベンチマーク。
+
+qualifying.csv の q1 / q2 / q3 全セルについて、
+以前の行ごとの .apply(time_str_to_seconds) と parse_lap_times() を比べる。
+
+    python scripts/bench_laptime.py [--repeat 5]
+"""
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from laptrend.laptime import parse_lap_times
+from laptrend.load import RAW_DIR
+
+
+# 以前のドライバー別スクリプトの行ごと変換（比較用）
+def time_str_to_seconds(t):
+    if pd.isna(t):
+        return None
+    s = str(t)
+    if ":" not in s:
+        try:
+            return float(s)
+        except ValueError:
+            return None
+    try:
+        m, rest = s.split(":")
+        return int(m) * 60 + float(rest)
+    except Exception:
+        return None
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--raw-dir", type=Path, default=RAW_DIR)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    qualifying = pd.read_csv(args.raw_dir / "qualifying.csv")
+    cols = [qualifying[c] for c in ["q1", "q2", "q3"]]
+    n_cells = sum(len(c) for c in cols)
+
+    def rowwise():
+        return [c.apply(time_str_to_seconds).astype("float64") for c in cols]
+
+    def vectorized():
+        return [parse_lap_times(c) for c in cols]
+
+    # 結果が一致することを先に確認
+    for old, new in zip(rowwise(), vectorized()):
+        np.testing.assert_array_equal(old.to_numpy(), new.to_numpy())
+
+    t_old = best_of(rowwise, args.repeat)
+    t_new = best_of(vectorized, args.repeat)
+
+    print(f"cells      : {n_cells}")
+    print(f"row-wise   : {t_old * 1000:8.2f} ms")
+    print(f"vectorized : {t_new * 1000:8.2f} ms")
+    print(f"speedup    : {t_old / t_new:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
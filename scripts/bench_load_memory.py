@@ -0,0 +1,61 @@
+"""読み込み時の列絞り込み・dtype 指定によるメモリ削減を比べる。
+
+全列をデフォルト dtype で読む場合（full）と、SCHEMAS の列だけを
+コンパクトな dtype で読む場合（lean）について、CSV 読み込みから
+共通フレーム（lap_times の結合を含む）を作るまでのピーク RSS を測る。
+モードごとに別プロセスで実行するので、互いのピークは混ざらない。
+
+    python scripts/bench_load_memory.py [--raw-dir DIR]
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from laptrend.frames import build_frames
+from laptrend.load import RAW_DIR, TABLES, load_tables
+from laptrend.profiling import peak_rss_mb
+
+MODES = ("full", "lean")
+
+
+def measure(raw_dir: Path, mode: str) -> dict:
+    tables = load_tables(raw_dir, TABLES, cache_root=None, lean=mode == "lean")
+    table_mb = sum(df.memory_usage(deep=True).sum() for df in tables.values()) / 2**20
+    build_frames(tables)
+    return {"mode": mode, "tables_mb": table_mb, "peak_rss_mb": peak_rss_mb()}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--raw-dir", type=Path, default=RAW_DIR)
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        result = measure(args.raw_dir, args.child)
+        print("RESULT " + json.dumps(result))
+        return
+
+    results = {}
+    for mode in MODES:
+        out = subprocess.run(
+            [sys.executable, __file__, "--raw-dir", str(args.raw_dir), "--child", mode],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        line = next(s for s in out.splitlines() if s.startswith("RESULT "))
+        results[mode] = json.loads(line[len("RESULT "):])
+
+    print(f"{'mode':<6} {'tables (MB)':>12} {'peak RSS (MB)':>14}")
+    for mode in MODES:
+        r = results[mode]
+        print(f"{mode:<6} {r['tables_mb']:12.1f} {r['peak_rss_mb']:14.1f}")
+    full, lean = results["full"], results["lean"]
+    print(f"peak RSS reduction: {1 - lean['peak_rss_mb'] / full['peak_rss_mb']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
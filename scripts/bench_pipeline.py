@@ -0,0 +1,182 @@
+"""合成データでパイプライン全体のステージ別時間とピークメモリを測る。
+
+    python scripts/bench_pipeline.py [--scales 1 10 100] [--output results.json]
+
+スケールごとに make_synthetic_kaggle.py で f1-kaggle 相当の CSV を作り
+（--work-dir にキャッシュして使い回す）、別プロセスで load_tables()・
+build_frames()・集計・書き出しを 1 回ずつ実行し、build.py --profile と同じ
+計測（laptrend/profiling.py）の記録を次のステージに分けて集計する。
+
+    load    : load_tables()（キャッシュなし、CSV をパース）
+    parse   : build_frames() 内の parse_lap_times()（q1〜q3、fastestLapTime など）
+    merge   : build_frames() の残り（races / drivers / constructors / results との結合）
+    groupby : lap_times の最小値（lap_minima）と driver / constructor / pole・fastest の集計
+    emit    : trend / driver / constructor / chart / bundle の JSON 書き出し
+
+ステージごとの経過時間と、そのステージ終了時点のピーク RSS（ru_maxrss）を
+JSON に書く（"profile" に計測の記録そのものも残す）。git のコミットも記録するので、
+コミット間で diff して比べられる。
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from laptrend import aggregate, emit, profiling
+from laptrend.frames import build_frames
+from laptrend.load import CACHE_DIR, ROOT, TABLES, load_tables
+from make_synthetic_kaggle import generate
+
+STAGES = ("load", "parse", "merge", "groupby", "emit")
+
+# 合成データの作り方を変えたら上げる（--work-dir のデータを作り直す）
+DATASET_VERSION = 1
+
+
+def stage_summary(records: list[profiling.StageRecord]) -> tuple[dict, dict]:
+    """計測の記録を STAGES ごとの (秒, 終了時点のピーク RSS) にまとめる。"""
+    by_name = {r.name: r for r in records}
+    parse = [r for r in records if r.name.startswith("frames/") and r.name.endswith("/parse")]
+    minima = by_name.get("frames/lap_minima")
+    minima_seconds = minima.seconds if minima else 0.0
+    parse_seconds = sum(r.seconds for r in parse)
+
+    seconds = {
+        "load": by_name["load"].seconds,
+        "parse": parse_seconds,
+        "merge": by_name["frames"].seconds - parse_seconds - minima_seconds,
+        "groupby": minima_seconds + by_name["aggregate"].seconds,
+        "emit": by_name["emit"].seconds,
+    }
+    peaks = {
+        "load": by_name["load"].peak_rss_mb,
+        "parse": max((r.peak_rss_mb for r in parse), default=by_name["load"].peak_rss_mb),
+        "merge": by_name["frames"].peak_rss_mb,
+        "groupby": by_name["aggregate"].peak_rss_mb,
+        "emit": by_name["emit"].peak_rss_mb,
+    }
+    return seconds, peaks
+
+
+def run_stages(raw_dir: Path) -> dict:
+    """raw_dir の CSV でパイプラインを 1 回実行し、ステージ別の時間とピーク RSS を返す。"""
+    profiler = profiling.enable()
+    try:
+        with profiling.stage("load"):
+            tables = load_tables(raw_dir, TABLES, cache_root=None)
+        with profiling.stage("frames"):
+            frames = build_frames(tables)
+        with profiling.stage("aggregate"):
+            driver_agg = aggregate.driver_laps(frames)
+            constructor_agg = aggregate.constructor_laps(frames)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            out = Path(tmp)
+            with profiling.stage("emit"):
+                emit.emit_circuit_trends(frames, out / "trend")
+                emit.emit_driver_laps(driver_agg, out)
+                emit.emit_constructor_laps(constructor_agg, out / "constructors")
+                emit.emit_charts(driver_agg, constructor_agg, frames, out / "charts")
+                emit.emit_bundles(driver_agg, constructor_agg, frames, out / "bundles")
+    finally:
+        profiling.disable()
+
+    seconds, peaks = stage_summary(profiler.records)
+    report = profiler.report()
+    return {
+        "rows": {name: len(df) for name, df in tables.items()},
+        "seconds": seconds,
+        "total_seconds": sum(seconds.values()),
+        "peak_rss_mb_after": peaks,
+        "peak_rss_mb": report["peak_rss_mb"],
+        "profile": report["stages"],
+    }
+
+
+def dataset_dir(work_dir: Path, scale: float, seed: int) -> Path:
+    """scale の合成データを用意して、そのディレクトリを返す。"""
+    raw_dir = work_dir / f"f1-kaggle-x{scale:g}-seed{seed}-v{DATASET_VERSION}"
+    done = raw_dir / ".complete"
+    if not done.exists():
+        print(f"generating synthetic dataset x{scale:g} -> {raw_dir}")
+        generate(raw_dir, scale, seed)
+        done.write_text("ok", encoding="utf-8")
+    return raw_dir
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=ROOT,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=float, nargs="+", default=[1.0])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", type=Path, default=CACHE_DIR.parent / "bench")
+    parser.add_argument("--output", type=Path, help="結果の JSON（省略時は work-dir/results-<commit>.json）")
+    parser.add_argument("--child", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        # 標準出力はパイプラインのログなので、結果は最後の 1 行に出す
+        print("RESULT " + json.dumps(run_stages(args.child)))
+        return 0
+
+    commit = git_commit()
+    results = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "dataset_version": DATASET_VERSION,
+        "scales": {},
+    }
+
+    for scale in args.scales:
+        raw_dir = dataset_dir(args.work_dir, scale, args.seed)
+        out = subprocess.run(
+            [sys.executable, __file__, "--child", str(raw_dir)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        line = next(s for s in reversed(out.splitlines()) if s.startswith("RESULT "))
+        result = json.loads(line[len("RESULT "):])
+        results["scales"][f"{scale:g}"] = result
+
+        print(f"\nscale x{scale:g}: lap_times {result['rows']['lap_times']} rows")
+        for name in STAGES:
+            print(
+                f"  {name:<8} {result['seconds'][name]:8.2f} s"
+                f"   peak RSS {result['peak_rss_mb_after'][name]:8.1f} MB"
+            )
+        print(f"  {'total':<8} {result['total_seconds']:8.2f} s")
+
+    output = args.output or args.work_dir / f"results-{(commit or 'nogit')[:10]}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    print(f"\nwrote {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,455 @@
+"""Kaggle CSV から F1LapTrend 用 JSON をまとめて生成するエントリポイント。
+
+CSV の読み込みと結合は 1 回だけ行い、その共通フレームから
+  - f1-laptrend-data/circuit_json/{circuit}_lap_times.json（年別 pole / fastest）
+  - public/data/{circuit}_driver_laps.json（ドライバー別ベスト）
+  - public/data/constructors/{circuit}.json（コンストラクター別ベスト）
+  - public/data/charts/{circuit}.json（ページ用の横持ちデータ、gap 計算済み）
+  - public/data/bundles/{circuit}.json（上の 3 種類を 1 サーキット 1 ファイルに）
+  - public/data/careers/{drivers,constructors}/*.json（全サーキット横断のドライバー別・チーム別）
+  - public/data/pace/{circuit}.json（決勝の周回タイムの p10 / median / p90）
+  - public/data/trends.json（全サーキット・ドライバー・チームの推移の直線当てはめ）
+を書き出す。集計は laptrend/specs.py の spec として宣言し、必要な spec を
+まとめて計画して（同じ表・列の spec は 1 回の走査で）実行してから書き出す。
+--spec で渡した JSON の spec も同じ計画に入り、output のパスに書き出される。
+
+    python scripts/build.py                      # 全部
+    python scripts/build.py --only driver        # ドライバー別だけ
+    python scripts/build.py --profile            # ステージ別の時間・行数・メモリ
+    python scripts/build.py --spec views.json    # 追加の集計（spec）も書き出す
+"""
+import argparse
+from pathlib import Path
+
+from laptrend import aggregate, emit, profiling, specs
+from laptrend.artifacts import MANIFEST_NAME, ArtifactManifest
+from laptrend.frames import build_frames
+from laptrend.incremental import Manifest, circuit_fingerprints, manifest_path
+from laptrend.laps import chunk_rows_for_memory
+from laptrend.load import (
+    BINARY_DIR,
+    BUNDLE_DIR,
+    CACHE_DIR,
+    CAREER_DIR,
+    CHART_DIR,
+    COLUMNAR_DIR,
+    CONSTRUCTOR_DIR,
+    OUT_DIR,
+    PACE_DIR,
+    RAW_DIR,
+    TABLES,
+    TREND_DIR,
+    load_tables,
+    require_tables,
+)
+
+# 推移の当てはめ（out-dir からの相対）
+TRENDS_NAME = "trends.json"
+
+# --profile の結果（out-dir からの相対）
+PROFILE_NAME = "build-profile.json"
+
+FAMILIES = ("trend", "driver", "constructor", "chart", "bundle", "career", "pace", "trendfit")
+
+# 出力ごとに必要な CSV
+FAMILY_TABLES = {
+    "trend": {"races", "circuits", "drivers", "qualifying", "lap_times"},
+    "driver": {"races", "circuits", "drivers", "qualifying", "results"},
+    "constructor": {
+        "races", "circuits", "drivers", "constructors",
+        "qualifying", "results", "lap_times",
+    },
+    "chart": {
+        "races", "circuits", "drivers", "constructors",
+        "qualifying", "results", "lap_times",
+    },
+    "bundle": {
+        "races", "circuits", "drivers", "constructors",
+        "qualifying", "results", "lap_times",
+    },
+    "career": {
+        "races", "circuits", "drivers", "constructors",
+        "qualifying", "results", "lap_times",
+    },
+    "pace": {
+        "races", "circuits", "drivers", "constructors",
+        "qualifying", "results", "lap_times",
+    },
+    "trendfit": {
+        "races", "circuits", "drivers", "constructors",
+        "qualifying", "results", "lap_times",
+    },
+}
+
+# 出力ごとに使う組み込み spec（laptrend/specs.py の BUILTIN_SPECS）
+_ALL_SPECS = ("pole", "fastest", "driver_q", "driver_r", "constructor_r", "constructor_q")
+FAMILY_SPECS = {
+    "trend": ("pole", "fastest"),
+    "driver": ("driver_q", "driver_r"),
+    "constructor": ("constructor_r", "constructor_q"),
+    "chart": _ALL_SPECS,
+    "bundle": _ALL_SPECS,
+    "career": _ALL_SPECS,
+    "pace": (),
+    "trendfit": _ALL_SPECS,
+}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--raw-dir", type=Path, default=RAW_DIR)
+    parser.add_argument("--out-dir", type=Path, default=OUT_DIR)
+    parser.add_argument("--constructor-dir", type=Path, default=CONSTRUCTOR_DIR)
+    parser.add_argument("--trend-dir", type=Path, default=TREND_DIR)
+    parser.add_argument("--chart-dir", type=Path, default=CHART_DIR)
+    parser.add_argument("--bundle-dir", type=Path, default=BUNDLE_DIR)
+    parser.add_argument("--career-dir", type=Path, default=CAREER_DIR)
+    parser.add_argument("--pace-dir", type=Path, default=PACE_DIR)
+    parser.add_argument("--columnar-dir", type=Path, default=COLUMNAR_DIR)
+    parser.add_argument("--binary-dir", type=Path, default=BINARY_DIR)
+    parser.add_argument("--cache-dir", type=Path, default=CACHE_DIR)
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="パース済み CSV のキャッシュを使わない",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="インデントなしの JSON を書き出す（本番配信用）",
+    )
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="driver_laps / constructors の列指向コンパクト形式も書き出す",
+    )
+    parser.add_argument(
+        "--binary",
+        action="store_true",
+        help="driver_laps / constructors を型付き配列のバイナリ形式（.bin）でも書き出す",
+    )
+    parser.add_argument(
+        "--precompress",
+        action="store_true",
+        help=".gz（brotli があれば .br も）と manifest.json（ハッシュ・サイズ）も書き出す",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        help="lap_times.csv をこの行数ずつストリーミング集計する（メモリ一定）",
+    )
+    parser.add_argument(
+        "--max-memory",
+        type=float,
+        metavar="MB",
+        help="lap_times.csv のチャンクをこのメモリ量に収まる行数にしてストリーミング集計する",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="前回ビルドから入力が変わったサーキットのファイルだけ書き直す",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="サーキットごとの書き出しを N プロセスで並列に行う",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="ステージ別の時間・行数・ピーク RSS を out-dir/build-profile.json に書く",
+    )
+    parser.add_argument(
+        "--cprofile",
+        action="store_true",
+        help="--profile に加えて、ステージごとの cProfile を out-dir/profile/*.pstats に書く",
+    )
+    parser.add_argument(
+        "--spec",
+        type=Path,
+        action="append",
+        metavar="JSON",
+        help="追加の集計 spec（laptrend/specs.py の形式の配列）を out-dir 以下に書き出す（複数指定可）",
+    )
+    parser.add_argument(
+        "--only",
+        choices=FAMILIES,
+        action="append",
+        help="指定した出力だけ生成する（複数指定可）",
+    )
+    return parser.parse_args(argv)
+
+
+def build(
+    families=FAMILIES,
+    raw_dir: Path = RAW_DIR,
+    out_dir: Path = OUT_DIR,
+    constructor_dir: Path = CONSTRUCTOR_DIR,
+    trend_dir: Path = TREND_DIR,
+    chart_dir: Path = CHART_DIR,
+    bundle_dir: Path = BUNDLE_DIR,
+    career_dir: Path = CAREER_DIR,
+    pace_dir: Path = PACE_DIR,
+    columnar_dir: Path | None = None,
+    binary_dir: Path | None = None,
+    precompress: bool = False,
+    cache_root: Path | None = CACHE_DIR,
+    indent: int | None = 2,
+    chunk_rows: int | None = None,
+    max_memory_mb: float | None = None,
+    incremental: bool = False,
+    jobs: int = 1,
+    extra_specs: list[specs.Spec] = (),
+) -> None:
+    """families の出力を生成する。
+
+    chunk_rows / max_memory_mb のどちらかを指定すると lap_times.csv は
+    一括で読み込まず、チャンクごとにストリーミング集計する。
+    incremental=True なら、入力のフィンガープリントが前回と違う
+    サーキットのファイルだけ書き直す（career / pace / trendfit は毎回全部）。
+    columnar_dir を渡すと driver_laps / constructors の列指向形式を
+    columnar_dir と columnar_dir/constructors にも書く。
+    binary_dir を渡すと同じくバイナリ形式（binlaps.py、.bin）を書く。
+    precompress=True なら各ファイルの .gz / .br と、out_dir/manifest.json
+    （論理名 → sha256・サイズ）も書く。
+    extra_specs（output のある spec）は組み込み spec と一緒に計画・実行し、
+    out_dir / spec.output に書く（毎回全部）。
+    """
+    print("RAW_DIR:", raw_dir, "exists?", raw_dir.exists())
+
+    names = set().union(
+        *(FAMILY_TABLES[f] for f in families),
+        *(specs.SOURCE_TABLES[s.source] for s in extra_specs),
+    )
+    # ストリーミング集計する lap_times.csv も含めて、先に全部あるか確かめる
+    require_tables(raw_dir, [n for n in TABLES if n in names])
+
+    stream_laps_from = None
+    if "lap_times" in names and (chunk_rows or max_memory_mb):
+        stream_laps_from = raw_dir / "lap_times.csv"
+        if not chunk_rows:
+            chunk_rows = chunk_rows_for_memory(stream_laps_from, max_memory_mb)
+        names.discard("lap_times")
+
+    with profiling.stage("load"):
+        tables = load_tables(raw_dir, [n for n in TABLES if n in names], cache_root)
+    with profiling.stage("frames"):
+        frames = build_frames(
+            tables, stream_laps_from, chunk_rows, pace="pace" in families
+        )
+    del tables
+
+    changed = {}
+    if incremental:
+        with profiling.stage("incremental"):
+            manifest = Manifest(
+                manifest_path(
+                    cache_root or CACHE_DIR,
+                    [out_dir, constructor_dir, trend_dir, chart_dir, bundle_dir],
+                ),
+                {
+                    "indent": indent,
+                    "columnar": columnar_dir is not None,
+                    "binary": binary_dir is not None,
+                    "precompress": precompress,
+                },
+            )
+            fingerprints = circuit_fingerprints(frames, families)
+            out_path_for = {
+                "trend": lambda key: trend_dir / f"{key}_lap_times.json",
+                "driver": lambda key: out_dir / f"{key}_driver_laps.json",
+                "constructor": lambda key: constructor_dir / f"{key}.json",
+                "chart": lambda key: chart_dir / f"{key}.json",
+                "bundle": lambda key: bundle_dir / f"{key}.json",
+            }
+            for family, current in fingerprints.items():
+                changed[family] = manifest.changed(family, current, out_path_for[family])
+                print(f"[incremental] {family}: {len(changed[family])}/{len(current)} circuits changed")
+
+    # 全出力の集計をまとめて計画・実行する（結果は frames.aggregates に残る）
+    with profiling.stage("specs"):
+        wanted = [specs.BUILTIN_SPECS[n] for f in families for n in FAMILY_SPECS[f]]
+        specs.execute(frames, wanted + list(extra_specs))
+
+    artifacts = None
+    if precompress:
+        artifacts = ArtifactManifest(out_dir / MANIFEST_NAME, [out_dir, trend_dir])
+    else:
+        # .gz / .br を消しながら書き直すので、前回のマニフェストはもう合わない
+        (out_dir / MANIFEST_NAME).unlink(missing_ok=True)
+
+    if "trend" in families:
+        print("\n=== circuit trend (pole / fastest) ===")
+        with profiling.stage("trend"):
+            emit.emit_circuit_trends(
+                frames, trend_dir, indent, changed.get("trend"), jobs, artifacts
+            )
+
+    driver_agg = None
+    if "driver" in families:
+        print("\n=== driver laps ===")
+        with profiling.stage("driver"):
+            with profiling.stage("aggregate") as st:
+                driver_agg = aggregate.driver_laps(frames)
+                st.rows = len(driver_agg)
+            with profiling.stage("write") as st:
+                count = emit.emit_driver_laps(
+                    driver_agg,
+                    out_dir,
+                    indent,
+                    changed.get("driver"),
+                    jobs,
+                    columnar_dir,
+                    artifacts,
+                    binary_dir,
+                )
+                st.rows = count
+        print(f"\n✅ Done. Generated {count} driver_laps files in {out_dir}")
+
+    constructor_agg = None
+    if "constructor" in families:
+        print("\n=== constructor laps ===")
+        with profiling.stage("constructor"):
+            with profiling.stage("aggregate") as st:
+                constructor_agg = aggregate.constructor_laps(frames)
+                st.rows = len(constructor_agg)
+            with profiling.stage("write") as st:
+                count = emit.emit_constructor_laps(
+                    constructor_agg,
+                    constructor_dir,
+                    indent,
+                    changed.get("constructor"),
+                    jobs,
+                    columnar_dir / "constructors" if columnar_dir is not None else None,
+                    artifacts,
+                    binary_dir / "constructors" if binary_dir is not None else None,
+                )
+                st.rows = count
+        print(f"\n✅ Done. Generated {count} constructor files in {constructor_dir}")
+
+    if {"chart", "bundle", "career", "trendfit"} & set(families) and (driver_agg is None or constructor_agg is None):
+        with profiling.stage("aggregate"):
+            if driver_agg is None:
+                driver_agg = aggregate.driver_laps(frames)
+            if constructor_agg is None:
+                constructor_agg = aggregate.constructor_laps(frames)
+
+    if "chart" in families:
+        print("\n=== chart data (wide) ===")
+        with profiling.stage("chart") as st:
+            count = emit.emit_charts(
+                driver_agg,
+                constructor_agg,
+                frames,
+                chart_dir,
+                indent,
+                changed.get("chart"),
+                artifacts,
+            )
+            st.rows = count
+        print(f"\n✅ Done. Generated {count} chart files in {chart_dir}")
+
+    if "bundle" in families:
+        print("\n=== circuit bundles ===")
+        with profiling.stage("bundle") as st:
+            count = emit.emit_bundles(
+                driver_agg,
+                constructor_agg,
+                frames,
+                bundle_dir,
+                indent,
+                changed.get("bundle"),
+                artifacts,
+            )
+            st.rows = count
+        print(f"\n✅ Done. Generated {count} bundle files in {bundle_dir}")
+
+    if "career" in families:
+        print("\n=== driver / constructor careers ===")
+        with profiling.stage("career") as st:
+            count = emit.emit_careers(
+                driver_agg, constructor_agg, frames, career_dir, indent, jobs, artifacts
+            )
+            st.rows = count
+        print(f"\n✅ Done. Generated {count} career files in {career_dir}")
+
+    if "pace" in families:
+        print("\n=== race pace (p10 / median / p90) ===")
+        with profiling.stage("pace") as st:
+            driver_pace, constructor_pace = aggregate.race_pace(frames)
+            count = emit.emit_pace(
+                driver_pace, constructor_pace, pace_dir, indent, artifacts
+            )
+            st.rows = count
+        print(f"\n✅ Done. Generated {count} pace files in {pace_dir}")
+
+    if "trendfit" in families:
+        print("\n=== trend fits ===")
+        with profiling.stage("trendfit") as st:
+            count = emit.emit_trend_fits(
+                driver_agg, constructor_agg, frames, out_dir / TRENDS_NAME, artifacts
+            )
+            st.rows = count
+        print(f"\n✅ Done. Fitted {count} series into {out_dir / TRENDS_NAME}")
+
+    if extra_specs:
+        print("\n=== extra specs ===")
+        with profiling.stage("specs_write") as st:
+            count = emit.emit_specs(
+                frames.aggregates, list(extra_specs), out_dir, indent, jobs, artifacts
+            )
+            st.rows = count
+        print(f"\n✅ Done. Generated {count} spec files in {out_dir}")
+
+    with profiling.stage("manifest"):
+        if artifacts is not None:
+            artifacts.save()
+
+        if incremental:
+            for family, current in fingerprints.items():
+                manifest.update(family, current, out_path_for[family])
+            manifest.save()
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    profiler = None
+    if args.profile or args.cprofile:
+        profiler = profiling.enable(
+            args.out_dir / "profile" if args.cprofile else None
+        )
+    try:
+        build(
+            families=tuple(args.only) if args.only else FAMILIES,
+            raw_dir=args.raw_dir,
+            out_dir=args.out_dir,
+            constructor_dir=args.constructor_dir,
+            trend_dir=args.trend_dir,
+            chart_dir=args.chart_dir,
+            bundle_dir=args.bundle_dir,
+            career_dir=args.career_dir,
+            pace_dir=args.pace_dir,
+            columnar_dir=args.columnar_dir if args.columnar else None,
+            binary_dir=args.binary_dir if args.binary else None,
+            precompress=args.precompress,
+            cache_root=None if args.no_cache else args.cache_dir,
+            indent=None if args.compact else 2,
+            chunk_rows=args.chunk_rows,
+            max_memory_mb=args.max_memory,
+            incremental=args.incremental,
+            jobs=args.jobs,
+            extra_specs=[s for path in args.spec or [] for s in specs.load_specs(path)],
+        )
+    except (FileNotFoundError, specs.SpecError) as e:
+        raise SystemExit(f"error: {e}") from None
+    if profiler is not None:
+        profiler.print_summary()
+        profiler.write(args.out_dir / PROFILE_NAME)
+        print(f"Wrote {args.out_dir / PROFILE_NAME}")
+        profiling.disable()
+
+
+if __name__ == "__main__":
+    main()
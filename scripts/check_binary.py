@@ -0,0 +1,72 @@
+"""バイナリ形式（--binary）がレコード形式と一致するか確認し、サイズを比べる。
+
+bin/{circuit}_driver_laps.bin と bin/constructors/{circuit}.bin を
+decode_laps() / to_records() で戻し、public/data の同名 .json のレコードと
+比べる（lapTime はミリ秒単位、つまり小数 3 桁に丸めて比べる。constructors の
+JSON は丸めていないので 85.52799999999999 のような値がある）。あわせて素のバイト数と gzip 後のバイト数の合計を表示する。
+
+    python scripts/check_binary.py [--out-dir public/data] [--binary-dir ...]
+"""
+import argparse
+import gzip
+import json
+import sys
+from pathlib import Path
+
+from laptrend.binlaps import decode_laps, to_records
+from laptrend.load import BINARY_DIR, OUT_DIR
+
+
+def binary_pairs(out_dir: Path, binary_dir: Path) -> list[tuple[Path, Path]]:
+    """(.bin, 対応する .json) の組を返す。"""
+    return [
+        (path, out_dir / path.relative_to(binary_dir).with_suffix(".json"))
+        for path in sorted(binary_dir.glob("*_driver_laps.bin"))
+        + sorted((binary_dir / "constructors").glob("*.bin"))
+    ]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out-dir", type=Path, default=OUT_DIR)
+    parser.add_argument("--binary-dir", type=Path, default=BINARY_DIR)
+    args = parser.parse_args(argv)
+
+    pairs = binary_pairs(args.out_dir, args.binary_dir)
+
+    errors = 0
+    sizes = {"records": [0, 0], "binary": [0, 0]}
+    for binary_path, records_path in pairs:
+        binary_bytes = binary_path.read_bytes()
+        records_bytes = records_path.read_bytes()
+        try:
+            decoded = to_records(decode_laps(binary_bytes))
+        except ValueError as e:
+            errors += 1
+            print(f"[NG] {binary_path}: {e}")
+            continue
+        records = [
+            {**r, "lapTime": round(r["lapTime"], 3)} for r in json.loads(records_bytes)
+        ]
+        if [list(r.items()) for r in decoded] != [list(r.items()) for r in records]:
+            errors += 1
+            print(f"[NG] {binary_path}: レコードが {records_path} と一致しません")
+
+        for name, data in (("records", records_bytes), ("binary", binary_bytes)):
+            sizes[name][0] += len(data)
+            sizes[name][1] += len(gzip.compress(data, mtime=0))
+
+    print(f"checked {len(pairs)} files, {errors} mismatches")
+    print(f"{'format':<9} {'bytes':>12} {'gzip bytes':>12}")
+    for name, (raw, gz) in sizes.items():
+        print(f"{name:<9} {raw:12d} {gz:12d}")
+    if sizes["binary"][0]:
+        print(
+            f"reduction: {sizes['records'][0] / sizes['binary'][0]:.1f}x raw, "
+            f"{sizes['records'][1] / sizes['binary'][1]:.1f}x gzip"
+        )
+    return 1 if errors or not pairs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""charts/*.json（横持ち）が縦持ちの JSON と一致するか確認する。
+
+app/page.tsx の driverChartData / constructorChartData と同じ手順で
+  - {circuit}_driver_laps.json / constructors/{circuit}.json（縦持ち）
+  - {circuit}_lap_times.json（gap の基準になる年別 pole / fastest）
+から行を組み立て、charts/{circuit}.json の行とキーの順番まで比べる。
+careers/*.json があれば、各レコードの lapTime / gap がチャートの {id} /
+{id}_gap（小数 3 桁に丸めた値。_gap が無ければ gap は null）と同じかも確かめる。
+
+    python scripts/check_charts.py [--out-dir public/data] [--trend-dir ...]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from laptrend.load import CAREER_DIR, CHART_DIR, CONSTRUCTOR_DIR, OUT_DIR, TREND_DIR
+
+
+def load_json(path: Path, default):
+    if not path.exists():
+        return default
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+# page.tsx の組み立てをそのまま Python にしたもの（行ごとのループ）
+def page_rows(laps: list[dict], key: str, session: str, trend: list[dict]) -> list[dict]:
+    base_by_year = {
+        d["year"]: d["pole" if session == "Q" else "fastest"] for d in trend
+    }
+    chart_base = [lap for lap in laps if lap["session"] == session]
+
+    rows = []
+    for year in sorted({lap["year"] for lap in chart_base}):
+        row = {"year": year}
+        base = base_by_year.get(year)
+        for lap in [lap for lap in chart_base if lap["year"] == year]:
+            row[lap[key]] = lap["lapTime"]
+            if base is not None:
+                row[f"{lap[key]}_gap"] = lap["lapTime"] - base
+        rows.append(row)
+    return rows
+
+
+def check_circuit(chart_path: Path, args) -> list[str]:
+    circuit = chart_path.stem
+    chart = load_json(chart_path, None)
+    trend = load_json(args.trend_dir / f"{circuit}_lap_times.json", [])
+    sources = {
+        "drivers": (load_json(args.out_dir / f"{circuit}_driver_laps.json", []), "driverId"),
+        "constructors": (load_json(args.constructor_dir / f"{circuit}.json", []), "constructorName"),
+    }
+
+    errors = []
+    for group, (laps, key) in sources.items():
+        for session in ("Q", "R"):
+            expected = page_rows(laps, key, session, trend)
+            got = chart[group][session]
+            if [list(r.items()) for r in got["rows"]] != [list(r.items()) for r in expected]:
+                errors.append(f"{circuit}: {group}/{session} rows differ")
+            ids = sorted({lap[key] for lap in laps if lap["session"] == session})
+            if got["ids"] != ids:
+                errors.append(f"{circuit}: {group}/{session} ids differ")
+    return errors
+
+
+def check_careers(args) -> tuple[int, list[str]]:
+    """careers/*.json の各レコードをチャートの行と比べ、(レコード数, 食い違い) を返す。"""
+    index = load_json(args.career_dir / "index.json", {})
+    charts = {}
+    count = 0
+    errors = []
+    for group, files in index.items():
+        for name, rel in files.items():
+            for rec in load_json(args.career_dir / rel, []):
+                circuit = rec["circuit"]
+                if circuit not in charts:
+                    charts[circuit] = load_json(args.chart_dir / f"{circuit}.json", None)
+                chart = charts[circuit]
+                rows = {} if chart is None else {
+                    r["year"]: r for r in chart[group][rec["session"]]["rows"]
+                }
+                row = rows.get(rec["year"], {})
+                where = f"careers/{rel}: {circuit} {rec['year']} {rec['session']}"
+                count += 1
+                if row.get(name) != rec["lapTime"]:
+                    errors.append(f"{where}: lapTime {rec['lapTime']} != chart {row.get(name)}")
+                    continue
+                gap = row.get(f"{name}_gap")
+                expected = None if gap is None else round(gap, 3)
+                if rec["gap"] != expected:
+                    errors.append(f"{where}: gap {rec['gap']} != chart {expected}")
+    return count, errors
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out-dir", type=Path, default=OUT_DIR)
+    parser.add_argument("--constructor-dir", type=Path, default=CONSTRUCTOR_DIR)
+    parser.add_argument("--trend-dir", type=Path, default=TREND_DIR)
+    parser.add_argument("--chart-dir", type=Path, default=CHART_DIR)
+    parser.add_argument("--career-dir", type=Path, default=CAREER_DIR)
+    args = parser.parse_args(argv)
+
+    chart_paths = sorted(args.chart_dir.glob("*.json"))
+    errors = []
+    for path in chart_paths:
+        errors += check_circuit(path, args)
+    n_careers, career_errors = check_careers(args)
+    errors += career_errors
+
+    for e in errors[:20]:
+        print(f"[NG] {e}")
+    if len(errors) > 20:
+        print(f"... and {len(errors) - 20} more")
+    print(
+        f"checked {len(chart_paths)} circuits and {n_careers} career records,"
+        f" {len(errors)} mismatches"
+    )
+    return 1 if errors or not chart_paths else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""列指向形式（--columnar）がレコード形式と一致するか確認し、サイズを比べる。
+
+columnar/{circuit}_driver_laps.json と columnar/constructors/{circuit}.json を
+decode_columnar() で戻し、public/data の同名ファイルのレコードと完全一致で比べる。
+あわせて素のバイト数と gzip 後のバイト数の合計を表示する。
+
+    python scripts/check_columnar.py [--out-dir public/data] [--columnar-dir ...]
+"""
+import argparse
+import gzip
+import json
+import sys
+from pathlib import Path
+
+from laptrend.columnar import decode_columnar
+from laptrend.load import COLUMNAR_DIR, OUT_DIR
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out-dir", type=Path, default=OUT_DIR)
+    parser.add_argument("--columnar-dir", type=Path, default=COLUMNAR_DIR)
+    args = parser.parse_args(argv)
+
+    pairs = [
+        (path, args.out_dir / path.relative_to(args.columnar_dir))
+        for path in sorted(args.columnar_dir.glob("*_driver_laps.json"))
+        + sorted((args.columnar_dir / "constructors").glob("*.json"))
+    ]
+
+    errors = 0
+    sizes = {"records": [0, 0], "columnar": [0, 0]}
+    for columnar_path, records_path in pairs:
+        columnar_bytes = columnar_path.read_bytes()
+        records_bytes = records_path.read_bytes()
+        try:
+            decoded = decode_columnar(json.loads(columnar_bytes))
+        except ValueError as e:
+            errors += 1
+            print(f"[NG] {columnar_path}: {e}")
+            continue
+        records = json.loads(records_bytes)
+        if [list(r.items()) for r in decoded] != [list(r.items()) for r in records]:
+            errors += 1
+            print(f"[NG] {columnar_path}: レコードが {records_path} と一致しません")
+
+        for name, data in (("records", records_bytes), ("columnar", columnar_bytes)):
+            sizes[name][0] += len(data)
+            sizes[name][1] += len(gzip.compress(data, mtime=0))
+
+    print(f"checked {len(pairs)} files, {errors} mismatches")
+    print(f"{'format':<9} {'bytes':>12} {'gzip bytes':>12}")
+    for name, (raw, gz) in sizes.items():
+        print(f"{name:<9} {raw:12d} {gz:12d}")
+    if sizes["columnar"][0]:
+        print(
+            f"reduction: {sizes['records'][0] / sizes['columnar'][0]:.1f}x raw, "
+            f"{sizes['records'][1] / sizes['columnar'][1]:.1f}x gzip"
+        )
+    return 1 if errors or not pairs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
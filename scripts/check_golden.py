@@ -0,0 +1,396 @@
+"""高速化したビルドのモードが、基準のビルドと同じ JSON を書くか確認する。
+
+    python scripts/check_golden.py [--modes parallel streaming ...] [--scale 0.1]
+    python scripts/check_golden.py --raw-dir public/data/f1-kaggle   # 実データで
+
+小さな固定の合成データ（make_synthetic_kaggle.py、--scale と --seed で決まる。
+.cache/bench に作って使い回す）に対して、基準モード（--jobs 1、キャッシュなし、
+lap_times は一括読み込み）と各候補モードで build.py の build() を実行し、
+trend / driver / constructor / chart / bundle / career / pace / trendfit の全ファイルを JSON として
+読んで比べる。数値は --rtol / --atol の誤差まで許し、食い違いは最初の
+--max-report 件をパス付きで表示する。あわせて両方の時間も表示する。
+
+--reference-dir に以前のコミットで書いた出力（このスクリプトの --keep で残せる）を
+渡すと、基準モードを実行せずにそれと比べる。
+
+基準モードも最適化したパイプラインなので、spec の計画・集計・書き出しの
+退行は全モードに同じように出て見逃す。baseline モードはそれを見るためのもので、
+コミット済みの固定データ（scripts/golden、make_golden_baseline.py で作る）の
+raw/ の CSV で基準モードの build() を実行し、最初のコミットの 3 本のスクリプトが
+同じ CSV から書いた baseline/ の trend / driver / constructor のファイルと比べる。
+--raw-dir にかかわらず、この固定データを使う。
+
+legacy モードは、ラップタイムの変換と driverCode の決め方だけを baseline の
+行ごとの実装（bench_laptime.time_str_to_seconds の .apply と、行ごとの
+normalize_driver_code）に差し替えて build() を実行し、基準と比べる
+（parse_lap_times() と build_driver_codes() の検査）。driverCode は user-010 で
+意図して変えた 3 点（code の \\N は欠損扱い、surname は英字だけの先頭3文字、
+同じコードになったドライバーの "{コード}_{driverRef}" への分割）だけを、
+行ごとの Python で重ねてある。
+
+wrappers モードは build() の代わりに、古い入口のスクリプト
+（generate_*_all.py、f1-laptrend-data/build_*.py）をそれぞれ別プロセスで実行し、
+それらが書く trend / driver / constructor のファイルだけを基準と比べる。
+build_spa_json.py は circuits.csv の Spa（無ければ先頭のサーキット）で実行し、
+基準の {circuitRef}_lap_times.json と比べる。
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from bench_laptime import time_str_to_seconds
+from bench_pipeline import dataset_dir
+from build import FAMILIES, build
+from laptrend import frames as frames_module
+from laptrend import laps as laps_module
+from laptrend.load import CACHE_DIR, ROOT
+from make_golden_baseline import GOLDEN_DIR
+
+# モード名 → build() の追加引数。warmup=True のモードは 2 回実行し、2 回目を測る
+MODES = {
+    "reference": {},
+    "baseline": {"baseline": True},
+    "parallel": {"jobs": 4},
+    "streaming": {"chunk_rows": 50_000},
+    "cached": {"warmup": True, "cache": True},
+    "incremental": {"warmup": True, "cache": True, "incremental": True},
+    "compact": {"indent": None},
+    "precompress": {"precompress": True},
+    "legacy": {"legacy": True},
+    "wrappers": {"wrappers": True},
+}
+
+# wrappers モードで比べるファイル
+WRAPPER_PATTERNS = [
+    "trend/*_lap_times.json",
+    "data/*_driver_laps.json",
+    "data/constructors/*.json",
+]
+
+# build() の出力先（モードごとのディレクトリからの相対）
+OUTPUT_DIRS = {
+    "out_dir": "data",
+    "constructor_dir": "data/constructors",
+    "trend_dir": "trend",
+    "chart_dir": "charts",
+    "bundle_dir": "bundles",
+    "career_dir": "careers",
+    "pace_dir": "pace",
+}
+
+
+ALL_PATTERNS = WRAPPER_PATTERNS + [
+    "data/trends.json",
+    "charts/*.json",
+    "bundles/*.json",
+    "careers/index.json",
+    "careers/*/*.json",
+    "pace/*.json",
+]
+
+
+def output_files(root: Path, patterns: list[str] = ALL_PATTERNS) -> dict[str, Path]:
+    """比べる JSON を {root からの相対パス: パス} で返す（manifest や .gz は除く）。"""
+    files = {}
+    for pattern in patterns:
+        for path in sorted(root.glob(pattern)):
+            files[path.relative_to(root).as_posix()] = path
+    return files
+
+
+# ---------------------------------------------------
+#  legacy モード: baseline の行ごとの実装
+# ---------------------------------------------------
+def legacy_parse_lap_times(values) -> pd.Series:
+    """baseline と同じく 1 セルずつ time_str_to_seconds() する。"""
+    s = values if isinstance(values, pd.Series) else pd.Series(values)
+    return s.apply(time_str_to_seconds).astype("float64")
+
+
+def normalize_driver_code(row):
+    """baseline の generate_driver_laps_all.py と同じ（code → surname 先頭3文字 → "DRV"）。"""
+    code = row.get("code")
+    if isinstance(code, str) and code.strip():
+        return code.strip().upper()
+    surname = row.get("surname")
+    if isinstance(surname, str) and surname:
+        return surname[:3].upper()
+    return "DRV"
+
+
+def legacy_driver_codes(drivers: pd.DataFrame) -> pd.DataFrame:
+    """normalize_driver_code を行ごとに使い、user-010 の 3 点を Python で重ねる。"""
+    rows = drivers.astype(object).to_dict("records")
+    official = {}
+    base = {}
+    for row in rows:
+        code = row.get("code")
+        is_official = isinstance(code, str) and code.strip() not in ("", r"\N")
+        if not is_official:
+            row = {**row, "code": None}  # \N は欠損扱い（user-010）
+        surname = row.get("surname")
+        if isinstance(surname, str):
+            row = {**row, "surname": "".join(c for c in surname if c.isalpha())}
+        official[row["driverId"]] = is_official
+        base[row["driverId"]] = normalize_driver_code(row)
+
+    # 同じコードの中で「DRIVER_CODE_HOLDERS → 公式 code あり → driverId が小さい」
+    # 順の先頭だけそのまま
+    def rank(row):
+        driver_id = row["driverId"]
+        pinned = frames_module.DRIVER_CODE_HOLDERS.get(base[driver_id]) == row.get("driverRef")
+        return (pinned, official[driver_id], -driver_id)
+
+    keeper = {}
+    for row in rows:
+        code = base[row["driverId"]]
+        if code not in keeper or rank(row) > keeper[code]:
+            keeper[code] = rank(row)
+
+    codes = []
+    for row in rows:
+        driver_id = row["driverId"]
+        code = base[driver_id]
+        if keeper[code] != rank(row):
+            ref = row.get("driverRef")
+            code = f"{code}_{ref if isinstance(ref, str) else driver_id}"
+        codes.append(code)
+    return pd.DataFrame(
+        {"driverId": drivers["driverId"].to_numpy(), "driverCode": codes}
+    ).sort_values("driverId", ignore_index=True)
+
+
+@contextlib.contextmanager
+def legacy_implementations():
+    """parse_lap_times / build_driver_codes を baseline の行ごとの実装に差し替える。"""
+    saved = (
+        frames_module.parse_lap_times,
+        laps_module.parse_lap_times,
+        frames_module.build_driver_codes,
+    )
+    frames_module.parse_lap_times = legacy_parse_lap_times
+    laps_module.parse_lap_times = legacy_parse_lap_times
+    frames_module.build_driver_codes = legacy_driver_codes
+    try:
+        yield
+    finally:
+        (
+            frames_module.parse_lap_times,
+            laps_module.parse_lap_times,
+            frames_module.build_driver_codes,
+        ) = saved
+
+
+def spa_circuit(raw_dir: Path) -> tuple[str, str]:
+    """build_spa_json.py に渡す (name, circuitRef)。Spa が無ければ先頭のサーキット。"""
+    circuits = pd.read_csv(raw_dir / "circuits.csv")
+    spa = circuits[circuits["name"].str.contains("Spa", case=False, na=False, regex=False)]
+    row = (spa if len(spa) else circuits).iloc[0]
+    return str(row["name"]), str(row["circuitRef"])
+
+
+def run_wrappers(raw_dir: Path, root: Path) -> None:
+    """古い入口のスクリプトを別プロセスで実行する（失敗したら出力を表示して例外）。"""
+    common = ["--raw-dir", str(raw_dir), "--out-dir", str(root / "data"), "--no-cache"]
+    name, _ = spa_circuit(raw_dir)
+    commands = [
+        [ROOT / "scripts" / "generate_driver_laps_all.py", *common],
+        [
+            ROOT / "scripts" / "generate_constructor_laps_all.py", *common,
+            "--constructor-dir", str(root / "data" / "constructors"),
+        ],
+        [
+            ROOT / "f1-laptrend-data" / "build_all_circuits_json.py", *common,
+            "--trend-dir", str(root / "trend"),
+        ],
+        [
+            ROOT / "f1-laptrend-data" / "build_spa_json.py",
+            "--raw-dir", str(raw_dir), "--output", str(root / "spa.json"), "--circuit", name,
+        ],
+    ]
+    for script, *args in commands:
+        proc = subprocess.run(
+            [sys.executable, str(script), *args], capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            print(proc.stdout + proc.stderr)
+            raise RuntimeError(f"{script.name} が終了コード {proc.returncode} で失敗しました")
+
+
+def run_mode(name: str, raw_dir: Path, root: Path) -> float:
+    """name のモードで root に出力し、build() 1 回分の秒数を返す。"""
+    options = dict(MODES[name])
+    if options.pop("baseline", False):
+        return run_mode("reference", raw_dir, root)
+    if options.pop("wrappers", False):
+        start = time.perf_counter()
+        run_wrappers(raw_dir, root)
+        return time.perf_counter() - start
+    warmup = options.pop("warmup", False)
+    cache = options.pop("cache", False)
+    legacy = options.pop("legacy", False)
+    kwargs = {key: root / rel for key, rel in OUTPUT_DIRS.items()}
+    kwargs.update(options)
+
+    def once() -> float:
+        log = io.StringIO()
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(log), (
+                legacy_implementations() if legacy else contextlib.nullcontext()
+            ):
+                build(
+                    FAMILIES,
+                    raw_dir=raw_dir,
+                    cache_root=root / "cache" if cache else None,
+                    **kwargs,
+                )
+        except Exception:
+            print(log.getvalue())
+            raise
+        return time.perf_counter() - start
+
+    if warmup:
+        once()
+    return once()
+
+
+def diff_values(expected, got, path: str, rtol: float, atol: float):
+    """食い違いを (パス, 期待値, 実際の値) で順に返す。"""
+    if isinstance(expected, bool) or isinstance(got, bool):
+        if expected is not got:
+            yield path, expected, got
+    elif isinstance(expected, (int, float)) and isinstance(got, (int, float)):
+        if not math.isclose(expected, got, rel_tol=rtol, abs_tol=atol):
+            yield path, expected, got
+    elif isinstance(expected, dict) and isinstance(got, dict):
+        # キーはファイルの順に見る（報告の順番を実行ごとに変えない）
+        for key in list(expected) + [k for k in got if k not in expected]:
+            if key not in got:
+                yield f"{path}.{key}", expected[key], "<missing>"
+            elif key not in expected:
+                yield f"{path}.{key}", "<missing>", got[key]
+            else:
+                yield from diff_values(expected[key], got[key], f"{path}.{key}", rtol, atol)
+    elif isinstance(expected, list) and isinstance(got, list):
+        if len(expected) != len(got):
+            yield f"{path}.length", len(expected), len(got)
+        for i, (e, g) in enumerate(zip(expected, got)):
+            yield from diff_values(e, g, f"{path}[{i}]", rtol, atol)
+    elif expected != got:
+        yield path, expected, got
+
+
+def compare_trees(
+    reference: Path,
+    candidate: Path,
+    rtol: float,
+    atol: float,
+    patterns: list[str] = ALL_PATTERNS,
+):
+    """2 つの出力ツリーの patterns のファイルを比べ、(ファイル数, 食い違いのリスト) を返す。"""
+    expected_files = output_files(reference, patterns)
+    got_files = output_files(candidate, patterns)
+    divergences = []
+    for rel in sorted(expected_files.keys() - got_files.keys()):
+        divergences.append((rel, "<file>", "<missing>"))
+    for rel in sorted(got_files.keys() - expected_files.keys()):
+        divergences.append((rel, "<missing>", "<file>"))
+    for rel in sorted(expected_files.keys() & got_files.keys()):
+        expected = json.loads(expected_files[rel].read_text(encoding="utf-8"))
+        got = json.loads(got_files[rel].read_text(encoding="utf-8"))
+        divergences.extend(diff_values(expected, got, rel, rtol, atol))
+    return len(expected_files), divergences
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", nargs="+", choices=[m for m in MODES if m != "reference"])
+    parser.add_argument("--raw-dir", type=Path, help="合成データの代わりに使う CSV のディレクトリ")
+    parser.add_argument("--scale", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", type=Path, default=CACHE_DIR.parent / "bench")
+    parser.add_argument("--reference-dir", type=Path, help="基準モードの代わりに比べる出力")
+    parser.add_argument(
+        "--golden-dir", type=Path, default=GOLDEN_DIR, help="baseline モードの固定データ"
+    )
+    parser.add_argument("--keep", type=Path, help="各モードの出力をこのディレクトリに残す")
+    parser.add_argument("--rtol", type=float, default=1e-9)
+    parser.add_argument("--atol", type=float, default=1e-9)
+    parser.add_argument("--max-report", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    raw_dir = args.raw_dir or dataset_dir(args.work_dir, args.scale, args.seed)
+    modes = args.modes or [m for m in MODES if m != "reference"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work = args.keep or Path(tmp)
+
+        def fresh(name: str) -> Path:
+            root = work / name
+            shutil.rmtree(root, ignore_errors=True)
+            return root
+
+        if args.reference_dir is not None:
+            reference, t_reference = args.reference_dir, None
+            print(f"reference   : {reference}")
+        else:
+            reference = fresh("reference")
+            t_reference = run_mode("reference", raw_dir, reference)
+            print(f"reference   : {t_reference:7.2f} s")
+
+        failed = []
+        for name in modes:
+            root = fresh(name)
+            if name == "baseline":
+                seconds = run_mode(name, args.golden_dir / "raw", root)
+                n_files, divergences = compare_trees(
+                    args.golden_dir / "baseline", root, args.rtol, args.atol, WRAPPER_PATTERNS
+                )
+            elif name == "wrappers":
+                seconds = run_mode(name, raw_dir, root)
+                n_files, divergences = compare_trees(
+                    reference, root, args.rtol, args.atol, WRAPPER_PATTERNS
+                )
+                # Spa 単体のファイルは基準の trend と同じ中身（2 年未満でも書くので無ければ存在だけ）
+                _, ref = spa_circuit(raw_dir)
+                expected = reference / "trend" / f"{ref}_lap_times.json"
+                got = json.loads((root / "spa.json").read_text(encoding="utf-8"))
+                if expected.exists():
+                    divergences.extend(
+                        diff_values(
+                            json.loads(expected.read_text(encoding="utf-8")),
+                            got, "spa.json", args.rtol, args.atol,
+                        )
+                    )
+                n_files += 1
+            else:
+                seconds = run_mode(name, raw_dir, root)
+                n_files, divergences = compare_trees(reference, root, args.rtol, args.atol)
+            # baseline モードは別のデータで測るので速度は比べない
+            speedup = f"  x{t_reference / seconds:.2f}" if t_reference and name != "baseline" else ""
+            status = "OK" if not divergences else "NG"
+            print(
+                f"[{status}] {name:<11} {seconds:7.2f} s{speedup}  "
+                f"{n_files} files, {len(divergences)} divergences"
+            )
+            for path, expected, got in divergences[: args.max_report]:
+                print(f"       {path}: expected {expected!r}, got {got!r}")
+            if divergences:
+                failed.append(name)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
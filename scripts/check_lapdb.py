@@ -0,0 +1,103 @@
+"""SQLite のクエリ（laptrend/lapdb.py）が aggregate.py の集計と一致するか確認する。
+
+    python scripts/check_lapdb.py [--raw-dir public/data/f1-kaggle] [--scale 0.1]
+
+--raw-dir を省略すると小さな合成データ（make_synthetic_kaggle.py）を使うので、
+ネットワークや実データなしで動く。一時ディレクトリに ingest し、
+pole / fastest・ドライバー別・チーム別のベストを完全一致で比べ、
+あわせて代表的なクエリの時間を表示する。
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from bench_pipeline import dataset_dir
+from laptrend import aggregate, lapdb
+from laptrend.frames import build_constructors, build_frames
+from laptrend.load import CACHE_DIR, TABLES, load_tables
+
+
+def compare(name: str, expected: pd.DataFrame, got: list[dict], keys: list[str]) -> bool:
+    got = pd.DataFrame(got, columns=expected.columns)
+    expected = expected.sort_values(keys).reset_index(drop=True)
+    got = got.sort_values(keys).reset_index(drop=True)
+    try:
+        pd.testing.assert_frame_equal(got, expected, check_dtype=False, check_exact=True)
+    except AssertionError as e:
+        print(f"[NG] {name}\n{e}")
+        return False
+    print(f"[OK] {name}: {len(got)} rows")
+    return True
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--raw-dir", type=Path)
+    parser.add_argument("--scale", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", type=Path, default=CACHE_DIR.parent / "bench")
+    args = parser.parse_args(argv)
+
+    raw_dir = args.raw_dir or dataset_dir(args.work_dir, args.scale, args.seed)
+    tables = load_tables(raw_dir, TABLES, cache_root=None)
+    frames = build_frames(tables)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "laps.sqlite"
+        start = time.perf_counter()
+        lapdb.ingest(frames, db_path, build_constructors(tables["constructors"]))
+        print(f"ingest: {time.perf_counter() - start:.2f} s")
+        conn = lapdb.connect(db_path)
+
+        ok = True
+
+        ref_of = frames.circuits.set_index("circuitId")["circuitRef"].astype(str)
+        trend = aggregate.pole_fastest_by_circuit_year(frames)
+        trend.insert(0, "circuitRef", trend.pop("circuitId").map(ref_of))
+        ok &= compare("pole_fastest", trend, lapdb.pole_fastest(conn), ["circuitRef", "year"])
+
+        drivers = aggregate.driver_laps(frames).rename(
+            columns={"driverCode": "driverId", "lap_sec": "lapTime"}
+        )[["circuitRef", "year", "session", "driverId", "lapTime"]]
+        drivers["circuitRef"] = drivers["circuitRef"].astype(str)
+        drivers["driverId"] = drivers["driverId"].astype(str)
+        ok &= compare(
+            "driver_bests", drivers, lapdb.driver_bests(conn),
+            ["circuitRef", "year", "session", "driverId"],
+        )
+
+        constructors = aggregate.constructor_laps(frames).rename(
+            columns={"circuitKey": "circuitRef", "lapTimeSec": "lapTime"}
+        )[["circuitRef", "year", "session", "constructorName", "lapTime"]]
+        for col in ["circuitRef", "constructorName"]:
+            constructors[col] = constructors[col].astype(str)
+        ok &= compare(
+            "constructor_bests", constructors, lapdb.constructor_bests(conn),
+            ["circuitRef", "year", "session", "constructorName"],
+        )
+
+        # 代表的なクエリの時間（フィルター付き）
+        circuit = str(drivers["circuitRef"].iloc[0])
+        driver = str(drivers["driverId"].iloc[0])
+        constructor = str(constructors["constructorName"].iloc[0])
+        for label, fn in [
+            (f"pole_fastest(circuit={circuit})", lambda: lapdb.pole_fastest(conn, circuit)),
+            (f"driver_bests(driver={driver}, Q)", lambda: lapdb.driver_bests(conn, session="Q", driver=driver)),
+            (f"constructor_bests(circuit={circuit})", lambda: lapdb.constructor_bests(conn, circuit)),
+            (f"constructor_bests(constructor={constructor})", lambda: lapdb.constructor_bests(conn, constructor=constructor)),
+            ("top_poles(10)", lambda: lapdb.top_poles(conn, 10)),
+        ]:
+            start = time.perf_counter()
+            rows = fn()
+            print(f"  {label:<45} {len(rows):6d} rows {(time.perf_counter() - start) * 1000:8.2f} ms")
+        conn.close()
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
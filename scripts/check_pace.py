@@ -0,0 +1,115 @@
+"""決勝ペースのスケッチ（laptrend/pace.py）を pandas の正確な分位点と比べる。
+
+    python scripts/check_pace.py [--raw-dir public/data/f1-kaggle] [--chunk-rows 997 50000]
+
+  1. lap_times を一括で読んだ場合のスケッチから出した p10 / median / p90 が、
+     groupby().quantile(q, interpolation="lower") と相対誤差 RELATIVE_ACCURACY
+     以内か（ドライバー別・チーム別、全グループ）。周回数は完全一致。
+  2. チャンクごとに作って足し合わせたスケッチが、一括で作ったものと完全一致か。
+参考として、線形補間（pandas の既定）との誤差も表示する。
+--raw-dir を省略すると小さな合成データ（make_synthetic_kaggle.py）を使う。
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from bench_pipeline import dataset_dir
+from laptrend import aggregate
+from laptrend.frames import (
+    build_constructors,
+    build_driver_codes,
+    build_frames,
+    with_driver_codes,
+)
+from laptrend.laps import lap_minima_from_frame, stream_lap_minima
+from laptrend.load import CACHE_DIR, TABLES, load_tables
+from laptrend.pace import CONSTRUCTOR_KEYS, DRIVER_KEYS, QUANTILES, RELATIVE_ACCURACY
+
+
+def exact_quantiles(laps: pd.DataFrame, keys: list[str], interpolation: str) -> pd.DataFrame:
+    laps = laps.dropna(subset=keys + ["lap_sec"])
+    grouped = laps.groupby(keys, observed=True)["lap_sec"]
+    out = grouped.size().rename("laps").to_frame()
+    for name, q in QUANTILES.items():
+        out[name] = grouped.quantile(q, interpolation=interpolation)
+    return out.reset_index()
+
+
+def compare(label: str, got: pd.DataFrame, laps: pd.DataFrame, keys: list[str]) -> bool:
+    merged = got.merge(
+        exact_quantiles(laps, keys, "lower"), on=keys, suffixes=("", "_exact"), how="outer"
+    )
+    linear = got.merge(exact_quantiles(laps, keys, "linear"), on=keys, suffixes=("", "_exact"))
+
+    ok = len(merged) == len(got) and (merged["laps"] == merged["laps_exact"]).all()
+    if not ok:
+        print(f"[NG] {label}: グループか周回数が一致しません")
+    for name in QUANTILES:
+        rel = (merged[name] - merged[f"{name}_exact"]).abs() / merged[f"{name}_exact"]
+        rel_linear = (linear[name] - linear[f"{name}_exact"]).abs() / linear[f"{name}_exact"]
+        within = rel.max() <= RELATIVE_ACCURACY + 1e-12
+        ok &= bool(within)
+        print(
+            f"[{'OK' if within else 'NG'}] {label} {name:<6}: {len(merged)} groups, "
+            f"max rel err {rel.max():.5f} (bound {RELATIVE_ACCURACY}), "
+            f"vs linear interpolation {rel_linear.max():.5f}"
+        )
+    return ok
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--raw-dir", type=Path)
+    parser.add_argument("--scale", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", type=Path, default=CACHE_DIR.parent / "bench")
+    parser.add_argument("--chunk-rows", type=int, nargs="+", default=[997, 50_000])
+    args = parser.parse_args(argv)
+
+    raw_dir = args.raw_dir or dataset_dir(args.work_dir, args.scale, args.seed)
+    tables = load_tables(raw_dir, TABLES, cache_root=None)
+    frames = build_frames(tables, pace=True)
+    driver_pace, constructor_pace = aggregate.race_pace(frames)
+
+    laps = with_driver_codes(frames.laps, build_driver_codes(tables["drivers"]))
+    ok = compare("driver", driver_pace, laps, ["circuitRef", "year", "driverCode"])
+    ok &= compare(
+        "constructor", constructor_pace, laps, ["circuitRef", "year", "constructorName"]
+    )
+
+    # チャンクごとのスケッチを足し合わせても一括と同じになるか（driverId 単位のまま比べる）
+    whole = lap_minima_from_frame(frames.laps, pace=True)
+    for chunk_rows in args.chunk_rows:
+        got = stream_lap_minima(
+            raw_dir / "lap_times.csv",
+            frames.races,
+            tables["results"],
+            build_constructors(tables["constructors"]),
+            chunk_rows,
+            pace=True,
+        )
+        try:
+            for attr, keys in [
+                ("pace_driver", DRIVER_KEYS),
+                ("pace_constructor", CONSTRUCTOR_KEYS),
+            ]:
+                order = keys + ["bucket"]
+                pd.testing.assert_frame_equal(
+                    getattr(got, attr).sort_values(order, ignore_index=True),
+                    getattr(whole, attr).sort_values(order, ignore_index=True),
+                    check_dtype=False,
+                    check_categorical=False,
+                )
+        except AssertionError as e:
+            ok = False
+            print(f"[NG] chunk_rows={chunk_rows}: スケッチが一括と一致しません\n{e}")
+        else:
+            print(f"[OK] chunk_rows={chunk_rows}: merged sketches match the in-memory sketch")
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""lap_times のストリーミング集計が、メモリ上の一括集計と一致するか確認する。
+
+    python scripts/check_streaming.py [--raw-dir public/data/f1-kaggle] [--chunk-rows 1000 50000 ...]
+
+races / results / constructors は共通フレームと同じものを使い、
+チャンクサイズを変えて LapMinima（fastest / constructor）を完全一致で比べる。
+--raw-dir を省略すると小さな合成データ（make_synthetic_kaggle.py）を使う。
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from bench_pipeline import dataset_dir
+from laptrend.frames import build_constructors, build_frames
+from laptrend.laps import stream_lap_minima
+from laptrend.load import CACHE_DIR, load_tables
+
+TABLES = ["races", "circuits", "drivers", "constructors", "qualifying", "results", "lap_times"]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--raw-dir", type=Path)
+    parser.add_argument("--scale", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", type=Path, default=CACHE_DIR.parent / "bench")
+    parser.add_argument("--chunk-rows", type=int, nargs="+", default=[997, 50_000, 10**9])
+    args = parser.parse_args(argv)
+
+    raw_dir = args.raw_dir or dataset_dir(args.work_dir, args.scale, args.seed)
+    tables = load_tables(raw_dir, TABLES, cache_root=None)
+    frames = build_frames(tables)
+    expected = frames.lap_minima
+
+    ok = True
+    for chunk_rows in args.chunk_rows:
+        got = stream_lap_minima(
+            raw_dir / "lap_times.csv",
+            frames.races,
+            tables["results"],
+            build_constructors(tables["constructors"]),
+            chunk_rows,
+        )
+        try:
+            pd.testing.assert_series_equal(
+                got.fastest, expected.fastest, check_dtype=False, check_exact=True
+            )
+            pd.testing.assert_frame_equal(
+                got.constructor.reset_index(drop=True),
+                expected.constructor.reset_index(drop=True),
+                check_dtype=False,
+                check_exact=True,
+            )
+        except AssertionError as e:
+            ok = False
+            print(f"[NG] chunk_rows={chunk_rows}\n{e}")
+        else:
+            print(
+                f"[OK] chunk_rows={chunk_rows}: "
+                f"{len(got.fastest)} circuit-years, {len(got.constructor)} constructor rows"
+            )
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
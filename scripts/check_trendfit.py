@@ -0,0 +1,76 @@
+"""trends.json の直線当てはめ（laptrend/trendfit.py）を系列ごとの np.polyfit と比べる。
+
+    python scripts/check_trendfit.py [--raw-dir public/data/f1-kaggle]
+
+ドライバー別・チーム別の全系列について、まとめて当てはめた slope / intercept / r2 が
+1 系列ずつ np.polyfit / np.corrcoef で計算した値と一致するか（相対 1e-6）を確認し、
+両方の時間を表示する。--raw-dir を省略すると小さな合成データを使う。
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from bench_pipeline import dataset_dir
+from laptrend import aggregate
+from laptrend.frames import build_frames
+from laptrend.load import CACHE_DIR, TABLES, load_tables
+from laptrend.trendfit import fit_groups
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--raw-dir", type=Path)
+    parser.add_argument("--scale", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", type=Path, default=CACHE_DIR.parent / "bench")
+    args = parser.parse_args(argv)
+
+    raw_dir = args.raw_dir or dataset_dir(args.work_dir, args.scale, args.seed)
+    frames = build_frames(load_tables(raw_dir, TABLES, cache_root=None))
+
+    ok = True
+    for label, agg, keys, value in [
+        ("driver", aggregate.driver_laps(frames), ["circuitRef", "session", "driverCode"], "lap_sec"),
+        ("constructor", aggregate.constructor_laps(frames), ["circuitKey", "session", "constructorName"], "lapTimeSec"),
+    ]:
+        agg = agg.dropna(subset=keys)
+        start = time.perf_counter()
+        fits = fit_groups(agg[keys], agg["year"].to_numpy(), agg[value].to_numpy())
+        t_vec = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = {}
+        for key, sub in agg.groupby(keys, observed=True):
+            x = sub["year"].to_numpy(dtype="float64")
+            y = sub[value].to_numpy(dtype="float64")
+            if x.max() == x.min():
+                continue
+            slope, intercept = np.polyfit(x, y, 1)
+            r2 = np.corrcoef(x, y)[0, 1] ** 2 if y.std() > 0 else 1.0
+            expected[tuple(map(str, key))] = (slope, intercept, r2, len(x))
+        t_loop = time.perf_counter() - start
+
+        bad = 0
+        for row in fits.itertuples(index=False):
+            key = tuple(getattr(row, k) for k in keys)
+            want = expected.pop(key, None)
+            got = (row.slope, row.intercept, row.r2, row.n)
+            if want is None or not np.allclose(got, want, rtol=1e-6, atol=1e-9):
+                bad += 1
+                if bad <= 5:
+                    print(f"[NG] {label} {key}: got {got}, expected {want}")
+        bad += len(expected)  # 当てはめから漏れた系列
+        ok &= bad == 0
+        print(
+            f"[{'OK' if bad == 0 else 'NG'}] {label}: {len(fits)} series, {bad} mismatches, "
+            f"vectorized {t_vec * 1000:.1f} ms vs per-series polyfit {t_loop * 1000:.0f} ms"
+        )
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
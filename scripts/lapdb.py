@@ -0,0 +1,82 @@
+"""Kaggle CSV を SQLite（.cache/laps.sqlite）に入れ、集計をクエリで引く。
+
+    python scripts/lapdb.py ingest [--raw-dir ...] [--db ...]
+    python scripts/lapdb.py drivers --driver HAM --session Q
+    python scripts/lapdb.py constructors --circuit monza --years 2010 2020
+    python scripts/lapdb.py poles --circuit spa
+    python scripts/lapdb.py top-poles --limit 10
+
+クエリの結果は JSON（1 行 1 レコード）で標準出力に出す。
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from laptrend import lapdb
+from laptrend.frames import build_constructors, build_frames
+from laptrend.load import CACHE_DIR, RAW_DIR, TABLES, load_tables
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", type=Path, default=lapdb.DB_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("ingest", help="CSV を読み込んで DB を作り直す")
+    p.add_argument("--raw-dir", type=Path, default=RAW_DIR)
+    p.add_argument("--cache-dir", type=Path, default=CACHE_DIR)
+    p.add_argument("--no-cache", action="store_true")
+
+    def filters(p, *names):
+        p.add_argument("--circuit", help="circuitRef")
+        p.add_argument("--years", type=int, nargs=2, metavar=("FROM", "TO"))
+        if "session" in names:
+            p.add_argument("--session", choices=["Q", "R"])
+        if "driver" in names:
+            p.add_argument("--driver", help="driverCode（例: HAM）")
+        if "constructor" in names:
+            p.add_argument("--constructor", help="constructorName")
+
+    filters(sub.add_parser("poles", help="サーキット×年の pole / fastest"))
+    filters(sub.add_parser("drivers", help="ドライバー別ベスト"), "session", "driver")
+    filters(sub.add_parser("constructors", help="チーム別ベスト"), "session", "constructor")
+    p = sub.add_parser("top-poles", help="歴代最速ポール")
+    p.add_argument("--limit", type=int, default=10)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "ingest":
+        try:
+            tables = load_tables(
+                args.raw_dir, TABLES, None if args.no_cache else args.cache_dir
+            )
+        except FileNotFoundError as e:
+            raise SystemExit(f"error: {e}") from None
+        frames = build_frames(tables)
+        lapdb.ingest(frames, args.db, build_constructors(tables["constructors"]))
+        return 0
+
+    conn = lapdb.connect(args.db)
+    start = time.perf_counter()
+    if args.command == "poles":
+        rows = lapdb.pole_fastest(conn, args.circuit, args.years)
+    elif args.command == "drivers":
+        rows = lapdb.driver_bests(conn, args.circuit, args.session, args.driver, args.years)
+    elif args.command == "constructors":
+        rows = lapdb.constructor_bests(
+            conn, args.circuit, args.session, args.constructor, args.years
+        )
+    else:
+        rows = lapdb.top_poles(conn, args.limit)
+    elapsed = time.perf_counter() - start
+
+    for row in rows:
+        print(json.dumps(row, ensure_ascii=False))
+    print(f"{len(rows)} rows in {elapsed * 1000:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
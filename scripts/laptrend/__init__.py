@@ -0,0 +1,6 @@
+"""F1LapTrend 用 JSON を Kaggle F1 データセットから生成する共通パイプライン。
+
+CSV の読み込み・結合は 1 回だけ行い（``frames``）、そこから
+``*_lap_times.json`` / ``*_driver_laps.json`` / ``constructors/*.json`` の
+3 系統を出力する（``emit``）。エントリポイントは ``scripts/build.py``。
+"""
@@ -0,0 +1,154 @@
+"""共通フレームから各出力用の集計を作る。"""
+import pandas as pd
+
+from . import pace, specs
+from .frames import Frames
+
+
+# ---------------------------------------------------
+#  *_driver_laps.json: circuitRef × year × driverCode ごとのベスト（Q / R）
+# ---------------------------------------------------
+def driver_laps(frames: Frames) -> pd.DataFrame:
+    q_grouped, r_grouped = specs.builtin(frames, "driver_q", "driver_r")
+
+    # Qualifying（Q）
+    q_grouped = q_grouped.rename(columns={"best_sec": "lap_sec"})
+    q_grouped["session"] = "Q"
+
+    # Race（R）
+    r_grouped = r_grouped.rename(columns={"fastest_sec": "lap_sec"})
+    r_grouped["session"] = "R"
+
+    print("Grouped Q rows:", q_grouped.shape)
+    print("Grouped R rows:", r_grouped.shape)
+
+    return pd.concat([q_grouped, r_grouped], ignore_index=True)
+
+
+# ---------------------------------------------------
+#  constructors/*.json: circuitRef × year × constructorName ごとのベスト（Q / R）
+# ---------------------------------------------------
+def constructor_laps(frames: Frames) -> pd.DataFrame:
+    race_agg, quali_agg = specs.builtin(frames, "constructor_r", "constructor_q")
+
+    # Race（決勝）: lap_times からコンストラクターベストラップ
+    race_agg = race_agg.rename(
+        columns={"circuitRef": "circuitKey", "lap_sec": "lapTimeSec"}
+    )
+    race_agg["session"] = "R"  # Race
+
+    print("Race rows:", len(race_agg))
+
+    # Qualifying（予選）: q1〜q3 の中で最も速いラップ
+    quali_agg = quali_agg.rename(
+        columns={"circuitRef": "circuitKey", "best_sec": "lapTimeSec"}
+    )
+    quali_agg["session"] = "Q"  # Qualifying
+
+    print("Qualifying rows:", len(quali_agg))
+
+    agg_all = pd.concat([race_agg, quali_agg], ignore_index=True)
+    agg_all = agg_all.sort_values(
+        ["circuitKey", "year", "session", "constructorName"]
+    ).reset_index(drop=True)
+
+    print("Total rows (Q+R):", len(agg_all))
+    return agg_all
+
+
+# ---------------------------------------------------
+#  pace/*.json: circuitRef × year × driverCode / constructorName の決勝ペース
+# ---------------------------------------------------
+def race_pace(frames: Frames) -> tuple[pd.DataFrame, pd.DataFrame | None]:
+    """(ドライバー別, チーム別) の laps, p10, median, p90 を返す。
+
+    frames は build_frames(..., pace=True) で作ったもの。
+    チーム別は results / constructors が無ければ None。
+    """
+    minima = frames.lap_minima
+    if minima is None or minima.pace_driver is None:
+        raise RuntimeError("race_pace には build_frames(..., pace=True) の Frames が必要です")
+
+    drivers = pace.summarize(minima.pace_driver, ["circuitRef", "year", "driverCode"])
+    print("Race pace rows (driver):", len(drivers))
+
+    constructors = None
+    if minima.pace_constructor is not None:
+        constructors = pace.summarize(minima.pace_constructor, pace.CONSTRUCTOR_KEYS)
+        print("Race pace rows (constructor):", len(constructors))
+    return drivers, constructors
+
+
+# ---------------------------------------------------
+#  *_lap_times.json: サーキットごとの年別 pole / fastest
+# ---------------------------------------------------
+def pole_fastest_by_circuit_year(frames: Frames) -> pd.DataFrame:
+    """
+    全サーキットの年ごとの pole（組み込み spec "pole"）と
+    決勝最速ラップ fastest（"fastest"）を (circuitId, year) で結合する。
+    列: circuitId, year, pole, fastest（circuitId, year 順。両方ある年だけ）
+    """
+    pole, fastest = specs.builtin(frames, "pole", "fastest")
+    return pd.concat(
+        [
+            pole.set_index(["circuitId", "year"])["best_sec"].rename("pole"),
+            fastest.set_index(["circuitId", "year"])["lap_sec"].rename("fastest"),
+        ],
+        axis=1,
+        join="inner",
+    ).sort_index().reset_index()
+
+
+def slug_from_circuit(row: pd.Series) -> str:
+    """
+    circuits.csv の1行から、ファイル名に使いやすい "slug" を作る。
+    例: circuitRef が 'spa' → 'spa'
+        ない場合は name を小文字＋アンダースコアで整形
+    """
+    if "circuitRef" in row and isinstance(row["circuitRef"], str):
+        base = row["circuitRef"]
+    else:
+        base = str(row["name"])
+
+    slug = base.strip().lower().replace(" ", "_")
+    slug = slug.replace("/", "_").replace("'", "")
+    return slug
+
+
+def circuit_trends(frames: Frames, min_years: int = 2):
+    """circuits.csv の順に (circuit 行, slug, 年別 pole / fastest) を返すジェネレーター。
+
+    年別 pole / fastest（列: year, pole, fastest）が min_years 年分に満たない
+    サーキットは空の DataFrame になる
+    （データが1年分だけだと「進化」が見えないのでスキップする）。
+    """
+    table = pole_fastest_by_circuit_year(frames)
+    by_circuit = {
+        cid: sub.drop(columns="circuitId")
+        for cid, sub in table.groupby("circuitId", sort=False)
+    }
+    empty = table.drop(columns="circuitId").iloc[:0]
+
+    for _, row in frames.circuits.iterrows():
+        cid = int(row["circuitId"])
+        trend = by_circuit.get(cid, empty)
+        if len(trend) < min_years:
+            trend = empty
+        yield row, slug_from_circuit(row), trend
+
+
+def trend_bases(frames: Frames, min_years: int = 2) -> pd.DataFrame:
+    """circuit_trends() の年別 pole / fastest を 1 つの表にする。
+
+    列: circuitRef, year, pole, fastest。charts/*.json と careers/*.json の
+    gap の基準（*_lap_times.json と同じ値。書き出されないサーキット・年は無い）。
+    """
+    trends = [
+        trend.assign(circuitRef=row["circuitRef"])
+        for row, _, trend in circuit_trends(frames, min_years)
+        if not trend.empty
+    ]
+    columns = ["circuitRef", "year", "pole", "fastest"]
+    if not trends:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(trends, ignore_index=True)[columns]
@@ -0,0 +1,206 @@
+"""静的 JSON と同じ形を返すローカル HTTP API（scripts/serve_api.py から起動）。
+
+    GET /data/{circuit}_driver_laps.json      ?session=Q&from=2010&to=2020&driver=HAM,VER
+    GET /data/constructors/{circuit}.json     ?session=R&from=...&to=...&constructor=Ferrari
+    GET /data/{circuit}_lap_times.json        ?from=...&to=...
+
+起動時に共通フレームを 1 回だけ集計し、サーキットごとの列（NumPy 配列、
+emit.py の finish_columns() 済み）をメモリに持つ。リクエストごとに列を
+マスクで絞り込み、writer.dumps_columns() でコンパクト JSON にする。
+フィルターなしのレスポンスは build.py --compact の静的ファイルと同じバイト列。
+
+シリアライズ済みのレスポンスは (パス, 正規化したフィルター) をキーに LRU で持ち、
+本文の SHA-256 から作った ETag を付ける。If-None-Match が一致すれば 304 を返す。
+"""
+import hashlib
+import json
+import re
+from functools import lru_cache
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import circuit_trends
+from .emit import constructor_laps_task, driver_laps_task, finish_columns, trend_columns
+from .frames import Frames
+from .writer import dumps_columns
+
+# パス → (種類, circuit)
+ROUTES = [
+    (re.compile(r"^/data/constructors/(?P<circuit>[^/]+)\.json$"), "constructor"),
+    (re.compile(r"^/data/(?P<circuit>[^/]+)_driver_laps\.json$"), "driver"),
+    (re.compile(r"^/data/(?P<circuit>[^/]+)_lap_times\.json$"), "trend"),
+]
+
+# 種類ごとに使えるフィルター（名前 → 絞り込む列）
+ENTITY_FILTERS = {"driver": ("driver", "driverId"), "constructor": ("constructor", "constructorName")}
+
+
+class BadRequest(ValueError):
+    pass
+
+
+class LapStore:
+    """サーキットごとの集計済みの列と、シリアライズ済みレスポンスの LRU。"""
+
+    def __init__(
+        self,
+        driver_agg: pd.DataFrame,
+        constructor_agg: pd.DataFrame,
+        frames: Frames,
+        cache_size: int = 1024,
+    ):
+        self.columns: dict[str, dict[str, dict]] = {"driver": {}, "constructor": {}, "trend": {}}
+        for circuit_ref, sub in driver_agg.groupby("circuitRef", observed=True):
+            self.columns["driver"][str(circuit_ref)] = finish_columns(
+                driver_laps_task(sub, None)
+            )
+        for circuit_key, sub in constructor_agg.groupby("circuitKey", observed=True):
+            self.columns["constructor"][str(circuit_key)] = finish_columns(
+                constructor_laps_task(sub, None)
+            )
+        for _, slug, trend in circuit_trends(frames):
+            if not trend.empty:
+                self.columns["trend"][slug] = trend_columns(trend)
+
+        self._render_cached = lru_cache(maxsize=cache_size)(self._render)
+
+    def render(self, kind: str, circuit: str, filters: tuple) -> tuple[bytes, str] | None:
+        """(本文, ETag) を返す。サーキットが無ければ None。
+
+        無いサーキットは LRU に入れない（でたらめなパスを大量に叩かれても
+        本物のレスポンスがキャッシュから追い出されないように）。
+        """
+        if circuit not in self.columns[kind]:
+            return None
+        return self._render_cached(kind, circuit, filters)
+
+    def _render(self, kind: str, circuit: str, filters: tuple) -> tuple[bytes, str]:
+        columns = self.columns[kind][circuit]
+
+        mask = np.ones(len(columns["year"]), dtype=bool)
+        for name, value in filters:
+            if name == "from":
+                mask &= columns["year"] >= value
+            elif name == "to":
+                mask &= columns["year"] <= value
+            elif name == "session":
+                mask &= columns["session"] == value
+            else:
+                mask &= np.isin(columns[ENTITY_FILTERS[kind][1]], list(value))
+        if not mask.all():
+            columns = {k: v[mask] for k, v in columns.items()}
+
+        body = dumps_columns(columns, indent=None).encode("utf-8")
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        return body, etag
+
+    def parse_filters(self, kind: str, query: str) -> tuple:
+        """クエリ文字列を、キャッシュのキーに使える正規化したタプルにする。"""
+        params = parse_qs(query)
+        allowed = {"from", "to"}
+        if kind != "trend":
+            allowed.add("session")
+        if kind in ENTITY_FILTERS:
+            allowed.add(ENTITY_FILTERS[kind][0])
+        unknown = set(params) - allowed
+        if unknown:
+            raise BadRequest(f"unknown parameter: {', '.join(sorted(unknown))}")
+
+        filters = []
+        for name in ("from", "to"):
+            if name in params:
+                try:
+                    filters.append((name, int(params[name][-1])))
+                except ValueError:
+                    raise BadRequest(f"{name} must be a year") from None
+        if "session" in params:
+            session = params["session"][-1]
+            if session not in ("Q", "R"):
+                raise BadRequest("session must be Q or R")
+            filters.append(("session", session))
+        if kind in ENTITY_FILTERS and ENTITY_FILTERS[kind][0] in params:
+            name = ENTITY_FILTERS[kind][0]
+            values = {v for raw in params[name] for v in raw.split(",") if v}
+            filters.append((name, tuple(sorted(values))))
+        return tuple(filters)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match のどれかのタグが etag と一致するか（弱い比較。"*" は常に一致）。
+
+    ヘッダーはカンマ区切りのタグの並びなので、部分文字列ではなくタグ単位で比べる。
+    """
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:].strip()
+        if tag == etag:
+            return True
+    return False
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    # ヘッダーと本文を 1 回で送る（分けると遅延 ACK で 1 リクエスト 40ms 待つ）
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    store: LapStore = None
+    quiet = False
+
+    def _send(self, status: HTTPStatus, body: bytes = b"", etag: str | None = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Access-Control-Allow-Origin", "*")
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _error(self, status: HTTPStatus, message: str):
+        self._send(status, json.dumps({"error": message}).encode("utf-8"))
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        for pattern, kind in ROUTES:
+            m = pattern.match(url.path)
+            if m:
+                break
+        else:
+            return self._error(HTTPStatus.NOT_FOUND, "not found")
+
+        try:
+            filters = self.store.parse_filters(kind, url.query)
+        except BadRequest as e:
+            return self._error(HTTPStatus.BAD_REQUEST, str(e))
+
+        rendered = self.store.render(kind, m["circuit"], filters)
+        if rendered is None:
+            return self._error(HTTPStatus.NOT_FOUND, f"unknown circuit: {m['circuit']}")
+        body, etag = rendered
+
+        if etag_matches(self.headers.get("If-None-Match"), etag):
+            return self._send(HTTPStatus.NOT_MODIFIED, etag=etag)
+        self._send(HTTPStatus.OK, body, etag)
+
+    do_HEAD = do_GET
+
+    def log_message(self, *args):
+        if not self.quiet:
+            super().log_message(*args)
+
+
+def make_server(store: LapStore, host: str = "127.0.0.1", port: int = 8000, quiet: bool = False):
+    """store を返す ThreadingHTTPServer を作る（serve_forever() は呼び出し側で）。"""
+    handler = type("Handler", (ApiHandler,), {"store": store, "quiet": quiet})
+    return ThreadingHTTPServer((host, port), handler)
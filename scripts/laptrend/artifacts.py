@@ -0,0 +1,63 @@
+"""配信用のビルドマニフェスト（public/data/manifest.json）。
+
+書き出した JSON ごとに、論理名（出力ルートからの相対パス）→
+{sha256, size, gzip, br} を記録する。値は書き込み時に writer.write_text()
+が返したものをそのまま使うので、ファイルを読み直さない。
+ページ側は ?v={sha256 の先頭} などでファイルを指せば、immutable で長期
+キャッシュできる。
+
+インクリメンタルビルドで書き直さなかったファイルは、前回のマニフェストの
+値を引き継ぐ（ファイルが消えていれば外す）。
+"""
+import json
+from pathlib import Path
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+class ArtifactManifest:
+    """書き出したファイルのハッシュとサイズを集めて manifest.json に書く。
+
+    roots : 論理名を決める出力ルート（先に書いたものが優先）
+    precompress : 各ファイルの .gz / .br も書くか（WriteTask などに渡す）
+    """
+
+    def __init__(self, path: Path, roots: list[Path], precompress: bool = True):
+        self.path = path
+        self.roots = [Path(r).resolve() for r in roots]
+        self.precompress = precompress
+        self.files: dict[str, dict] = {}
+        if path.exists():
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if data.get("version") == MANIFEST_VERSION:
+                self.files = data["files"]
+
+    def logical_name(self, out_path: Path) -> str:
+        out_path = Path(out_path).resolve()
+        for root in self.roots:
+            if out_path.is_relative_to(root):
+                return out_path.relative_to(root).as_posix()
+        # どのルートの下でもなければ絶対パスのまま
+        return out_path.as_posix()
+
+    def _exists(self, name: str) -> bool:
+        path = Path(name)
+        if path.is_absolute():
+            return path.exists()
+        return any((root / name).exists() for root in self.roots)
+
+    def add(self, out_path: Path, info: dict) -> None:
+        self.files[self.logical_name(out_path)] = info
+
+    def save(self) -> None:
+        # 前回分のうち、もう存在しないファイルは外す
+        files = {
+            name: info
+            for name, info in sorted(self.files.items())
+            if self._exists(name)
+        }
+        data = {"version": MANIFEST_VERSION, "files": files}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+        print(f"Wrote {self.path} ({len(files)} files)")
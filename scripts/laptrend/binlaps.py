@@ -0,0 +1,140 @@
+"""driver_laps / constructors のバイナリ形式（--binary）。
+
+クライアントが JSON をパースせず、ArrayBuffer をそのまま型付き配列
+（Int16Array / Uint8Array / Uint16Array / Float32Array）として使えるようにする。
+数値はすべてリトルエンディアン、各列の先頭は 4 バイト境界に揃える。
+
+    ヘッダー（40 バイト）
+      0  char[4]  magic "F1LB"
+      4  uint16   version（1）
+      6  uint16   ヘッダーのバイト数（40）
+      8  uint32   n（レコード数）
+     12  uint32   文字列の数
+     16  uint32   文字列テーブルの位置     20  uint32  そのバイト数
+     24  uint32   year の位置              28  uint32  session の位置
+     32  uint32   entity の位置            36  uint32  lapTime の位置
+    文字列テーブル  UTF-8 を NUL 区切りで並べたもの。
+                    0 番目はエンティティの列名（"driverId" / "constructorName"）、
+                    1 番目以降はエンティティ名（ソート済み）
+    year     int16[n]
+    session  uint8[n]    SESSIONS の添字（0 = "Q", 1 = "R"）
+    entity   uint16[n]   文字列テーブルの添字
+    lapTime  float32[n]  秒（JSON と同じく小数 3 桁に丸めた値）
+
+レコードの順は JSON と同じ。float32 でも小数 3 桁に丸め直せば JSON の値に戻る
+（decode_laps() / to_records() で確かめられる）。
+
+ブラウザ側では例えば
+    const h = new DataView(buf), n = h.getUint32(8, true);
+    const lapTime = new Float32Array(buf, h.getUint32(36, true), n);
+"""
+import struct
+
+import numpy as np
+
+MAGIC = b"F1LB"
+VERSION = 1
+SESSIONS = ("Q", "R")
+
+_HEADER = struct.Struct("<4sHHIIIIIIII")
+HEADER_SIZE = _HEADER.size  # 40
+
+# (列, dtype)。エンティティの列は 3 番目
+_COLUMNS = (("year", "<i2"), ("session", "u1"), ("entity", "<u2"), ("lapTime", "<f4"))
+
+
+def _align(offset: int) -> int:
+    return (offset + 3) & ~3
+
+
+def encode_laps(columns: dict) -> bytes:
+    """{year, session, エンティティ, lapTime} の列（この順）をバイナリにする。"""
+    year_key, session_key, entity_key, time_key = list(columns)
+    year = np.asarray(columns[year_key])
+    session = np.asarray(columns[session_key]).astype(str)
+    entity = np.asarray(columns[entity_key]).astype(str)
+    lap_time = np.asarray(columns[time_key], dtype="float64")
+    n = len(year)
+
+    names = np.unique(entity)
+    if len(names) + 1 > np.iinfo(np.uint16).max:
+        raise ValueError(f"{entity_key}: エンティティが多すぎます（{len(names)}）")
+    if n and (year.min() < np.iinfo(np.int16).min or year.max() > np.iinfo(np.int16).max):
+        raise ValueError(f"{year_key}: int16 に収まりません")
+    unknown = set(session.tolist()) - set(SESSIONS)
+    if unknown:
+        raise ValueError(f"{session_key}: 不明なセッション {sorted(unknown)}")
+
+    strings = [entity_key] + names.tolist()
+    table = "\0".join(strings).encode("utf-8")
+    arrays = [
+        year.astype("<i2"),
+        np.searchsorted(np.array(SESSIONS), session).astype("u1"),
+        (np.searchsorted(names, entity) + 1).astype("<u2"),
+        lap_time.astype("<f4"),
+    ]
+
+    offset = _align(HEADER_SIZE + len(table))
+    offsets = []
+    for arr in arrays:
+        offsets.append(offset)
+        offset = _align(offset + arr.nbytes)
+
+    buf = bytearray(offset)
+    _HEADER.pack_into(
+        buf, 0, MAGIC, VERSION, HEADER_SIZE, n, len(strings),
+        HEADER_SIZE, len(table), *offsets,
+    )
+    buf[HEADER_SIZE:HEADER_SIZE + len(table)] = table
+    for start, arr in zip(offsets, arrays):
+        buf[start:start + arr.nbytes] = arr.tobytes()
+    return bytes(buf)
+
+
+def decode_laps(data: bytes) -> dict:
+    """バイナリを {"strings", year, session, entity, lapTime} の配列にする（コピーなし）。
+
+    おかしければ ValueError。
+    """
+    if len(data) < HEADER_SIZE:
+        raise ValueError("ヘッダーより短いです")
+    magic, version, header_size, n, n_strings, table_at, table_len, *offsets = (
+        _HEADER.unpack_from(data, 0)
+    )
+    if magic != MAGIC or version != VERSION or header_size != HEADER_SIZE:
+        raise ValueError(f"{MAGIC!r} v{VERSION} のファイルではありません")
+
+    strings = bytes(data[table_at:table_at + table_len]).decode("utf-8").split("\0")
+    if len(strings) != n_strings:
+        raise ValueError(f"文字列の数が {n_strings} ではありません（{len(strings)}）")
+
+    out = {"strings": strings}
+    for (name, dtype), start in zip(_COLUMNS, offsets):
+        if start % 4 or start + n * np.dtype(dtype).itemsize > len(data):
+            raise ValueError(f"{name}: 列の位置が不正です（{start}）")
+        out[name] = np.frombuffer(data, dtype=dtype, count=n, offset=start)
+    if n and (out["entity"].min() < 1 or out["entity"].max() >= n_strings):
+        raise ValueError("entity: 文字列テーブルの範囲外の添字があります")
+    if n and out["session"].max() >= len(SESSIONS):
+        raise ValueError("session: 不明なセッションの添字があります")
+    return out
+
+
+def to_records(decoded: dict) -> list[dict]:
+    """decode_laps() の結果を JSON と同じレコードの配列に戻す。"""
+    strings = decoded["strings"]
+    entity_key = strings[0]
+    return [
+        {
+            "year": year,
+            "session": SESSIONS[session],
+            entity_key: strings[entity],
+            "lapTime": round(lap_time, 3),
+        }
+        for year, session, entity, lap_time in zip(
+            decoded["year"].tolist(),
+            decoded["session"].tolist(),
+            decoded["entity"].tolist(),
+            decoded["lapTime"].astype("float64").tolist(),
+        )
+    ]
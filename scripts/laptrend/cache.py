@@ -0,0 +1,133 @@
+"""パース済み CSV の列指向キャッシュ。
+
+初回は CSV を読んでキャッシュを書き、2 回目以降はキャッシュから読む。
+形式は pyarrow があれば Feather、無ければ NumPy の .npz。
+元 CSV のサイズ / mtime が変わっていたら SHA-256 を比べ、
+中身が変わっていればキャッシュを作り直す。
+読み込みオプション（usecols / dtype）が前回と違う場合も作り直す。
+"""
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    import pyarrow.feather  # noqa: F401
+except ImportError:  # pragma: no cover - 環境依存
+    HAS_ARROW = False
+else:
+    HAS_ARROW = True
+
+# キャッシュ形式を変えたら上げる（古いキャッシュは自動で作り直される）
+CACHE_VERSION = 1
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _source_stamp(path: Path) -> dict:
+    st = path.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+# ---------------------------------------------------
+#  .npz 形式（pyarrow が無い環境用）
+#   数値・bool 列はそのまま、文字列列は unicode 配列 + 欠損マスクで保存する
+# ---------------------------------------------------
+def _write_npz(df: pd.DataFrame, path: Path) -> list[dict]:
+    arrays = {}
+    columns = []
+    for i, col in enumerate(df.columns):
+        s = df[col]
+        key = f"c{i}"
+        if s.dtype.kind in "iufb":
+            arrays[key] = s.to_numpy()
+            columns.append({"name": col, "kind": "numeric"})
+        else:
+            mask = s.isna().to_numpy()
+            arrays[key] = s.where(~mask, "").astype(str).to_numpy(dtype=str)
+            arrays[key + "_na"] = mask
+            columns.append({"name": col, "kind": "string", "dtype": str(s.dtype)})
+    with path.open("wb") as f:
+        np.savez(f, **arrays)
+    return columns
+
+
+def _read_npz(path: Path, columns: list[dict]) -> pd.DataFrame:
+    data = {}
+    with np.load(path, allow_pickle=False) as npz:
+        for i, meta in enumerate(columns):
+            key = f"c{i}"
+            if meta["kind"] == "numeric":
+                data[meta["name"]] = npz[key]
+                continue
+            s = pd.Series(npz[key].astype(object))
+            s[npz[key + "_na"]] = np.nan
+            if meta["dtype"] != "object":
+                s = s.astype(meta["dtype"])
+            data[meta["name"]] = s
+    return pd.DataFrame(data)
+
+
+def _cache_paths(cache_dir: Path, name: str) -> tuple[Path, Path]:
+    suffix = ".feather" if HAS_ARROW else ".npz"
+    return cache_dir / f"{name}{suffix}", cache_dir / f"{name}.meta.json"
+
+
+def read_csv_cached(
+    csv_path: Path, cache_dir: Path, options: dict | None = None
+) -> pd.DataFrame:
+    """csv_path を pd.read_csv(csv_path, **options) した結果を、キャッシュ経由で返す。
+
+    options は JSON にできる値だけ（メタデータに保存して比較する）。
+    """
+    options = options or {}
+    name = csv_path.stem
+    data_path, meta_path = _cache_paths(cache_dir, name)
+    stamp = _source_stamp(csv_path)
+
+    meta = None
+    if meta_path.exists() and data_path.exists():
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if meta.get("version") != CACHE_VERSION or meta.get("options") != options:
+            meta = None
+
+    if meta is not None and meta["source"] != stamp:
+        # サイズ / mtime が違っても、中身が同じならキャッシュを使い続ける
+        if meta["sha256"] == file_sha256(csv_path):
+            meta["source"] = stamp
+            meta_path.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        else:
+            meta = None
+
+    if meta is not None:
+        if meta["format"] == "feather":
+            return pd.read_feather(data_path)
+        return _read_npz(data_path, meta["columns"])
+
+    df = pd.read_csv(csv_path, **options)
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    meta = {
+        "version": CACHE_VERSION,
+        "options": options,
+        "source": stamp,
+        "sha256": file_sha256(csv_path),
+    }
+    if HAS_ARROW:
+        df.to_feather(data_path)
+        meta["format"] = "feather"
+    else:
+        meta["format"] = "npz"
+        meta["columns"] = _write_npz(df, data_path)
+    meta_path.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    print(f"  cached {csv_path.name} -> {data_path}")
+    return df
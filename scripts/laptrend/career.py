@@ -0,0 +1,108 @@
+"""ドライバー別・チーム別の全サーキット横断インデックス（careers/*.json）。
+
+driver_laps / constructors はサーキットごとのファイルなので、あるドライバーの
+全サーキットの推移を見るには全ファイルを読む必要がある。ここでは同じ集計
+（aggregate.driver_laps() / constructor_laps() の結果）を 1 回ソートして
+ドライバー（チーム）ごとに切り分け、1 人 1 ファイルにする。
+
+    careers/drivers/{code}.json       [{"circuit", "year", "session", "lapTime", "gap"}, ...]
+    careers/constructors/{name}.json  同上
+    careers/index.json                {"drivers": {driverCode: 相対パス}, "constructors": {...}}
+
+gap は charts/*.json の {id}_gap と同じ基準との差
+（aggregate.trend_bases() の年別 pole / fastest。Q ならポール、R なら
+lap_times の決勝最速ラップ）。基準の無いサーキット・年は null。
+lapTime は各サーキットのファイルと同じ値（ドライバーは小数 3 桁に丸め済み）。
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from .chart import GAP_BASE
+
+_UNSAFE = re.compile(r"[^a-z0-9_-]+")
+
+
+def entity_filenames(names: list[str]) -> dict[str, str]:
+    """名前 → ファイル名（小文字・英数字と _ - だけ。重なったら -2, -3 を付ける）。"""
+    out = {}
+    used = set()
+    for name in sorted(names):
+        base = _UNSAFE.sub("_", name.lower()).strip("_") or "unknown"
+        stem = base
+        n = 2
+        while stem in used:
+            stem = f"{base}-{n}"
+            n += 1
+        used.add(stem)
+        out[name] = f"{stem}.json"
+    return out
+
+
+def career_columns(
+    entity: pd.Series,
+    circuit: pd.Series,
+    year: pd.Series,
+    session: pd.Series,
+    lap_time: np.ndarray,
+    bases: pd.DataFrame,
+):
+    """(名前, 列) をエンティティ名の順に返すジェネレーター。
+
+    bases は aggregate.trend_bases() の表（gap の基準）。
+    全行を (名前, year, circuit, session) で 1 回だけ並べ替え、
+    名前が変わる位置で切り分ける（エンティティごとの groupby はしない）。
+    """
+    entity = entity.astype(str).to_numpy(dtype=str)
+    circuit = circuit.astype(str).to_numpy(dtype=str)
+    year = year.to_numpy().astype("int64")
+    session = session.astype(str).to_numpy(dtype=str)
+
+    # 行ごとの基準（Q = ポール、R = 決勝最速）。基準の無い行は NaN
+    base_by_year = pd.DataFrame({"circuitRef": circuit, "year": year}).merge(
+        bases.astype({"circuitRef": str, "year": "int64"}),
+        on=["circuitRef", "year"],
+        how="left",
+    )
+    best = np.full(len(lap_time), np.nan)
+    for sess, col in GAP_BASE.items():
+        mask = session == sess
+        best[mask] = base_by_year[col].to_numpy(dtype="float64")[mask]
+    gap = lap_time - best  # 書き出し時に小数 3 桁に丸める（NaN は null）
+
+    order = np.lexsort((session, circuit, year, entity))
+    columns = {
+        "circuit": circuit[order],
+        "year": year[order],
+        "session": session[order],
+        "lapTime": lap_time[order],
+        "gap": gap[order],
+    }
+    names = entity[order]
+    starts = np.flatnonzero(np.r_[True, names[1:] != names[:-1]]) if len(names) else []
+    ends = list(starts[1:]) + [len(names)]
+    for start, end in zip(starts, ends):
+        yield str(names[start]), {k: v[start:end] for k, v in columns.items()}
+
+
+def driver_careers(driver_agg: pd.DataFrame, bases: pd.DataFrame):
+    """aggregate.driver_laps() の結果から (driverCode, 列) を返す。"""
+    agg = driver_agg.dropna(subset=["circuitRef"])
+    # *_driver_laps.json と同じく小数 3 桁に丸めた値で比べる
+    lap_time = np.array([round(x, 3) for x in agg["lap_sec"].tolist()], dtype=np.float64)
+    return career_columns(
+        agg["driverCode"], agg["circuitRef"], agg["year"], agg["session"], lap_time, bases
+    )
+
+
+def constructor_careers(constructor_agg: pd.DataFrame, bases: pd.DataFrame):
+    """aggregate.constructor_laps() の結果から (constructorName, 列) を返す。"""
+    return career_columns(
+        constructor_agg["constructorName"],
+        constructor_agg["circuitKey"],
+        constructor_agg["year"],
+        constructor_agg["session"],
+        constructor_agg["lapTimeSec"].to_numpy(dtype="float64"),
+        bases,
+    )
@@ -0,0 +1,94 @@
+"""ページ（app/page.tsx）がそのまま描画できる横持ちのチャートデータ。
+
+driver_laps / constructors の縦持ちレコードを、セッション（Q / R）ごとに
+「年 1 行 × ドライバー（チーム）列」に並べ替え、ポール（Q）または
+レース最速ラップ（R）との差 {id}_gap も計算しておく。
+行の形は page.tsx の driverChartData / constructorChartData と同じ:
+
+    {"year": 2023, "VER": 80.123, "VER_gap": 0.0, "HAM": ..., ...}
+"""
+import pandas as pd
+
+from .aggregate import trend_bases
+from .frames import Frames
+
+SESSIONS = ("Q", "R")
+
+# セッションごとの gap の基準（年別 pole / fastest の列）
+GAP_BASE = {"Q": "pole", "R": "fastest"}
+
+
+def wide_rows(long: pd.DataFrame, base: pd.Series) -> dict:
+    """long（列 year, id, lapTime）を {"ids": [...], "rows": [...]} にする。
+
+    base は year -> 基準タイム（秒）。基準の無い年は _gap を付けない。
+    """
+    wide = long.pivot(index="year", columns="id", values="lapTime").sort_index()
+    wide = wide.reindex(columns=sorted(wide.columns))
+    gap = wide.sub(base.reindex(wide.index), axis=0)
+
+    ids = list(wide.columns)
+    rows = []
+    for year, times, gaps in zip(
+        wide.index.tolist(), wide.to_numpy().tolist(), gap.to_numpy().tolist()
+    ):
+        row = {"year": int(year)}
+        for id_, t, g in zip(ids, times, gaps):
+            if t != t:  # その年に記録なし
+                continue
+            row[id_] = t
+            if g == g:
+                row[f"{id_}_gap"] = g
+        rows.append(row)
+    return {"ids": ids, "rows": rows}
+
+
+def _sessions(long: pd.DataFrame, trend: pd.DataFrame | None) -> dict:
+    out = {}
+    for session in SESSIONS:
+        sub = long[long["session"] == session]
+        if trend is not None:
+            base = trend.set_index("year")[GAP_BASE[session]]
+        else:
+            base = pd.Series(dtype="float64")
+        out[session] = wide_rows(sub[["year", "id", "lapTime"]], base)
+    return out
+
+
+def circuit_charts(
+    driver_agg: pd.DataFrame,
+    constructor_agg: pd.DataFrame,
+    frames: Frames,
+):
+    """circuitRef 順に (circuitRef, チャートデータ) を返すジェネレーター。
+
+    driver_agg      : aggregate.driver_laps() の結果
+    constructor_agg : aggregate.constructor_laps() の結果
+    gap の基準には *_lap_times.json と同じ年別 pole / fastest を使う。
+    """
+    trends = {
+        ref: trend.drop(columns="circuitRef")
+        for ref, trend in trend_bases(frames).groupby("circuitRef", sort=False)
+    }
+
+    # JSON に書かれる値（driver_laps は小数 3 桁に丸めてある）に合わせる
+    drivers = driver_agg.dropna(subset=["circuitRef"]).assign(
+        id=lambda d: d["driverCode"].astype(str),
+        lapTime=lambda d: [round(x, 3) for x in d["lap_sec"].tolist()],
+    )
+    constructors = constructor_agg.assign(
+        id=lambda d: d["constructorName"].astype(str),
+        lapTime=lambda d: d["lapTimeSec"],
+    ).rename(columns={"circuitKey": "circuitRef"})
+
+    by_driver = {k: sub for k, sub in drivers.groupby("circuitRef", observed=True)}
+    by_team = {k: sub for k, sub in constructors.groupby("circuitRef", observed=True)}
+    empty = drivers.iloc[:0]
+
+    for circuit_ref in sorted(set(by_driver) | set(by_team)):
+        trend = trends.get(circuit_ref)
+        yield circuit_ref, {
+            "circuit": circuit_ref,
+            "drivers": _sessions(by_driver.get(circuit_ref, empty), trend),
+            "constructors": _sessions(by_team.get(circuit_ref, empty), trend),
+        }
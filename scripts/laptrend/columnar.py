@@ -0,0 +1,113 @@
+"""driver_laps / constructors の列指向（struct-of-arrays）コンパクト形式。
+
+レコードの配列 [{"year": ..., "session": ..., ...}, ...] の代わりに
+
+    {
+      "format": "columnar-v1",
+      "n": レコード数,
+      "keys": ["year", "session", "driverId", "lapTime"],   # 元のキー順
+      "yearBase": 最小の年,
+      "strings": ["ALO", "HAM", "Q", "R", ...],            # 文字列テーブル（ソート済み）
+      "stringKeys": ["session", "driverId"],              # strings を参照する列
+      "columns": {
+        "year": [0, 0, 1, ...],        # yearBase からの差
+        "session": [2, 2, 3, ...],     # strings の添字
+        "driverId": [0, 1, 0, ...],
+        "lapTime": [80.123, ...]       # 数値はそのまま
+      }
+    }
+
+を書く。キーと繰り返しの文字列を 1 回しか書かないので、レコード形式より
+ずっと小さい。decode_columnar() で元のレコード（キー順・型も同じ）に戻せる。
+"""
+import numpy as np
+
+FORMAT = "columnar-v1"
+
+# 整数のまま yearBase からの差にする列
+YEAR_KEY = "year"
+
+
+def encode_columnar(columns: dict) -> dict:
+    """{キー: 列} を列指向形式の dict にする（キー順は columns の順）。"""
+    keys = list(columns)
+    arrays = {k: np.asarray(v) for k, v in columns.items()}
+    n = len(arrays[keys[0]]) if keys else 0
+
+    str_keys = [k for k in keys if arrays[k].dtype.kind not in "iufb"]
+    if str_keys:
+        strings = np.unique(np.concatenate([arrays[k].astype(str) for k in str_keys]))
+    else:
+        strings = np.array([], dtype=str)
+
+    year_base = int(arrays[YEAR_KEY].min()) if YEAR_KEY in arrays and n else 0
+
+    encoded = {}
+    for k in keys:
+        arr = arrays[k]
+        if k in str_keys:
+            encoded[k] = np.searchsorted(strings, arr.astype(str)).tolist()
+        elif k == YEAR_KEY:
+            encoded[k] = (arr.astype(np.int64) - year_base).tolist()
+        else:
+            encoded[k] = arr.tolist()
+
+    return {
+        "format": FORMAT,
+        "n": n,
+        "keys": keys,
+        "yearBase": year_base,
+        "strings": strings.tolist(),
+        "stringKeys": str_keys,
+        "columns": encoded,
+    }
+
+
+def validate_columnar(obj: dict) -> None:
+    """列指向形式として正しいか確認する。おかしければ ValueError。"""
+    if not isinstance(obj, dict) or obj.get("format") != FORMAT:
+        raise ValueError(f"format が {FORMAT} ではありません")
+    for field in ("n", "keys", "yearBase", "strings", "stringKeys", "columns"):
+        if field not in obj:
+            raise ValueError(f"{field} がありません")
+
+    n = obj["n"]
+    columns = obj["columns"]
+    if list(columns) != obj["keys"]:
+        raise ValueError("columns のキーが keys と一致しません")
+
+    n_strings = len(obj["strings"])
+    if obj["strings"] != sorted(set(obj["strings"])):
+        raise ValueError("strings がソート済みのユニークな配列ではありません")
+
+    for k, values in columns.items():
+        if len(values) != n:
+            raise ValueError(f"{k}: 長さが n={n} と違います（{len(values)}）")
+        if k == YEAR_KEY and any(not isinstance(v, int) or v < 0 for v in values):
+            raise ValueError(f"{k}: yearBase からの差が 0 以上の整数ではありません")
+
+    for k in obj["stringKeys"]:
+        if k not in columns:
+            raise ValueError(f"stringKeys の {k} が columns にありません")
+        if any(not isinstance(v, int) or not 0 <= v < n_strings for v in columns[k]):
+            raise ValueError(f"{k}: strings の範囲外の添字があります")
+
+
+def decode_columnar(obj: dict) -> list[dict]:
+    """列指向形式を元のレコードの配列に戻す。"""
+    validate_columnar(obj)
+    strings = obj["strings"]
+    base = obj["yearBase"]
+    string_keys = set(obj["stringKeys"])
+
+    decoded = {}
+    for k, values in obj["columns"].items():
+        if k in string_keys:
+            decoded[k] = [strings[i] for i in values]
+        elif k == YEAR_KEY:
+            decoded[k] = [base + v for v in values]
+        else:
+            decoded[k] = values
+
+    keys = obj["keys"]
+    return [dict(zip(keys, row)) for row in zip(*(decoded[k] for k in keys))]
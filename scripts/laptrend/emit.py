@@ -0,0 +1,584 @@
+"""集計結果を JSON ファイルとして書き出す。
+
+indent=2 なら以前の json.dump(..., indent=2) と同じバイト列、
+indent=None なら空白なしのコンパクト形式（本番配信用）になる。
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import circuit_trends, trend_bases
+from .artifacts import ArtifactManifest
+from .binlaps import encode_laps
+from .career import constructor_careers, driver_careers, entity_filenames
+from .chart import circuit_charts
+from .columnar import encode_columnar
+from .frames import Frames
+from .specs import Spec, output_fields
+from .trendfit import trend_fits
+from .writer import dumps_object, write_bytes, write_columns, write_json, write_text
+
+
+@dataclass
+class WriteTask:
+    """1 ファイル分の書き出し。
+
+    列は NumPy 配列だけで持つので、--jobs でワーカープロセスに渡すときも
+    DataFrame ごと pickle するより小さく済む。並べ替え・丸め・シリアライズ・
+    書き込みは run_task() が行い、直列でも並列でも同じ処理になる。
+    """
+
+    out_path: Path
+    columns: dict
+    indent: int | None = 2
+    sort_keys: tuple[str, ...] = ()
+    round3: tuple[str, ...] = ()  # 小数 3 桁に丸める列
+    nullable: tuple[str, ...] = ()  # NaN を null で書く列
+    columnar_path: Path | None = None  # 列指向形式（columnar.py）も書く場合の出力先
+    binary_path: Path | None = None  # バイナリ形式（binlaps.py）も書く場合の出力先
+    precompress: bool = False  # .gz / .br も書く
+
+
+def _array(s: pd.Series) -> np.ndarray:
+    if s.dtype.kind in "iufb":
+        return s.to_numpy()
+    return s.astype(str).to_numpy(dtype=str)
+
+
+def finish_columns(task: WriteTask) -> dict:
+    """task の列を sort_keys 順に並べ、round3 の列を丸めて返す。"""
+    columns = task.columns
+    if task.sort_keys:
+        order = np.lexsort([columns[k] for k in reversed(task.sort_keys)])
+        columns = {k: v[order] for k, v in columns.items()}
+    for k in task.round3:
+        columns[k] = np.array([round(x, 3) for x in columns[k].tolist()], dtype=np.float64)
+    return columns
+
+
+def run_task(task: WriteTask) -> tuple[int, dict[Path, dict]]:
+    """task を書き出し、(レコード数, {書いたファイル: サイズ・ハッシュ}) を返す。"""
+    columns = finish_columns(task)
+    written = {
+        task.out_path: write_columns(
+            columns, task.out_path, task.indent, task.precompress, task.nullable
+        )
+    }
+    if task.columnar_path is not None:
+        written[task.columnar_path] = write_json(
+            encode_columnar(columns), task.columnar_path, None, task.precompress
+        )
+    if task.binary_path is not None:
+        written[task.binary_path] = write_bytes(
+            encode_laps(columns), task.binary_path, task.precompress
+        )
+    return len(next(iter(columns.values()), ())), written
+
+
+def run_tasks(
+    tasks: list[WriteTask],
+    jobs: int = 1,
+    artifacts: ArtifactManifest | None = None,
+) -> list[int]:
+    """tasks を書き出し、各ファイルのレコード数を tasks と同じ順で返す。
+
+    artifacts を渡すと .gz / .br も書き、書いたファイルを artifacts に記録する。
+    """
+    if artifacts is not None:
+        for task in tasks:
+            task.precompress = artifacts.precompress
+    if jobs <= 1 or len(tasks) <= 1:
+        results = [run_task(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(run_task, tasks))
+
+    if artifacts is not None:
+        for _, written in results:
+            for path, info in written.items():
+                artifacts.add(path, info)
+    return [n for n, _ in results]
+
+
+def driver_laps_task(
+    sub: pd.DataFrame,
+    out_path: Path,
+    indent: int | None = 2,
+    columnar_path: Path | None = None,
+    binary_path: Path | None = None,
+) -> WriteTask:
+    """1 サーキット分の driver_laps 集計から WriteTask を作る。"""
+    return WriteTask(
+        out_path=out_path,
+        columns={
+            "year": sub["year"].to_numpy().astype("int64"),
+            "session": _array(sub["session"]),           # "Q" または "R"
+            "driverId": _array(sub["driverCode"]),
+            "lapTime": sub["lap_sec"].to_numpy(dtype="float64"),
+        },
+        indent=indent,
+        sort_keys=("year", "session", "driverId"),
+        round3=("lapTime",),
+        columnar_path=columnar_path,
+        binary_path=binary_path,
+    )
+
+
+def constructor_laps_task(
+    sub: pd.DataFrame,
+    out_path: Path,
+    indent: int | None = 2,
+    columnar_path: Path | None = None,
+    binary_path: Path | None = None,
+) -> WriteTask:
+    """1 サーキット分の constructors 集計（ソート済み）から WriteTask を作る。"""
+    return WriteTask(
+        out_path=out_path,
+        columns={
+            "year": sub["year"].to_numpy().astype("int64"),
+            "session": _array(sub["session"]),  # "Q" or "R"
+            "constructorName": _array(sub["constructorName"]),
+            "lapTime": sub["lapTimeSec"].to_numpy(dtype="float64"),  # 秒
+        },
+        indent=indent,
+        columnar_path=columnar_path,
+        binary_path=binary_path,
+    )
+
+
+def trend_columns(trend: pd.DataFrame) -> dict:
+    """年別 pole / fastest を JSON の列に変換する。"""
+    return {
+        "year": trend["year"].to_numpy().astype("int64"),
+        "pole": trend["pole"].to_numpy(dtype="float64"),
+        "fastest": trend["fastest"].to_numpy(dtype="float64"),
+    }
+
+
+def emit_driver_laps(
+    all_grouped: pd.DataFrame,
+    out_dir: Path,
+    indent: int | None = 2,
+    changed: set[str] | None = None,
+    jobs: int = 1,
+    columnar_dir: Path | None = None,
+    artifacts: ArtifactManifest | None = None,
+    binary_dir: Path | None = None,
+) -> int:
+    """{circuitRef}_driver_laps.json を書き出し、ファイル数を返す。
+
+    changed を渡すと、そこに含まれる circuitRef だけ書き直す（インクリメンタル）。
+    jobs > 1 ならサーキットごとの書き出しをプロセスプールで並列に行う。
+    artifacts を渡すと .gz / .br も書き、manifest.json 用に記録する。
+    columnar_dir を渡すと、同じ内容の列指向形式も同じファイル名でそこに書く。
+    binary_dir を渡すと、同じ内容のバイナリ形式（拡張子 .bin）もそこに書く。
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if columnar_dir is not None:
+        columnar_dir.mkdir(parents=True, exist_ok=True)
+    if binary_dir is not None:
+        binary_dir.mkdir(parents=True, exist_ok=True)
+
+    tasks = []
+    for circuit_ref, sub in all_grouped.groupby("circuitRef", observed=True):
+        if pd.isna(circuit_ref):
+            continue
+
+        if changed is not None and circuit_ref not in changed:
+            continue
+
+        filename = f"{circuit_ref}_driver_laps.json"
+        tasks.append(
+            driver_laps_task(
+                sub,
+                out_dir / filename,
+                indent,
+                columnar_dir / filename if columnar_dir is not None else None,
+                binary_dir / Path(filename).with_suffix(".bin")
+                if binary_dir is not None
+                else None,
+            )
+        )
+
+    for task, n in zip(tasks, run_tasks(tasks, jobs, artifacts)):
+        print(f"  - wrote {task.out_path.name} ({n} records)")
+
+    return len(tasks)
+
+
+def emit_constructor_laps(
+    agg_all: pd.DataFrame,
+    out_dir: Path,
+    indent: int | None = 2,
+    changed: set[str] | None = None,
+    jobs: int = 1,
+    columnar_dir: Path | None = None,
+    artifacts: ArtifactManifest | None = None,
+    binary_dir: Path | None = None,
+) -> int:
+    """constructors/{circuitRef}.json を書き出し、ファイル数を返す。
+
+    changed を渡すと、そこに含まれる circuitRef だけ書き直す（インクリメンタル）。
+    jobs > 1 ならサーキットごとの書き出しをプロセスプールで並列に行う。
+    artifacts を渡すと .gz / .br も書き、manifest.json 用に記録する。
+    columnar_dir を渡すと、同じ内容の列指向形式も同じファイル名でそこに書く。
+    binary_dir を渡すと、同じ内容のバイナリ形式（拡張子 .bin）もそこに書く。
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if columnar_dir is not None:
+        columnar_dir.mkdir(parents=True, exist_ok=True)
+    if binary_dir is not None:
+        binary_dir.mkdir(parents=True, exist_ok=True)
+
+    tasks = []
+    for circuit_key, sub in agg_all.groupby("circuitKey", observed=True):
+        if changed is not None and circuit_key not in changed:
+            continue
+
+        filename = f"{circuit_key}.json"
+        tasks.append(
+            constructor_laps_task(
+                sub,
+                out_dir / filename,
+                indent,
+                columnar_dir / filename if columnar_dir is not None else None,
+                binary_dir / Path(filename).with_suffix(".bin")
+                if binary_dir is not None
+                else None,
+            )
+        )
+
+    run_tasks(tasks, jobs, artifacts)
+    for task in tasks:
+        print(f"Written: {task.out_path}")
+
+    return len(tasks)
+
+
+def emit_circuit_trends(
+    frames: Frames,
+    out_dir: Path,
+    indent: int | None = 2,
+    changed: set[str] | None = None,
+    jobs: int = 1,
+    artifacts: ArtifactManifest | None = None,
+) -> tuple[int, int]:
+    """{slug}_lap_times.json を書き出し、(生成数, スキップ数) を返す。
+
+    changed を渡すと、そこに含まれる slug だけ書き直す（インクリメンタル）。
+    jobs > 1 ならサーキットごとの書き出しをプロセスプールで並列に行う。
+    artifacts を渡すと .gz / .br も書き、manifest.json 用に記録する。
+    ログは並列でも circuits.csv の順に出す。
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    tasks = []
+    lines = []
+    generated = 0
+    skipped = 0
+    for row, slug, trend in circuit_trends(frames):
+        cid = int(row["circuitId"])
+        name = row["name"]
+
+        if trend.empty:
+            lines.append(f"[SKIP] {name} (circuitId={cid}) -> データ不足のためスキップ")
+            skipped += 1
+            continue
+
+        if changed is not None and slug not in changed:
+            lines.append(f"[KEEP] {name} (circuitId={cid}) -> 変更なし")
+            continue
+
+        out_path = out_dir / f"{slug}_lap_times.json"
+        tasks.append(WriteTask(out_path, trend_columns(trend), indent))
+
+        lines.append(f"[OK] {name} (circuitId={cid}) -> {out_path} に {len(trend)} レコードを書き込み")
+        generated += 1
+
+    run_tasks(tasks, jobs, artifacts)
+    for line in lines:
+        print(line)
+
+    print("===================================")
+    print(f"[SUMMARY] 生成されたサーキット数: {generated}")
+    print(f"[SUMMARY] スキップされたサーキット数: {skipped}")
+    return generated, skipped
+
+
+def emit_charts(
+    driver_agg: pd.DataFrame,
+    constructor_agg: pd.DataFrame,
+    frames: Frames,
+    out_dir: Path,
+    indent: int | None = 2,
+    changed: set[str] | None = None,
+    artifacts: ArtifactManifest | None = None,
+) -> int:
+    """charts/{circuitRef}.json（ページ用の横持ちデータ）を書き出し、ファイル数を返す。
+
+    changed を渡すと、そこに含まれる circuitRef だけ書き直す（インクリメンタル）。
+    artifacts を渡すと .gz / .br も書き、manifest.json 用に記録する。
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    count_files = 0
+    for circuit_ref, payload in circuit_charts(driver_agg, constructor_agg, frames):
+        if changed is not None and circuit_ref not in changed:
+            continue
+
+        out_path = out_dir / f"{circuit_ref}.json"
+        precompress = artifacts is not None and artifacts.precompress
+        info = write_json(payload, out_path, indent, precompress)
+        if artifacts is not None:
+            artifacts.add(out_path, info)
+
+        count_files += 1
+        print(f"  - wrote charts/{out_path.name}")
+
+    return count_files
+
+
+def emit_bundles(
+    driver_agg: pd.DataFrame,
+    constructor_agg: pd.DataFrame,
+    frames: Frames,
+    out_dir: Path,
+    indent: int | None = 2,
+    changed: set[str] | None = None,
+    artifacts: ArtifactManifest | None = None,
+) -> int:
+    """bundles/{circuitRef}.json を書き出し、ファイル数を返す。
+
+    1 サーキット分の年別 pole / fastest（trend）、ドライバー別（driverLaps）、
+    チーム別（constructorLaps）を 1 つにまとめる。中身はそれぞれ
+    *_lap_times.json / *_driver_laps.json / constructors/*.json と同じレコード。
+    changed を渡すと、そこに含まれる circuitRef だけ書き直す（インクリメンタル）。
+    artifacts を渡すと .gz / .br も書き、manifest.json 用に記録する。
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    trends = {
+        str(row["circuitRef"]): trend
+        for row, _, trend in circuit_trends(frames)
+        if not trend.empty
+    }
+    drivers = {
+        k: sub for k, sub in driver_agg.groupby("circuitRef", observed=True)
+    }
+    constructors = {
+        k: sub for k, sub in constructor_agg.groupby("circuitKey", observed=True)
+    }
+
+    count_files = 0
+    for circuit_ref in sorted(set(trends) | set(drivers) | set(constructors)):
+        if changed is not None and circuit_ref not in changed:
+            continue
+
+        out_path = out_dir / f"{circuit_ref}.json"
+        fields = {"circuit": circuit_ref, "trend": {}, "driverLaps": {}, "constructorLaps": {}}
+        if circuit_ref in trends:
+            fields["trend"] = trend_columns(trends[circuit_ref])
+        if circuit_ref in drivers:
+            fields["driverLaps"] = finish_columns(
+                driver_laps_task(drivers[circuit_ref], out_path)
+            )
+        if circuit_ref in constructors:
+            fields["constructorLaps"] = finish_columns(
+                constructor_laps_task(constructors[circuit_ref], out_path)
+            )
+
+        precompress = artifacts is not None and artifacts.precompress
+        info = write_text(dumps_object(fields, indent), out_path, precompress)
+        if artifacts is not None:
+            artifacts.add(out_path, info)
+
+        count_files += 1
+        print(f"  - wrote bundles/{out_path.name}")
+
+    return count_files
+
+
+def emit_careers(
+    driver_agg: pd.DataFrame,
+    constructor_agg: pd.DataFrame,
+    frames: Frames,
+    out_dir: Path,
+    indent: int | None = 2,
+    jobs: int = 1,
+    artifacts: ArtifactManifest | None = None,
+) -> int:
+    """careers/drivers/*.json・careers/constructors/*.json と careers/index.json を
+    書き出し、ファイル数（index.json を除く）を返す。
+
+    gap の基準は charts/*.json と同じ aggregate.trend_bases()。
+    サーキット横断なので、インクリメンタルでも毎回全部書き直す。
+    jobs > 1 ならプロセスプールで並列に書く。
+    artifacts を渡すと .gz / .br も書き、manifest.json 用に記録する。
+    """
+    bases = trend_bases(frames)
+    index = {}
+    tasks = []
+    for kind, careers in [
+        ("drivers", driver_careers(driver_agg, bases)),
+        ("constructors", constructor_careers(constructor_agg, bases)),
+    ]:
+        careers = list(careers)
+        filenames = entity_filenames([name for name, _ in careers])
+        (out_dir / kind).mkdir(parents=True, exist_ok=True)
+        index[kind] = {}
+        for name, columns in careers:
+            index[kind][name] = f"{kind}/{filenames[name]}"
+            tasks.append(
+                WriteTask(
+                    out_dir / kind / filenames[name],
+                    columns,
+                    indent,
+                    round3=("gap",),
+                    nullable=("gap",),
+                )
+            )
+
+    counts = run_tasks(tasks, jobs, artifacts)
+    precompress = artifacts is not None and artifacts.precompress
+    info = write_json(index, out_dir / "index.json", indent, precompress)
+    if artifacts is not None:
+        artifacts.add(out_dir / "index.json", info)
+
+    for kind in index:
+        n = sum(c for t, c in zip(tasks, counts) if t.out_path.parent.name == kind)
+        print(f"  - wrote {len(index[kind])} {kind} careers ({n} records)")
+    return len(tasks)
+
+
+def _pace_columns(sub: pd.DataFrame, id_key: str, id_col: str) -> dict:
+    task = WriteTask(
+        out_path=None,
+        columns={
+            "year": sub["year"].to_numpy().astype("int64"),
+            id_key: _array(sub[id_col]),
+            "laps": sub["laps"].to_numpy().astype("int64"),
+            "p10": sub["p10"].to_numpy(dtype="float64"),
+            "median": sub["median"].to_numpy(dtype="float64"),
+            "p90": sub["p90"].to_numpy(dtype="float64"),
+        },
+        sort_keys=("year", id_key),
+        round3=("p10", "median", "p90"),
+    )
+    return finish_columns(task)
+
+
+def emit_pace(
+    driver_pace: pd.DataFrame,
+    constructor_pace: pd.DataFrame | None,
+    out_dir: Path,
+    indent: int | None = 2,
+    artifacts: ArtifactManifest | None = None,
+) -> int:
+    """pace/{circuitRef}.json（決勝ペースの分位点）を書き出し、ファイル数を返す。
+
+    {"circuit", "drivers": [{year, driverId, laps, p10, median, p90}],
+     "constructors": [{year, constructorName, laps, p10, median, p90}]}
+    スケッチはサーキット横断で作るので、インクリメンタルでも毎回全部書き直す。
+    artifacts を渡すと .gz / .br も書き、manifest.json 用に記録する。
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    drivers = {k: sub for k, sub in driver_pace.groupby("circuitRef", observed=True)}
+    constructors = {}
+    if constructor_pace is not None:
+        constructors = {
+            k: sub for k, sub in constructor_pace.groupby("circuitRef", observed=True)
+        }
+
+    count_files = 0
+    for circuit_ref in sorted(set(drivers) | set(constructors)):
+        fields = {"circuit": str(circuit_ref), "drivers": {}, "constructors": {}}
+        if circuit_ref in drivers:
+            fields["drivers"] = _pace_columns(drivers[circuit_ref], "driverId", "driverCode")
+        if circuit_ref in constructors:
+            fields["constructors"] = _pace_columns(
+                constructors[circuit_ref], "constructorName", "constructorName"
+            )
+
+        out_path = out_dir / f"{circuit_ref}.json"
+        precompress = artifacts is not None and artifacts.precompress
+        info = write_text(dumps_object(fields, indent), out_path, precompress)
+        if artifacts is not None:
+            artifacts.add(out_path, info)
+
+        count_files += 1
+        print(f"  - wrote pace/{out_path.name}")
+
+    return count_files
+
+
+def emit_trend_fits(
+    driver_agg: pd.DataFrame,
+    constructor_agg: pd.DataFrame,
+    frames: Frames,
+    out_path: Path,
+    artifacts: ArtifactManifest | None = None,
+) -> int:
+    """trends.json（全系列の直線当てはめ、trendfit.py）を書き出し、系列数を返す。
+
+    ページが 1 回だけ読む引き当て用のファイルなので、--compact に関係なく
+    常にコンパクト形式で書く。
+    """
+    trends = pd.concat(
+        [trend.assign(slug=slug) for _, slug, trend in circuit_trends(frames) if not trend.empty]
+        or [pd.DataFrame(columns=["slug", "year", "pole", "fastest"])],
+        ignore_index=True,
+    )
+    fits = trend_fits(trends, driver_agg, constructor_agg)
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    precompress = artifacts is not None and artifacts.precompress
+    info = write_json(fits, out_path, None, precompress)
+    if artifacts is not None:
+        artifacts.add(out_path, info)
+
+    counts = {
+        "circuits": sum(len(v) for v in fits["circuits"].values()),
+        "drivers": sum(len(s) for v in fits["drivers"].values() for s in v.values()),
+        "constructors": sum(len(s) for v in fits["constructors"].values() for s in v.values()),
+    }
+    print(f"  - wrote {out_path.name} ({', '.join(f'{k} {v}' for k, v in counts.items())} series)")
+    return sum(counts.values())
+
+
+def emit_specs(
+    results: dict[str, pd.DataFrame],
+    specs: list[Spec],
+    out_dir: Path,
+    indent: int | None = 2,
+    jobs: int = 1,
+    artifacts: ArtifactManifest | None = None,
+) -> int:
+    """output のある spec（--spec）の結果を書き出し、ファイル数を返す。
+
+    out_dir / spec.output を output に出てくるキーの値ごとに 1 ファイルにし、
+    残りのキーと metric（小数 3 桁）の列を、キーの順に並べて書く。
+    インクリメンタルでも毎回全部書き直す。
+    """
+    tasks = []
+    for spec in specs:
+        table = results[spec.name]
+        fields = output_fields(spec)
+        rest = [k for k in spec.keys if k not in fields]
+        groups = table.groupby(fields, observed=True) if fields else [((), table)]
+        for values, sub in groups:
+            values = values if isinstance(values, tuple) else (values,)
+            out_path = out_dir / spec.output.format(**dict(zip(fields, map(str, values))))
+            out_path.parent.mkdir(parents=True, exist_ok=True)
+            columns = {k: _array(sub[k]) for k in rest}
+            columns[spec.metric] = sub[spec.metric].to_numpy(dtype="float64")
+            tasks.append(
+                WriteTask(out_path, columns, indent, tuple(rest), (spec.metric,))
+            )
+        print(f"  - {spec.name}: {len(table)} rows -> {spec.output}")
+
+    run_tasks(tasks, jobs, artifacts)
+    return len(tasks)
@@ -0,0 +1,267 @@
+"""Kaggle テーブルを 1 回だけ結合した「共通フレーム」を作る。"""
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+from . import profiling
+from . import pace as pace_sketch
+from .laps import LapMinima, lap_minima_from_frame, stream_lap_minima
+from .laptime import parse_lap_times
+
+
+# Kaggle の CSV で欠損を表す文字列
+KAGGLE_NA = r"\N"
+
+# drivers.csv に無い driverId の driverCode
+UNKNOWN_DRIVER_CODE = "DRV"
+
+# 同じコードのドライバーが複数いるとき、そのままのコードを使うドライバー
+# （コード → driverRef）。ページが id で参照するコード（src/constants/drivers.ts）
+# が driverId の小さい別人に取られる場合だけここに書く
+DRIVER_CODE_HOLDERS = {
+    "VER": "max_verstappen",  # Vergne (818) より後
+}
+
+
+@dataclass
+class Frames:
+    """全出力で共有する結合済みテーブル。
+
+    races      : raceId, year, circuitId, circuitRef
+    circuits   : circuitId, circuitRef, name（サーキット別ループ用）
+    qualifying : 予選 1 行 = 1 ドライバー。best_sec, driverCode, constructorName 付き
+    results    : 決勝リザルト。fastest_sec, driverCode 付き
+    laps       : lap_times。lap_sec, constructorName 付き
+                 （lap_times 不要、またはストリーミング集計した場合は None）
+    lap_minima : lap_times から作った最速ラップ集計（lap_times 不要なら None）
+    aggregates : specs.execute() の結果（spec 名 → 表）。同じ集計を 2 回しないため
+    """
+
+    races: pd.DataFrame
+    circuits: pd.DataFrame
+    qualifying: pd.DataFrame
+    results: pd.DataFrame | None
+    laps: pd.DataFrame | None
+    lap_minima: LapMinima | None = None
+    aggregates: dict = field(default_factory=dict)
+
+
+def build_races(races: pd.DataFrame, circuits: pd.DataFrame) -> pd.DataFrame:
+    """races に circuitRef を付ける（ファイル名に使う）。"""
+    return races[["raceId", "year", "circuitId"]].merge(
+        circuits[["circuitId", "circuitRef"]],
+        on="circuitId",
+        how="left",
+    )
+
+
+def build_constructors(constructors: pd.DataFrame) -> pd.DataFrame:
+    """constructors: constructorId -> constructorName"""
+    return constructors[["constructorId", "name"]].rename(
+        columns={"name": "constructorName"}
+    )
+
+
+def build_driver_codes(drivers: pd.DataFrame) -> pd.DataFrame:
+    """drivers: driverId -> driverCode（ドライバー 1 人につき 1 回だけ決める）
+
+    code → surname の英字だけの先頭3文字 → "DRV" の順で決める
+    （code の \\N は欠損扱い。"da Matta" は "DAM"）。
+    複数のドライバーが同じコードになる場合（VER: Vergne / Verstappen など）、
+    DRIVER_CODE_HOLDERS で決めたドライバー、公式の code を持つドライバー、
+    driverId が小さい（先にいた）ドライバーの順に優先し、先頭の 1 人だけが
+    そのままのコードを使う。後から同じコードの新人が来ても既存の持ち主は
+    変わらない。残りは "{コード}_{driverRef}" にして、集計で混ざらないようにする。
+    """
+    code = drivers["code"].astype(object).str.strip().str.upper()
+    official = code.notna() & (code != "") & (code != KAGGLE_NA)
+
+    surname = (
+        drivers["surname"].astype(object).str.replace(r"[\W\d_]+", "", regex=True)
+        .str[:3].str.upper()
+    )
+    derived = surname.where(surname.notna() & (surname != ""), UNKNOWN_DRIVER_CODE)
+
+    if "driverRef" in drivers.columns:
+        ref = drivers["driverRef"].astype(object).fillna(drivers["driverId"].astype(str))
+    else:
+        ref = drivers["driverId"].astype(str)
+
+    base = code.where(official, derived)
+    table = pd.DataFrame(
+        {
+            "driverId": drivers["driverId"],
+            "base": base,
+            "pinned": base.map(DRIVER_CODE_HOLDERS) == ref,
+            "official": official,
+            "ref": ref,
+        }
+    ).sort_values(
+        ["base", "pinned", "official", "driverId"], ascending=[True, False, False, True]
+    )
+
+    collided = table["base"].duplicated()
+    table["driverCode"] = table["base"].where(
+        ~collided, table["base"] + "_" + table["ref"]
+    )
+    print(f"Driver codes: {int(collided.sum())} colliding drivers disambiguated")
+    return table[["driverId", "driverCode"]].sort_values("driverId", ignore_index=True)
+
+
+def with_driver_codes(df: pd.DataFrame, driver_codes: pd.DataFrame) -> pd.DataFrame:
+    """df（driverId 列）に build_driver_codes() の driverCode を付ける。
+
+    drivers.csv に無い driverId は UNKNOWN_DRIVER_CODE。
+    """
+    df = df.merge(driver_codes, on="driverId", how="left")
+    df["driverCode"] = df["driverCode"].fillna(UNKNOWN_DRIVER_CODE)
+    return df
+
+
+def build_qualifying(
+    qualifying: pd.DataFrame,
+    races: pd.DataFrame,
+    driver_codes: pd.DataFrame,
+    constructors: pd.DataFrame | None,
+) -> pd.DataFrame:
+    q = qualifying.merge(races, on="raceId", how="left")
+
+    # q1, q2, q3 から最速タイム best_sec を作る
+    sec_cols = []
+    with profiling.stage("parse"):
+        for col in ["q1", "q2", "q3"]:
+            if col in q.columns:
+                q[col + "_sec"] = parse_lap_times(q[col])
+                sec_cols.append(col + "_sec")
+    q["best_sec"] = q[sec_cols].min(axis=1)
+
+    q = with_driver_codes(q, driver_codes)
+
+    if constructors is not None:
+        q = q.merge(constructors, on="constructorId", how="left")
+    return q
+
+
+def build_results(
+    results: pd.DataFrame,
+    races: pd.DataFrame,
+    driver_codes: pd.DataFrame,
+) -> pd.DataFrame:
+    if "fastestLapTime" not in results.columns:
+        raise RuntimeError("results.csv に fastestLapTime カラムがありません")
+
+    r = results.merge(races, on="raceId", how="left")
+    with profiling.stage("parse"):
+        r["fastest_sec"] = parse_lap_times(r["fastestLapTime"])
+
+    return with_driver_codes(r, driver_codes)
+
+
+def build_laps(
+    lap_times: pd.DataFrame,
+    races: pd.DataFrame,
+    results: pd.DataFrame | None,
+    constructors: pd.DataFrame | None,
+) -> pd.DataFrame:
+    lap = lap_times.copy()
+
+    # time か milliseconds から秒に変換
+    if "milliseconds" in lap.columns:
+        lap["lap_sec"] = lap["milliseconds"] / 1000.0
+    else:
+        with profiling.stage("parse"):
+            lap["lap_sec"] = parse_lap_times(lap["time"])
+    lap = lap[["raceId", "driverId", "lap", "lap_sec"]]
+
+    # 決勝の所属チームは results から引く
+    if results is not None and constructors is not None:
+        lap = lap.merge(
+            results[["raceId", "driverId", "constructorId"]],
+            on=["raceId", "driverId"],
+            how="left",
+        )
+        lap = lap.merge(constructors, on="constructorId", how="left")
+
+    return lap.merge(races, on="raceId", how="left")
+
+
+def build_frames(
+    tables: dict[str, pd.DataFrame],
+    stream_laps_from: Path | None = None,
+    chunk_rows: int | None = None,
+    pace: bool = False,
+) -> Frames:
+    """load_tables() の結果から Frames を作る。
+
+    必要なテーブルだけ渡せばよい（lap_times が無ければ laps は None）。
+    stream_laps_from に lap_times.csv を渡すと、lap_times は読み込まずに
+    chunk_rows 行ずつ読んで lap_minima だけ作る。
+    pace=True なら lap_minima に決勝ペースのスケッチも作る
+    （ドライバー別は driverId を driverCode に置き換えたもの）。
+    """
+    with profiling.stage("races") as st:
+        races = build_races(tables["races"], tables["circuits"])
+        st.rows = len(races)
+
+    constructors = tables.get("constructors")
+    if constructors is not None:
+        with profiling.stage("constructors") as st:
+            constructors = build_constructors(constructors)
+            st.rows = len(constructors)
+
+    with profiling.stage("driver_codes") as st:
+        driver_codes = build_driver_codes(tables["drivers"])
+        st.rows = len(driver_codes)
+
+    with profiling.stage("qualifying") as st:
+        qualifying = build_qualifying(
+            tables["qualifying"], races, driver_codes, constructors
+        )
+        st.rows = len(qualifying)
+    print("Enriched qualifying:", qualifying.shape)
+
+    results = None
+    if "results" in tables:
+        with profiling.stage("results") as st:
+            results = build_results(tables["results"], races, driver_codes)
+            st.rows = len(results)
+        print("Enriched results:", results.shape)
+
+    laps = None
+    lap_minima = None
+    if stream_laps_from is not None:
+        with profiling.stage("stream_laps"):
+            lap_minima = stream_lap_minima(
+                stream_laps_from,
+                races,
+                tables.get("results"),
+                constructors,
+                chunk_rows,
+                pace,
+            )
+    elif "lap_times" in tables:
+        with profiling.stage("laps") as st:
+            laps = build_laps(
+                tables["lap_times"], races, tables.get("results"), constructors
+            )
+            st.rows = len(laps)
+        print("Enriched laps:", laps.shape)
+        with profiling.stage("lap_minima"):
+            lap_minima = lap_minima_from_frame(laps, pace)
+
+    if lap_minima is not None and lap_minima.pace_driver is not None:
+        keys = ["circuitRef", "year", "driverCode"]
+        lap_minima.pace_driver = pace_sketch.merge_sketches(
+            [with_driver_codes(lap_minima.pace_driver, driver_codes)[keys + ["bucket", "count"]]],
+            keys,
+        )
+
+    return Frames(
+        races=races,
+        circuits=tables["circuits"],
+        qualifying=qualifying,
+        results=results,
+        laps=laps,
+        lap_minima=lap_minima,
+    )
@@ -0,0 +1,144 @@
+"""インクリメンタルビルド用のサーキット別フィンガープリント。
+
+出力ファイル（driver_laps / constructors / lap_times）ごとに、その中身を決める
+入力行（予選・決勝リザルト・lap_times の最小値）だけをハッシュしておき、
+前回のマニフェストと違うサーキットだけ書き直す。変わっていないファイルには
+触らないので mtime もそのまま残る。前回書いた出力ファイルが消えていれば
+フィンガープリントが同じでも書き直す。
+
+lap_times は LapMinima（サーキット×年、サーキット×年×チームの最小値）の形で
+ハッシュする。出力に効くのはこの部分だけで、ストリーミング集計でも同じ値になる。
+"""
+import hashlib
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from .aggregate import slug_from_circuit
+from .frames import Frames
+
+# フィンガープリントの作り方を変えたら上げる（全サーキット書き直しになる）
+MANIFEST_VERSION = 1
+
+
+def _slice_hashes(df: pd.DataFrame, key: str, cols: list[str]) -> dict[str, str]:
+    """df を key ごとに分け、cols の行集合（順序は無視）のハッシュを返す。"""
+    df = df.dropna(subset=[key])
+    # int / float の違い（結合で NaN が混ざるかどうか）でハッシュが変わらないようにする
+    values = df[cols].astype(
+        {c: "float64" for c in cols if df[c].dtype.kind in "iuf"}
+    )
+    rows = pd.util.hash_pandas_object(values, index=False).to_numpy()
+    frame = pd.DataFrame({"key": df[key].astype(str).to_numpy(), "h": rows})
+    frame = frame.sort_values(["key", "h"], kind="stable")
+    return {
+        k: hashlib.sha1(sub["h"].to_numpy().tobytes()).hexdigest()
+        for k, sub in frame.groupby("key", sort=False)
+    }
+
+
+def _combine(*parts: dict[str, str]) -> dict[str, str]:
+    keys = set().union(*parts)
+    return {
+        k: hashlib.sha1("|".join(p.get(k, "") for p in parts).encode()).hexdigest()
+        for k in sorted(keys)
+    }
+
+
+def circuit_fingerprints(frames: Frames, families) -> dict[str, dict[str, str]]:
+    """{出力の種類: {ファイル名のキー: フィンガープリント}} を返す。"""
+    requested = set(families)
+    # chart / bundle はドライバー別・チーム別・年別 pole / fastest の全部から作る
+    combined = requested & {"chart", "bundle"}
+    if combined:
+        families = requested | {"driver", "constructor", "trend"}
+
+    # タイムの無い行は出力に影響しないので除く
+    q = frames.qualifying.dropna(subset=["best_sec"])
+    fingerprints = {}
+
+    if "driver" in families:
+        r = frames.results.dropna(subset=["fastest_sec"])
+        fingerprints["driver"] = _combine(
+            _slice_hashes(q, "circuitRef", ["year", "driverCode", "best_sec"]),
+            _slice_hashes(r, "circuitRef", ["year", "driverCode", "fastest_sec"]),
+        )
+
+    if "constructor" in families:
+        fingerprints["constructor"] = _combine(
+            _slice_hashes(q, "circuitRef", ["year", "constructorName", "best_sec"]),
+            _slice_hashes(
+                frames.lap_minima.constructor,
+                "circuitRef",
+                ["year", "constructorName", "lap_sec"],
+            ),
+        )
+
+    if "trend" in families:
+        # lap_times.json のファイル名は circuits.csv から作る slug
+        slugs = {
+            int(row["circuitId"]): slug_from_circuit(row)
+            for _, row in frames.circuits.iterrows()
+        }
+        q_slug = q.assign(slug=q["circuitId"].map(slugs))
+        fastest = frames.lap_minima.fastest.reset_index()
+        fastest["slug"] = fastest["circuitId"].map(slugs)
+        fingerprints["trend"] = _combine(
+            _slice_hashes(q_slug, "slug", ["year", "best_sec"]),
+            _slice_hashes(fastest, "slug", ["year", "fastest"]),
+        )
+
+    if combined:
+        # charts/*.json, bundles/*.json は circuitRef ごと。trend は slug 側から引く
+        trend_by_ref = {
+            str(row["circuitRef"]): fingerprints["trend"].get(slugs[int(row["circuitId"])], "")
+            for _, row in frames.circuits.iterrows()
+        }
+        by_ref = _combine(fingerprints["driver"], fingerprints["constructor"], trend_by_ref)
+        for family in combined:
+            fingerprints[family] = by_ref
+
+    return {family: fps for family, fps in fingerprints.items() if family in requested}
+
+
+class Manifest:
+    """前回ビルドのフィンガープリント（JSON ファイル）。"""
+
+    def __init__(self, path: Path, options: dict):
+        self.path = path
+        self.header = {"version": MANIFEST_VERSION, "pandas": pd.__version__, **options}
+        # {出力の種類: {キー: [フィンガープリント, 出力ファイルがあるか]}}
+        self.fingerprints: dict[str, dict[str, list]] = {}
+        if path.exists():
+            data = json.loads(path.read_text(encoding="utf-8"))
+            # 形式や出力オプションが違う場合は全部書き直す
+            if data.get("header") == self.header:
+                self.fingerprints = data["fingerprints"]
+
+    def changed(self, family: str, current: dict[str, str], out_path_for) -> set[str]:
+        """前回とフィンガープリントが違う、または前回書いた出力が消えているキーの集合。"""
+        previous = self.fingerprints.get(family, {})
+        changed = set()
+        for key, fp in current.items():
+            prev = previous.get(key)
+            if prev is None or prev[0] != fp or (prev[1] and not out_path_for(key).exists()):
+                changed.add(key)
+        return changed
+
+    def update(self, family: str, current: dict[str, str], out_path_for) -> None:
+        # データ不足で出力しないサーキットもあるので、出力の有無も覚えておく
+        self.fingerprints[family] = {
+            key: [fp, out_path_for(key).exists()] for key, fp in current.items()
+        }
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"header": self.header, "fingerprints": self.fingerprints}
+        self.path.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def manifest_path(cache_root: Path, out_dirs: list[Path]) -> Path:
+    """出力先の組み合わせごとに別のマニフェストを使う。"""
+    key = "|".join(str(Path(d).resolve()) for d in out_dirs)
+    return cache_root / "incremental" / f"{hashlib.sha1(key.encode()).hexdigest()[:12]}.json"
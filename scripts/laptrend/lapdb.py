@@ -0,0 +1,242 @@
+"""共通フレームを SQLite に入れて、集計をその場のクエリで引く。
+
+    conn = lapdb.connect()
+    lapdb.driver_bests(conn, driver="HAM", session="Q")   # 全サーキットの HAM の予選ベスト
+    lapdb.top_poles(conn, 10)                            # 歴代最速ポール 10 件
+
+テーブル（ingest() で作る）
+  circuits     : circuitId, circuitRef, name
+  session_laps : 1 行 = 1 ドライバーの 1 レース分のベスト。
+                 session "Q"（q1〜q3 の最速）/ "R"（results.fastestLapTime）
+                 circuitRef, year, session, raceId, driverCode, constructorName, lap_sec
+  race_laps    : lap_times の全周回。circuitRef, year, raceId, driverId, lap,
+                 constructorName, lap_sec
+
+集計は aggregate.py と同じ定義で、
+  pole_fastest      : *_lap_times.json（pole は session_laps の Q、fastest は race_laps）
+  driver_bests      : *_driver_laps.json（session_laps の min）
+  constructor_bests : constructors/*.json（Q は session_laps、R は race_laps の min）
+返す値は出力 JSON と同じキーの dict のリスト（circuitRef 付き）。
+lapTime は丸めていない秒。
+"""
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+from .frames import Frames
+from .load import CACHE_DIR
+
+DB_PATH = CACHE_DIR.parent / "laps.sqlite"
+
+SCHEMA_VERSION = 1
+
+_INDEXES = [
+    "CREATE INDEX session_laps_circuit ON session_laps (circuitRef, year, session)",
+    "CREATE INDEX session_laps_driver ON session_laps (driverCode, session)",
+    "CREATE INDEX session_laps_constructor ON session_laps (constructorName, session)",
+    "CREATE INDEX race_laps_circuit ON race_laps (circuitRef, year)",
+    "CREATE INDEX race_laps_driver ON race_laps (driverId)",
+    "CREATE INDEX race_laps_constructor ON race_laps (constructorName)",
+]
+
+
+def _session_laps(frames: Frames, constructors: pd.DataFrame | None) -> pd.DataFrame:
+    cols = ["circuitRef", "year", "session", "raceId", "driverCode", "constructorName", "lap_sec"]
+
+    q = frames.qualifying.rename(columns={"best_sec": "lap_sec"})
+    q["session"] = "Q"
+    if "constructorName" not in q.columns:
+        q["constructorName"] = None
+
+    r = frames.results.rename(columns={"fastest_sec": "lap_sec"})
+    r["session"] = "R"
+    if constructors is not None:
+        r = r.merge(constructors, on="constructorId", how="left")
+    else:
+        r["constructorName"] = None
+
+    both = pd.concat([q[cols], r[cols]], ignore_index=True)
+    return both.dropna(subset=["lap_sec", "circuitRef", "year"])
+
+
+def _race_laps(frames: Frames) -> pd.DataFrame:
+    laps = frames.laps
+    if "constructorName" not in laps.columns:
+        laps = laps.assign(constructorName=None)
+    return laps[
+        ["circuitRef", "year", "raceId", "driverId", "lap", "constructorName", "lap_sec"]
+    ].dropna(subset=["lap_sec", "circuitRef", "year"])
+
+
+def ingest(
+    frames: Frames,
+    db_path: Path = DB_PATH,
+    constructors: pd.DataFrame | None = None,
+) -> dict[str, int]:
+    """frames を db_path に書き（作り直し）、{テーブル名: 行数} を返す。
+
+    frames.laps が必要（lap_times をストリーミング集計した Frames は不可）。
+    constructors（frames.build_constructors() の結果）を渡すと、
+    決勝の session_laps にもチーム名を付ける。
+    """
+    if frames.laps is None or frames.results is None:
+        raise RuntimeError("ingest には lap_times と results を読み込んだ Frames が必要です")
+
+    tables = {
+        "circuits": frames.circuits[["circuitId", "circuitRef", "name"]],
+        "session_laps": _session_laps(frames, constructors),
+        "race_laps": _race_laps(frames),
+    }
+
+    # 書きかけの DB を読まれないよう、別名で作ってから置き換える
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = db_path.with_name(db_path.name + ".tmp")
+    tmp_path.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        for name, df in tables.items():
+            # category 列はそのままだと TEXT にならないので object にする
+            df = df.astype({c: object for c in df.columns if df[c].dtype == "category"})
+            df.to_sql(name, conn, index=False, chunksize=50_000)
+        for sql in _INDEXES:
+            conn.execute(sql)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+    finally:
+        conn.close()
+    tmp_path.replace(db_path)
+
+    counts = {name: len(df) for name, df in tables.items()}
+    print(f"Wrote {db_path} ({', '.join(f'{k} {v}' for k, v in counts.items())})")
+    return counts
+
+
+def connect(db_path: Path = DB_PATH) -> sqlite3.Connection:
+    """ingest() 済みの DB を読み取り専用で開く。"""
+    if not db_path.exists():
+        raise FileNotFoundError(f"{db_path} がありません（scripts/lapdb.py ingest で作る）")
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version != SCHEMA_VERSION:
+        conn.close()
+        raise RuntimeError(
+            f"{db_path} のスキーマが古いです（{version} != {SCHEMA_VERSION}）。ingest し直してください"
+        )
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _where(filters: list[tuple[str, object]], years=None, year_col="year"):
+    """値が None でない (条件, 値) と年の範囲から WHERE 句とパラメータを作る。"""
+    clauses = []
+    params = []
+    for clause, value in filters:
+        if value is not None:
+            clauses.append(clause)
+            params.append(value)
+    if years is not None:
+        clauses.append(f"{year_col} BETWEEN ? AND ?")
+        params.extend(years)
+    return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def _rows(conn: sqlite3.Connection, sql: str, params) -> list[dict]:
+    return [dict(row) for row in conn.execute(sql, params)]
+
+
+def pole_fastest(
+    conn: sqlite3.Connection,
+    circuit: str | None = None,
+    years: tuple[int, int] | None = None,
+) -> list[dict]:
+    """サーキット×年の pole / fastest（両方ある年だけ）。"""
+    where, params = _where([("circuitRef = ?", circuit)], years)
+    sql = f"""
+        WITH pole AS (
+            SELECT circuitRef, year, MIN(lap_sec) AS pole FROM session_laps
+            {where} {"AND" if where else "WHERE"} session = 'Q'
+            GROUP BY circuitRef, year
+        ), fastest AS (
+            SELECT circuitRef, year, MIN(lap_sec) AS fastest FROM race_laps
+            {where}
+            GROUP BY circuitRef, year
+        )
+        SELECT circuitRef, year, pole, fastest
+        FROM pole JOIN fastest USING (circuitRef, year)
+        ORDER BY circuitRef, year
+    """
+    return _rows(conn, sql, params + params)
+
+
+def driver_bests(
+    conn: sqlite3.Connection,
+    circuit: str | None = None,
+    session: str | None = None,
+    driver: str | None = None,
+    years: tuple[int, int] | None = None,
+) -> list[dict]:
+    """サーキット×年×ドライバー×セッションのベスト。driver は driverCode。"""
+    where, params = _where(
+        [("circuitRef = ?", circuit), ("session = ?", session), ("driverCode = ?", driver)],
+        years,
+    )
+    sql = f"""
+        SELECT circuitRef, year, session, driverCode AS driverId, MIN(lap_sec) AS lapTime
+        FROM session_laps {where}
+        GROUP BY circuitRef, year, session, driverCode
+        ORDER BY circuitRef, year, session, driverCode
+    """
+    return _rows(conn, sql, params)
+
+
+def constructor_bests(
+    conn: sqlite3.Connection,
+    circuit: str | None = None,
+    session: str | None = None,
+    constructor: str | None = None,
+    years: tuple[int, int] | None = None,
+) -> list[dict]:
+    """サーキット×年×チーム×セッションのベスト（R は lap_times から）。"""
+    where, params = _where(
+        [("circuitRef = ?", circuit), ("constructorName = ?", constructor)], years
+    )
+    cond = f"{where} {'AND' if where else 'WHERE'} constructorName IS NOT NULL"
+    parts = []
+    if session in (None, "Q"):
+        parts.append(
+            f"SELECT circuitRef, year, 'Q' AS session, constructorName, MIN(lap_sec) AS lapTime "
+            f"FROM session_laps {cond} AND session = 'Q' "
+            f"GROUP BY circuitRef, year, constructorName"
+        )
+    if session in (None, "R"):
+        parts.append(
+            f"SELECT circuitRef, year, 'R' AS session, constructorName, MIN(lap_sec) AS lapTime "
+            f"FROM race_laps {cond} "
+            f"GROUP BY circuitRef, year, constructorName"
+        )
+    if not parts:
+        return []
+    sql = (
+        " UNION ALL ".join(parts)
+        + " ORDER BY circuitRef, year, session, constructorName"
+    )
+    return _rows(conn, sql, params * len(parts))
+
+
+def top_poles(conn: sqlite3.Connection, limit: int = 10) -> list[dict]:
+    """予選ベストが速い順に limit 件（サーキット×年のポールのみ）。"""
+    sql = """
+        SELECT circuitRef, year, driverCode AS driverId, lap_sec AS lapTime
+        FROM (
+            SELECT circuitRef, year, driverCode, lap_sec,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY circuitRef, year ORDER BY lap_sec, driverCode
+                   ) AS rank
+            FROM session_laps WHERE session = 'Q'
+        )
+        WHERE rank = 1
+        ORDER BY lapTime, circuitRef, year
+        LIMIT ?
+    """
+    return _rows(conn, sql, [limit])
@@ -0,0 +1,179 @@
+"""lap_times から作る最速ラップ集計（メモリ上 / チャンク読み込みの 2 通り）。
+
+どちらも同じ LapMinima を返す。ストリーミング版は lap_times.csv を
+chunk_rows 行ずつ読み、races / results / constructors の小さな対応表と
+結合してから、サーキット×年 と サーキット×年×チーム の最小値に畳み込む。
+min は結合順に依らないので、結果はメモリ上で一括計算したものと一致する。
+pace=True なら同じ走査で決勝ペースの分位点スケッチ（pace.py）も畳み込む。
+"""
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+
+from . import pace as pace_sketch
+from .laptime import parse_lap_times
+from .load import SCHEMAS, read_options
+
+FASTEST_KEYS = ["circuitId", "year"]
+CONSTRUCTOR_KEYS = ["year", "circuitRef", "constructorName"]
+
+# 1 行あたりの見積もりに掛ける係数（結合・groupby 中の一時コピー分）
+_WORKING_SET_FACTOR = 6
+_SAMPLE_ROWS = 10_000
+
+
+@dataclass
+class LapMinima:
+    """
+    fastest     : (circuitId, year) -> その年の決勝最速ラップ（秒）
+    constructor : 列 year, circuitRef, constructorName, lap_sec（チーム別の決勝ベスト）
+                  results / constructors が無い場合は None
+    pace_driver / pace_constructor :
+                  決勝ペースのスケッチ（pace.DRIVER_KEYS / CONSTRUCTOR_KEYS ごと）。
+                  pace=False で作った場合は None
+    """
+
+    fastest: pd.Series
+    constructor: pd.DataFrame | None
+    pace_driver: pd.DataFrame | None = None
+    pace_constructor: pd.DataFrame | None = None
+
+
+def _fold_fastest(laps: pd.DataFrame) -> pd.Series:
+    return (
+        laps.dropna(subset=["lap_sec"])
+        .groupby(FASTEST_KEYS, observed=True)["lap_sec"]
+        .min()
+        .rename("fastest")
+    )
+
+
+def _fold_constructor(laps: pd.DataFrame) -> pd.DataFrame:
+    laps = laps.dropna(
+        subset=["constructorId", "constructorName", "year", "circuitRef", "lap_sec"]
+    )
+    return laps.groupby(CONSTRUCTOR_KEYS, as_index=False, observed=True)["lap_sec"].min()
+
+
+def lap_minima_from_frame(laps: pd.DataFrame, pace: bool = False) -> LapMinima:
+    """frames.build_laps() の結果から LapMinima を作る（メモリ上の一括版）。"""
+    minima = LapMinima(fastest=_fold_fastest(laps), constructor=None)
+    has_team = "constructorName" in laps.columns
+    if has_team:
+        minima.constructor = _fold_constructor(laps)
+    if pace:
+        minima.pace_driver = pace_sketch.fold_sketch(laps, pace_sketch.DRIVER_KEYS)
+        if has_team:
+            minima.pace_constructor = pace_sketch.fold_sketch(
+                laps, pace_sketch.CONSTRUCTOR_KEYS
+            )
+    return minima
+
+
+def chunk_rows_for_memory(csv_path: Path, max_memory_mb: float) -> int:
+    """max_memory_mb に収まるチャンク行数を、先頭の数千行から見積もる。"""
+    sample = pd.read_csv(
+        csv_path, nrows=_SAMPLE_ROWS, **read_options(csv_path, SCHEMAS["lap_times"])
+    )
+    per_row = sample.memory_usage(deep=True).sum() / max(len(sample), 1)
+    rows = int(max_memory_mb * 1024 * 1024 / (per_row * _WORKING_SET_FACTOR))
+    return max(rows, 1_000)
+
+
+def stream_lap_minima(
+    csv_path: Path,
+    races: pd.DataFrame,
+    results: pd.DataFrame | None,
+    constructors: pd.DataFrame | None,
+    chunk_rows: int,
+    pace: bool = False,
+) -> LapMinima:
+    """lap_times.csv をチャンクごとに読み、LapMinima に畳み込む。
+
+    races        : raceId, year, circuitId, circuitRef
+    results      : raceId, driverId, constructorId（チーム別が不要なら None）
+    constructors : constructorId, constructorName
+    """
+    options = read_options(csv_path, SCHEMAS["lap_times"])
+    time_col = "milliseconds" if "milliseconds" in options["usecols"] else "time"
+    usecols = ["raceId", "driverId", time_col]
+
+    team = None
+    if results is not None and constructors is not None:
+        team = results[["raceId", "driverId", "constructorId"]].merge(
+            constructors, on="constructorId", how="left"
+        )
+
+    fastest = None
+    constructor = None
+    pace_driver = None
+    pace_constructor = None
+    n_rows = 0
+    for chunk in pd.read_csv(
+        csv_path,
+        usecols=usecols,
+        dtype={c: t for c, t in options["dtype"].items() if c in usecols},
+        chunksize=chunk_rows,
+    ):
+        n_rows += len(chunk)
+        if time_col == "milliseconds":
+            chunk["lap_sec"] = chunk["milliseconds"] / 1000.0
+        else:
+            chunk["lap_sec"] = parse_lap_times(chunk["time"])
+        chunk = chunk.drop(columns=time_col)
+
+        if team is not None:
+            chunk = chunk.merge(team, on=["raceId", "driverId"], how="left")
+        chunk = chunk.merge(races, on="raceId", how="left")
+
+        # ここまでの最小値とチャンクの最小値をまとめ直す
+        part = _fold_fastest(chunk)
+        if fastest is not None:
+            part = pd.concat([fastest, part]).groupby(level=FASTEST_KEYS).min()
+        fastest = part
+
+        if team is not None:
+            part = _fold_constructor(chunk)
+            if constructor is not None:
+                part = (
+                    pd.concat([constructor, part], ignore_index=True)
+                    .groupby(CONSTRUCTOR_KEYS, as_index=False, observed=True)["lap_sec"]
+                    .min()
+                )
+            constructor = part
+
+        if pace:
+            part = pace_sketch.fold_sketch(chunk, pace_sketch.DRIVER_KEYS)
+            if pace_driver is not None:
+                part = pace_sketch.merge_sketches([pace_driver, part], pace_sketch.DRIVER_KEYS)
+            pace_driver = part
+            if team is not None:
+                part = pace_sketch.fold_sketch(chunk, pace_sketch.CONSTRUCTOR_KEYS)
+                if pace_constructor is not None:
+                    part = pace_sketch.merge_sketches(
+                        [pace_constructor, part], pace_sketch.CONSTRUCTOR_KEYS
+                    )
+                pace_constructor = part
+
+    print(f"Streamed lap_times: {n_rows} rows in chunks of {chunk_rows}")
+
+    if fastest is None:
+        # 空の CSV
+        empty = pd.DataFrame(
+            columns=["circuitId", "year", "circuitRef", "constructorId", "constructorName", "lap_sec"]
+        )
+        fastest = _fold_fastest(empty)
+        if team is not None:
+            constructor = _fold_constructor(empty)
+        if pace:
+            empty = empty.assign(driverId=pd.Series(dtype="int32"))
+            pace_driver = pace_sketch.fold_sketch(empty, pace_sketch.DRIVER_KEYS)
+            if team is not None:
+                pace_constructor = pace_sketch.fold_sketch(empty, pace_sketch.CONSTRUCTOR_KEYS)
+    return LapMinima(
+        fastest=fastest.sort_index(),
+        constructor=constructor,
+        pace_driver=pace_driver,
+        pace_constructor=pace_constructor,
+    )
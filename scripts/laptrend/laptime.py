@@ -0,0 +1,113 @@
+"""ラップタイム文字列 → 秒 の変換（列単位でまとめて処理する）。
+
+受け付ける形式:
+  "1:23.456" -> 83.456   （M:SS.mmm、分は整数）
+  "59.123"   -> 59.123   （SS.mmm）
+  前後の空白は無視する
+NaN / "\\N" / 空文字 / それ以外の形式（"1:34:50.616" など）は NaN。
+すでに数値の列は秒としてそのまま返す。
+
+以前は各スクリプトが 1 セルずつ Python で split / float していたが、
+ここでは固定長 Unicode 配列の文字コードを直接読んで、列単位で数字を組み立てる。
+秒は「小数点を除いた整数 / 10**小数桁数」で計算するので、
+float("23.456") と同じ値（正しく丸めた値）になる。
+"""
+import numpy as np
+import pandas as pd
+
+_DIGIT_0 = ord("0")
+_COLON = ord(":")
+_DOT = ord(".")
+
+# これより桁数が多いと整数部分が float64 で正確に表せない
+_MAX_DIGITS = 15
+_POW10 = 10 ** np.arange(_MAX_DIGITS + 1, dtype=np.int64)
+
+
+def parse_lap_times(values) -> pd.Series:
+    """values（Series / 配列）を秒の float64 Series に変換する。"""
+    s = values if isinstance(values, pd.Series) else pd.Series(values)
+
+    if s.dtype.kind in "iufb":
+        return s.astype("float64")
+
+    text = np.strings.strip(s.fillna("").to_numpy(dtype=str))
+    n = len(text)
+    width = text.dtype.itemsize // 4
+    if n == 0 or width == 0:
+        return pd.Series(np.full(n, np.nan), index=s.index)
+
+    # (行, 文字位置) の UCS-4 コード。短い文字列の後ろは 0 で埋まっている
+    codes = text.view(np.uint32).reshape(n, width).astype(np.int64)
+    out = np.full(n, np.nan)
+
+    # ほとんどのセルは "M:SS.mmm" なので、まず固定位置で一気に処理する
+    fast = _fixed_layout_mask(codes)
+    if fast.any():
+        d = codes[fast, :8] - _DIGIT_0
+        out[fast] = d[:, 0] * 60.0 + (
+            d[:, 2] * 10000 + d[:, 3] * 1000 + d[:, 5] * 100 + d[:, 6] * 10 + d[:, 7]
+        ) / 1000.0
+
+    # 残り（"\\N" や空文字を除く）は汎用パスで
+    first = codes[:, 0]
+    rest = ~fast & (((first >= _DIGIT_0) & (first <= _DIGIT_0 + 9)) | (first == _DOT))
+    if rest.any():
+        out[rest] = _parse_general(codes[rest])
+
+    return pd.Series(out, index=s.index)
+
+
+def _fixed_layout_mask(codes: np.ndarray) -> np.ndarray:
+    """"M:SS.mmm"（ちょうど 8 文字）の行。"""
+    n, width = codes.shape
+    if width < 8:
+        return np.zeros(n, dtype=bool)
+    mask = (codes[:, 1] == _COLON) & (codes[:, 4] == _DOT)
+    for j in (0, 2, 3, 5, 6, 7):
+        mask &= (codes[:, j] >= _DIGIT_0) & (codes[:, j] <= _DIGIT_0 + 9)
+    if width > 8:
+        mask &= codes[:, 8] == 0
+    return mask
+
+
+def _parse_general(codes: np.ndarray) -> np.ndarray:
+    """任意長の "(M:)SS(.mmm)" をパースする。不正な行は NaN。"""
+    digit = codes - _DIGIT_0
+    is_digit = (digit >= 0) & (digit <= 9)
+    is_colon = codes == _COLON
+    is_dot = codes == _DOT
+
+    has_colon = is_colon.any(axis=1)
+    colon_seen = np.cumsum(is_colon, axis=1) > 0
+    dot_seen = np.cumsum(is_dot, axis=1) > 0
+
+    in_minutes = is_digit & has_colon[:, None] & ~colon_seen
+    in_seconds = is_digit & ~in_minutes
+    n_min_digits = in_minutes.sum(axis=1)
+    n_sec_digits = in_seconds.sum(axis=1)
+    n_frac_digits = (in_seconds & dot_seen).sum(axis=1)
+
+    valid = (is_digit | is_colon | is_dot | (codes == 0)).all(axis=1)
+    valid &= (is_colon.sum(axis=1) <= 1) & (is_dot.sum(axis=1) <= 1)
+    # 小数点のあとにコロンが来るのは不正
+    valid &= ~(is_colon & dot_seen).any(axis=1)
+    valid &= (n_sec_digits >= 1) & (~has_colon | (n_min_digits >= 1))
+    valid &= (n_min_digits <= _MAX_DIGITS) & (n_sec_digits <= _MAX_DIGITS)
+
+    minutes = _digits_to_int(digit, in_minutes)
+    seconds = _digits_to_int(digit, in_seconds)
+
+    out = np.full(len(codes), np.nan)
+    out[valid] = minutes[valid] * 60.0 + (
+        seconds[valid] / np.power(10.0, n_frac_digits[valid])
+    )
+    return out
+
+
+def _digits_to_int(digit: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """各行で mask の位置の数字を左から並べた整数を返す。"""
+    # 右から数えた桁位置（その桁より右にある対象桁の数）
+    place = np.cumsum(mask[:, ::-1], axis=1)[:, ::-1] - 1
+    place = np.clip(place, 0, _MAX_DIGITS)
+    return np.where(mask, digit * _POW10[place], 0).sum(axis=1)
@@ -0,0 +1,174 @@
+"""Kaggle の CSV 読み込み。"""
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from . import profiling
+from .cache import read_csv_cached
+
+# プロジェクトルート（F1-lap-trend）
+ROOT = Path(__file__).resolve().parents[2]
+
+# Kaggle CSV の置き場所
+RAW_DIR = ROOT / "public" / "data" / "f1-kaggle"
+
+# 出力先
+OUT_DIR = ROOT / "public" / "data"
+CONSTRUCTOR_DIR = OUT_DIR / "constructors"
+CHART_DIR = OUT_DIR / "charts"
+BUNDLE_DIR = OUT_DIR / "bundles"
+CAREER_DIR = OUT_DIR / "careers"
+PACE_DIR = OUT_DIR / "pace"
+COLUMNAR_DIR = OUT_DIR / "columnar"  # 列指向形式（--columnar）
+BINARY_DIR = OUT_DIR / "bin"  # バイナリ形式（--binary）
+TREND_DIR = ROOT / "f1-laptrend-data" / "circuit_json"
+
+# パース済み CSV のキャッシュ置き場（git 管理外）
+CACHE_DIR = ROOT / ".cache" / "f1-kaggle"
+
+TABLES = (
+    "races",
+    "circuits",
+    "drivers",
+    "constructors",
+    "qualifying",
+    "results",
+    "lap_times",
+)
+
+# テーブルごとに読み込む列と dtype（None は read_csv の推論に任せる）。
+# 使わない列は読まず、id は int32、year / lap は int16、
+# 繰り返しの多い文字列は category にしてメモリを抑える。
+# タイムの文字列は parse_lap_times() で float64 秒にする
+# （出力 JSON は秒を repr で書くので float32 にはしない）。
+SCHEMAS = {
+    "races": {"raceId": "int32", "year": "int16", "circuitId": "int32"},
+    "circuits": {"circuitId": "int32", "circuitRef": "category", "name": "category"},
+    "drivers": {
+        "driverId": "int32",
+        "driverRef": None,
+        "code": "category",
+        "surname": None,
+    },
+    "constructors": {"constructorId": "int32", "name": "category"},
+    "qualifying": {
+        "raceId": "int32",
+        "driverId": "int32",
+        "constructorId": "int32",
+        "q1": None,
+        "q2": None,
+        "q3": None,
+    },
+    "results": {
+        "raceId": "int32",
+        "driverId": "int32",
+        "constructorId": "int32",
+        "fastestLapTime": None,
+    },
+    "lap_times": {
+        "raceId": "int32",
+        "driverId": "int32",
+        "lap": "int16",
+        "time": None,
+        "milliseconds": "int32",
+    },
+}
+
+
+# load_tables() で同時に読むテーブル数の上限
+LOAD_WORKERS = 4
+
+
+def cache_dir_for(raw_dir: Path, cache_root: Path = CACHE_DIR) -> Path:
+    """raw_dir ごとに別のキャッシュディレクトリを使う。"""
+    key = hashlib.sha1(str(Path(raw_dir).resolve()).encode("utf-8")).hexdigest()[:12]
+    return cache_root / key
+
+
+def read_options(csv_path: Path, schema: dict | None) -> dict:
+    """schema から pd.read_csv の usecols / dtype を作る（CSV に無い列は除く）。"""
+    if schema is None:
+        return {}
+    header = pd.read_csv(csv_path, nrows=0).columns
+    usecols = [c for c in header if c in schema]
+    return {
+        "usecols": usecols,
+        "dtype": {c: schema[c] for c in usecols if schema[c] is not None},
+    }
+
+
+def require_tables(raw_dir: Path, names) -> None:
+    """names の CSV が raw_dir に全部あるか確かめ、無ければ FileNotFoundError。
+
+    読み込みを始める前に呼び、途中まで処理してから落ちないようにする。
+    """
+    missing = [f"{name}.csv" for name in names if not (raw_dir / f"{name}.csv").exists()]
+    if missing:
+        raise FileNotFoundError(
+            f"{raw_dir} に {', '.join(missing)} がありません"
+            "（Kaggle の F1 データセットから置くか、--only でそのファイルが要らない出力だけ生成する）"
+        )
+
+
+def _read_table(
+    csv_path: Path, schema: dict | None, cache_dir: Path | None
+) -> tuple[pd.DataFrame, float]:
+    start = time.perf_counter()
+    options = read_options(csv_path, schema)
+    if cache_dir is None:
+        df = pd.read_csv(csv_path, **options)
+    else:
+        df = read_csv_cached(csv_path, cache_dir, options)
+    return df, time.perf_counter() - start
+
+
+def load_tables(
+    raw_dir: Path = RAW_DIR,
+    names=TABLES,
+    cache_root: Path | None = CACHE_DIR,
+    lean: bool = True,
+    workers: int = LOAD_WORKERS,
+) -> dict[str, pd.DataFrame]:
+    """``names`` の CSV を読み込んで {テーブル名: DataFrame} を返す。
+
+    テーブルは互いに独立なので、最大 workers 本のスレッドで同時に読む
+    （C パーサーは GIL を離して動くので、全体は一番大きいファイルの時間に近づく）。
+    足りない CSV があれば、読み始める前に FileNotFoundError を出す。
+    cache_root が None ならキャッシュを使わず毎回 CSV をパースする。
+    lean=True なら SCHEMAS の列だけをコンパクトな dtype で読む
+    （False は全列をデフォルトの dtype で読む。メモリ比較用）。
+    """
+    names = list(names)
+    require_tables(raw_dir, names)
+    cache_dir = cache_dir_for(raw_dir, cache_root) if cache_root is not None else None
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(names)))) as pool:
+        futures = {
+            name: pool.submit(
+                _read_table,
+                raw_dir / f"{name}.csv",
+                SCHEMAS.get(name) if lean else None,
+                cache_dir,
+            )
+            for name in names
+        }
+        # 結果とログは names の順（終わった順ではない）
+        results = {name: future.result() for name, future in futures.items()}
+    elapsed = time.perf_counter() - start
+
+    tables = {}
+    for name, (df, seconds) in results.items():
+        tables[name] = df
+        profiling.record(name, seconds, len(df))
+        print(f"Loaded {name}: {df.shape} in {seconds:.2f} s")
+    if results:
+        slowest = max(results, key=lambda n: results[n][1])
+        print(
+            f"Loaded {len(results)} tables in {elapsed:.2f} s "
+            f"(slowest: {slowest} {results[slowest][1]:.2f} s)"
+        )
+    return tables
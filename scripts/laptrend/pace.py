@@ -0,0 +1,79 @@
+"""決勝ペース（周回タイムの分布）を、マージできる分位点スケッチで集計する。
+
+最速ラップ 1 本は外れ値に左右されるので、lap_times の全周回から
+(サーキット, 年, ドライバー) と (サーキット, 年, チーム) ごとの
+p10 / median / p90 と周回数を出す。
+
+スケッチは相対誤差 RELATIVE_ACCURACY の対数バケット（DDSketch と同じ考え方）:
+タイム x をバケット i = ceil(log(x) / log(gamma)) に数え、
+バケットの代表値 2 gamma^i / (gamma + 1) を返す。
+スケッチは (キー..., bucket, count) の表なので、チャンクごとに作った表を
+連結して count を足せばそのまま合わさる（結果は一括で作った場合と一致する）。
+メモリはグループ数 × バケット数で頭打ちになり、周回数には比例しない。
+
+分位点 q は 0 始まりの順位 floor(q (n - 1)) の周回（pandas の
+quantile(q, interpolation="lower")）を推定し、真の値との相対誤差は
+RELATIVE_ACCURACY 以下になる。
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+RELATIVE_ACCURACY = 0.005
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+# 出力する分位点（列名 -> q）
+QUANTILES = {"p10": 0.1, "median": 0.5, "p90": 0.9}
+
+DRIVER_KEYS = ["circuitRef", "year", "driverId"]
+CONSTRUCTOR_KEYS = ["circuitRef", "year", "constructorName"]
+
+
+def bucket_of(seconds: np.ndarray) -> np.ndarray:
+    return np.ceil(np.log(seconds) / _LOG_GAMMA).astype("int32")
+
+
+def bucket_value(bucket: np.ndarray) -> np.ndarray:
+    return 2 * np.power(_GAMMA, bucket.astype("float64")) / (_GAMMA + 1)
+
+
+def fold_sketch(laps: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    """laps（keys と lap_sec の列）を (keys..., bucket, count) のスケッチにする。"""
+    laps = laps.dropna(subset=keys + ["lap_sec"])
+    laps = laps[laps["lap_sec"] > 0]
+    return (
+        laps[keys]
+        .assign(bucket=bucket_of(laps["lap_sec"].to_numpy()))
+        .groupby(keys + ["bucket"], observed=True)
+        .size()
+        .rename("count")
+        .reset_index()
+    )
+
+
+def merge_sketches(parts: list[pd.DataFrame], keys: list[str]) -> pd.DataFrame:
+    """スケッチを足し合わせる（チャンクごとのスケッチの畳み込み用）。"""
+    return (
+        pd.concat(parts, ignore_index=True)
+        .groupby(keys + ["bucket"], observed=True)["count"]
+        .sum()
+        .reset_index()
+    )
+
+
+def summarize(sketch: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    """スケッチから keys ごとの laps（周回数）と QUANTILES の列を作る。"""
+    sketch = sketch.sort_values(keys + ["bucket"], ignore_index=True)
+    grouped = sketch.groupby(keys, observed=True, sort=False)
+    cum = grouped["count"].cumsum().to_numpy()
+    n = grouped["count"].transform("sum").to_numpy()
+
+    out = grouped["count"].sum().rename("laps").reset_index()
+    for name, q in QUANTILES.items():
+        # 順位 floor(q (n - 1)) の周回を含む最初のバケット
+        hit = sketch[cum > np.floor(q * (n - 1))]
+        first = hit.groupby(keys, observed=True, sort=False)["bucket"].first()
+        out[name] = bucket_value(first.to_numpy())
+    return out
@@ -0,0 +1,155 @@
+"""ビルドのステージ別計測（--profile）。
+
+    with profiling.stage("load/races") as st:
+        df = ...
+        st.rows = len(df)
+
+計測が有効なとき（build.py --profile）だけ、ステージごとの経過時間・行数・
+ピーク RSS（ru_maxrss）の増分を記録する。無効なら stage() は何もしない。
+ステージは入れ子にでき、名前は "frames/qualifying" のように / でつなぐ。
+cprofile_dir を渡すと、一番外側のステージごとに cProfile の結果を
+{連番}-{名前}.pstats に書く（pstats / snakeviz などで読む）。
+別スレッドで測った時間は record() で今のステージの子として記録する
+（cProfile はメインスレッドしか測らない）。
+"""
+import cProfile
+import json
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+
+def peak_rss_mb() -> float:
+    """このプロセスのピーク RSS（MB）。測れない環境（Windows）では 0。"""
+    try:
+        import resource  # Unix のみ
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss は macOS ではバイト、Linux などでは KiB
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+@dataclass
+class StageRecord:
+    name: str
+    seconds: float = 0.0
+    rows: int | None = None
+    peak_rss_mb: float = 0.0
+    peak_rss_delta_mb: float = 0.0
+    pstats: str | None = None
+
+
+class Profiler:
+    def __init__(self, cprofile_dir: Path | None = None):
+        self.cprofile_dir = cprofile_dir
+        self.records: list[StageRecord] = []
+        self._stack: list[str] = []
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        full_name = "/".join(self._stack + [name])
+        record = StageRecord(full_name)
+        self.records.append(record)
+
+        profile = None
+        if self.cprofile_dir is not None and not self._stack:
+            profile = cProfile.Profile()
+
+        self._stack.append(name)
+        rss_before = peak_rss_mb()
+        start = time.perf_counter()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield record
+        finally:
+            if profile is not None:
+                profile.disable()
+            record.seconds = time.perf_counter() - start
+            record.peak_rss_mb = peak_rss_mb()
+            record.peak_rss_delta_mb = record.peak_rss_mb - rss_before
+            self._stack.pop()
+
+            if profile is not None:
+                self.cprofile_dir.mkdir(parents=True, exist_ok=True)
+                index = sum(1 for r in self.records if "/" not in r.name)
+                path = self.cprofile_dir / f"{index:02d}-{name}.pstats"
+                profile.dump_stats(path)
+                record.pstats = str(path)
+
+    def record(self, name: str, seconds: float, rows: int | None = None) -> StageRecord:
+        """別スレッドなどで測った時間を、今のステージの子として記録する。
+
+        ピーク RSS はプロセス全体の値なので、増分は 0 にする。
+        """
+        record = StageRecord(
+            "/".join(self._stack + [name]),
+            seconds=seconds,
+            rows=rows,
+            peak_rss_mb=peak_rss_mb(),
+        )
+        self.records.append(record)
+        return record
+
+    def report(self) -> dict:
+        return {
+            "total_seconds": time.perf_counter() - self._start,
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": [asdict(r) for r in self.records],
+        }
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(), indent=2) + "\n", encoding="utf-8")
+
+    def print_summary(self) -> None:
+        print("\n=== profile ===")
+        print(f"{'stage':<40} {'sec':>8} {'rows':>10} {'peak RSS':>10} {'Δ':>8}")
+        for r in self.records:
+            depth = r.name.count("/")
+            label = "  " * depth + r.name.rsplit("/", 1)[-1]
+            rows = "" if r.rows is None else str(r.rows)
+            print(
+                f"{label:<40} {r.seconds:8.3f} {rows:>10} "
+                f"{r.peak_rss_mb:9.1f}M {r.peak_rss_delta_mb:+7.1f}M"
+            )
+
+
+class _NullStage:
+    rows = None
+
+
+_active: Profiler | None = None
+
+
+def enable(cprofile_dir: Path | None = None) -> Profiler:
+    """計測を有効にし、その Profiler を返す。"""
+    global _active
+    _active = Profiler(cprofile_dir)
+    return _active
+
+
+def disable() -> None:
+    global _active
+    _active = None
+
+
+def record(name: str, seconds: float, rows: int | None = None) -> None:
+    """測り済みの時間を記録する（計測が無効なら何もしない）。"""
+    if _active is not None:
+        _active.record(name, seconds, rows)
+
+
+@contextmanager
+def stage(name: str):
+    """ステージを計測する（計測が無効なら何もしない）。"""
+    if _active is None:
+        # rows を代入されても捨てる
+        yield _NullStage()
+        return
+    with _active.stage(name) as record:
+        yield record
@@ -0,0 +1,247 @@
+"""集計の宣言（spec）と、それをまとめて実行するエグゼキューター。
+
+1 つの spec は「どの表（source）の、どの列（metric）を、どのキーごとに、
+min / max で畳むか」と、行の絞り込み（where）、書き出し先のテンプレート
+（output、out-dir からの相対パス。{キー名} がキーの値に置き換わる）を持つ。
+
+    {"name": "q_by_team_2020s", "source": "qualifying", "metric": "best_sec",
+     "keys": ["circuitRef", "constructorName", "year"],
+     "where": {"year": [2020, 2021, 2022, 2023]},
+     "output": "views/q_by_team/{circuitRef}.json"}
+
+source は build_frames() で 1 回だけ結合済みの表
+（qualifying / results / laps。races・ドライバーコード・チーム名付き）。
+
+execute() は渡された spec を一緒に計画する。source・metric・agg が同じ spec は
+1 つの走査にまとめ、全 spec のキーと where の列の和で 1 回だけ groupby した
+中間表から、spec ごとに絞り込んで自分のキーに畳み直す（min / max は
+畳み直しても結果が変わらない）。laps の spec は、build_frames() が lap_times を
+1 回走査して作った LapMinima の表がキーを含んでいればそこから畳む
+（ストリーミング集計でもそのまま使える）。結果は frames.aggregates に
+spec 名で残すので、同じ spec を使う出力がいくつあっても計算は 1 回。
+
+既存の 3 種類（*_driver_laps / constructors / *_lap_times）は BUILTIN_SPECS
+の組み込み spec で集計する。組み込み spec は output を持たず、ファイルの形は
+emit.py の各出力が決める（Q / R を 1 ファイルにまとめるなど、spec 1 つ分の表
+ではないため）。output のある spec は emit.emit_specs() がそのまま書き出す。
+"""
+import json
+import string
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+
+from .frames import Frames
+
+AGGS = ("min", "max")
+
+# source ごとに必要な CSV（build.py の FAMILY_TABLES と同じ考え方）
+SOURCE_TABLES = {
+    "qualifying": {"races", "circuits", "drivers", "constructors", "qualifying"},
+    "results": {"races", "circuits", "drivers", "results"},
+    "laps": {"races", "circuits", "drivers", "constructors", "results", "lap_times"},
+}
+
+
+class SpecError(ValueError):
+    """spec の書き方の誤り、または source に必要な列・表が無い。"""
+
+
+@dataclass(frozen=True)
+class Spec:
+    name: str
+    source: str
+    metric: str
+    keys: tuple[str, ...]
+    agg: str = "min"
+    where: tuple[tuple[str, tuple], ...] = ()  # ((列, 許す値), ...)
+    output: str | None = None
+
+    def columns(self) -> list[str]:
+        """中間表に必要な列（キー + where の列）。"""
+        cols = list(self.keys)
+        cols += [c for c, _ in self.where if c not in cols]
+        return cols
+
+
+BUILTIN_SPECS = {
+    spec.name: spec
+    for spec in [
+        # *_driver_laps.json: circuitRef × year × driverCode の Q / R ベスト
+        Spec("driver_q", "qualifying", "best_sec", ("circuitRef", "year", "driverCode")),
+        Spec("driver_r", "results", "fastest_sec", ("circuitRef", "year", "driverCode")),
+        # constructors/*.json: year × circuitRef × constructorName の Q / R ベスト
+        Spec("constructor_q", "qualifying", "best_sec", ("year", "circuitRef", "constructorName")),
+        Spec("constructor_r", "laps", "lap_sec", ("year", "circuitRef", "constructorName")),
+        # *_lap_times.json: circuitId × year の pole / fastest
+        Spec("pole", "qualifying", "best_sec", ("circuitId", "year")),
+        Spec("fastest", "laps", "lap_sec", ("circuitId", "year")),
+    ]
+}
+
+
+def spec_from_dict(d: dict) -> Spec:
+    unknown = set(d) - {"name", "source", "metric", "keys", "agg", "where", "output"}
+    if unknown:
+        raise SpecError(f"spec {d.get('name')!r}: 不明な項目 {sorted(unknown)}")
+    where = d.get("where", {})
+    spec = Spec(
+        name=d["name"],
+        source=d["source"],
+        metric=d["metric"],
+        keys=tuple(d["keys"]),
+        agg=d.get("agg", "min"),
+        where=tuple(
+            (col, tuple(v if isinstance(v, list) else [v])) for col, v in where.items()
+        ),
+        output=d.get("output"),
+    )
+    validate(spec)
+    return spec
+
+
+def load_specs(path: Path) -> list[Spec]:
+    """JSON（spec の配列）を読む。output は必須。"""
+    specs = [spec_from_dict(d) for d in json.loads(Path(path).read_text(encoding="utf-8"))]
+    names = [s.name for s in specs]
+    for spec in specs:
+        if spec.output is None:
+            raise SpecError(f"spec {spec.name!r}: output がありません（{path}）")
+        if spec.name in BUILTIN_SPECS or names.count(spec.name) > 1:
+            raise SpecError(f"spec {spec.name!r}: 名前が重複しています（{path}）")
+    return specs
+
+
+def output_fields(spec: Spec) -> list[str]:
+    """output のテンプレートに出てくるキー名（ファイルの分け方）。"""
+    return [f for _, f, _, _ in string.Formatter().parse(spec.output or "") if f]
+
+
+def validate(spec: Spec) -> None:
+    if spec.source not in SOURCE_TABLES:
+        raise SpecError(f"spec {spec.name!r}: source は {sorted(SOURCE_TABLES)} のどれか")
+    if spec.agg not in AGGS:
+        raise SpecError(f"spec {spec.name!r}: agg は {AGGS} のどれか")
+    if not spec.keys:
+        raise SpecError(f"spec {spec.name!r}: keys が空です")
+    missing = [f for f in output_fields(spec) if f not in spec.keys]
+    if missing:
+        raise SpecError(f"spec {spec.name!r}: output の {missing} が keys にありません")
+
+
+@dataclass
+class Scan:
+    """1 回の走査（同じ source・metric・agg の spec をまとめたもの）。
+
+    folded が None なら source を走査して keys で groupby する。
+    folded があれば（LapMinima の表）走査せずにそこから畳む。
+    """
+
+    source: str
+    metric: str
+    agg: str
+    keys: list[str]
+    specs: list[Spec]
+    folded: pd.DataFrame | None = None
+
+
+def _folded_tables(frames: Frames) -> list[tuple[str, str, str, pd.DataFrame]]:
+    """build_frames() の時点で畳み込み済みの表（source, metric, agg, 表）。"""
+    minima = frames.lap_minima
+    if minima is None:
+        return []
+    tables = [("laps", "lap_sec", "min", minima.fastest.rename("lap_sec").reset_index())]
+    if minima.constructor is not None:
+        tables.append(("laps", "lap_sec", "min", minima.constructor))
+    return tables
+
+
+def plan(specs: list[Spec], frames: Frames) -> list[Scan]:
+    """specs を Scan にまとめる（順序は最初に出てきた spec の順）。"""
+    folded = _folded_tables(frames)
+    scans: dict[tuple, Scan] = {}
+    for spec in specs:
+        validate(spec)
+        cols = spec.columns()
+        for i, (source, metric, agg, table) in enumerate(folded):
+            if (source, metric, agg) == (spec.source, spec.metric, spec.agg) and set(
+                cols
+            ) <= set(table.columns):
+                key = ("folded", i)
+                if key not in scans:
+                    scans[key] = Scan(source, metric, agg, list(table.columns[:-1]), [], table)
+                break
+        else:
+            key = (spec.source, spec.metric, spec.agg)
+            if key not in scans:
+                scans[key] = Scan(spec.source, spec.metric, spec.agg, [], [])
+            scan = scans[key]
+            scan.keys += [c for c in cols if c not in scan.keys]
+        scans[key].specs.append(spec)
+    return list(scans.values())
+
+
+def _source_frame(frames: Frames, scan: Scan) -> pd.DataFrame:
+    df = getattr(frames, scan.source)
+    names = ", ".join(s.name for s in scan.specs)
+    if df is None:
+        raise SpecError(
+            f"spec {names}: {scan.source} がありません"
+            "（laps はストリーミング集計では LapMinima にあるキーしか使えません）"
+        )
+    missing = [c for c in scan.keys + [scan.metric] if c not in df.columns]
+    if missing:
+        raise SpecError(f"spec {names}: {scan.source} に列 {missing} がありません")
+    return df
+
+
+def run_scan(scan: Scan, frames: Frames) -> dict[str, pd.DataFrame]:
+    """scan を実行し、spec 名 → 表（spec.keys の列 + metric の列）を返す。"""
+    metric = scan.metric
+    if scan.folded is not None:
+        table = scan.folded
+    else:
+        df = _source_frame(frames, scan)
+        table = df[scan.keys + [metric]].dropna(subset=[metric])
+        if len(scan.specs) > 1:
+            # 全 spec のキーの和で 1 回だけ畳む（キーの欠損は spec ごとに落とす）
+            table = (
+                table.groupby(scan.keys, dropna=False, observed=True, sort=False)[metric]
+                .agg(scan.agg)
+                .reset_index()
+            )
+    print(
+        f"Scan {scan.source}.{metric} ({scan.agg}): {len(table)} rows"
+        f" -> {', '.join(s.name for s in scan.specs)}"
+    )
+
+    out = {}
+    for spec in scan.specs:
+        sub = table
+        for col, values in spec.where:
+            sub = sub[sub[col].isin(values)]
+        keys = list(spec.keys)
+        out[spec.name] = (
+            sub.dropna(subset=keys)
+            .groupby(keys, as_index=False, observed=True)[metric]
+            .agg(spec.agg)
+        )
+    return out
+
+
+def execute(frames: Frames, specs: list[Spec]) -> dict[str, pd.DataFrame]:
+    """specs をまとめて計画・実行し、spec 名 → 表 を返す。
+
+    結果は frames.aggregates に残し、2 回目以降は計算しない。
+    """
+    todo = [s for s in dict.fromkeys(specs) if s.name not in frames.aggregates]
+    for scan in plan(todo, frames):
+        frames.aggregates.update(run_scan(scan, frames))
+    return {s.name: frames.aggregates[s.name] for s in specs}
+
+
+def builtin(frames: Frames, *names: str) -> list[pd.DataFrame]:
+    """組み込み spec の結果を names の順に返す。"""
+    results = execute(frames, [BUILTIN_SPECS[n] for n in names])
+    return [results[n] for n in names]
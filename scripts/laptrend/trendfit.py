@@ -0,0 +1,144 @@
+"""年ごとのタイムの推移に直線を当てはめる（trends.json）。
+
+page.tsx の calculateSummary() は最初と最後のポールだけから yearlyDelta を
+出しているが、ここでは全系列（サーキット別 pole / fastest、サーキット×ドライバー、
+サーキット×チーム）をまとめて最小二乗で当てはめる。系列ごとのループはせず、
+系列番号で np.bincount した和（n, Σx, Σy, Σxx, Σxy, Σyy）から一度に計算する。
+x は系列ごとの平均年からの差にしてから和を取るので、桁落ちしない。
+
+1 系列の結果（FIELDS の順の配列）
+  n                   : 年数
+  slope / intercept   : lapTime ≈ slope * year + intercept（秒 / 年、秒）
+  r2                  : 決定係数（全年同じタイムなら 1）
+  startYear / endYear / startTime / endTime : 最初と最後の年とタイム
+  totalDelta          : startTime - endTime（calculateSummary と同じ向き。速くなれば正）
+  yearlyDelta         : totalDelta / (endYear - startYear)
+2 年未満の系列は出さない（calculateSummary と同じ）。
+"""
+import numpy as np
+import pandas as pd
+
+FIELDS = (
+    "n", "slope", "intercept", "r2",
+    "startYear", "endYear", "startTime", "endTime", "totalDelta", "yearlyDelta",
+)
+
+
+def fit_groups(keys: pd.DataFrame, year: np.ndarray, value: np.ndarray) -> pd.DataFrame:
+    """keys の行ごとの系列に直線を当てはめ、keys の列 + FIELDS の DataFrame を返す。
+
+    同じ系列の中で年は重ならないこと（集計済みの 1 年 1 値）。
+    """
+    year = np.asarray(year, dtype="float64")
+    value = np.asarray(value, dtype="float64")
+    ok = ~np.isnan(value)
+    keys, year, value = keys[ok].reset_index(drop=True), year[ok], value[ok]
+
+    codes, uniques = pd.MultiIndex.from_frame(keys.astype(str)).factorize()
+    m = len(uniques)
+
+    n = np.bincount(codes, minlength=m).astype("float64")
+    mean_x = np.bincount(codes, year, m) / n
+    mean_y = np.bincount(codes, value, m) / n
+    dx = year - mean_x[codes]
+    dy = value - mean_y[codes]
+    sxx = np.bincount(codes, dx * dx, m)
+    sxy = np.bincount(codes, dx * dy, m)
+    syy = np.bincount(codes, dy * dy, m)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = sxy / sxx
+        r2 = np.where(syy > 0, sxy * sxy / (sxx * syy), 1.0)
+    intercept = mean_y - slope * mean_x
+
+    # 最初と最後の年（系列ごとに年でソートして両端を取る）
+    order = np.lexsort((year, codes))
+    sorted_codes = codes[order]
+    first = order[np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]]
+    last = order[np.r_[sorted_codes[1:] != sorted_codes[:-1], True]]
+    start_year, end_year = year[first], year[last]
+    start_time, end_time = value[first], value[last]
+    total = start_time - end_time
+
+    out = pd.DataFrame(list(uniques), columns=list(keys.columns))
+    out["n"] = n.astype("int64")
+    out["slope"] = slope
+    out["intercept"] = intercept
+    out["r2"] = r2
+    out["startYear"] = start_year.astype("int64")
+    out["endYear"] = end_year.astype("int64")
+    out["startTime"] = start_time
+    out["endTime"] = end_time
+    out["totalDelta"] = total
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["yearlyDelta"] = total / (end_year - start_year)
+    return out[out["endYear"] > out["startYear"]].reset_index(drop=True)
+
+
+def _rows(fits: pd.DataFrame) -> list[list]:
+    """FIELDS の順の配列（n と年は整数、それ以外は小数 4 桁）にする。"""
+    values = fits[list(FIELDS)].to_numpy(dtype="float64")
+    rows = []
+    for row in values.tolist():
+        rows.append(
+            [
+                int(v) if f in ("n", "startYear", "endYear") else round(v, 4)
+                for f, v in zip(FIELDS, row)
+            ]
+        )
+    return rows
+
+
+def _nest(fits: pd.DataFrame, levels: list[str]) -> dict:
+    """levels の順に入れ子の dict にし、末端を FIELDS の配列にする。"""
+    out = {}
+    for keys, row in zip(fits[levels].itertuples(index=False), _rows(fits)):
+        node = out
+        for k in keys[:-1]:
+            node = node.setdefault(k, {})
+        node[keys[-1]] = row
+    return out
+
+
+def trend_fits(
+    circuit_trends: pd.DataFrame,
+    driver_agg: pd.DataFrame,
+    constructor_agg: pd.DataFrame,
+) -> dict:
+    """trends.json の中身を作る。
+
+    circuit_trends  : 列 slug, year, pole, fastest（*_lap_times.json と同じ値）
+    driver_agg      : aggregate.driver_laps() の結果
+    constructor_agg : aggregate.constructor_laps() の結果
+
+    {"fields": FIELDS,
+     "circuits":     {slug: {"pole": [...], "fastest": [...]}},
+     "drivers":      {circuitRef: {"Q" | "R": {driverCode: [...]}}},
+     "constructors": {circuitRef: {"Q" | "R": {constructorName: [...]}}}}
+    """
+    long = circuit_trends.melt(
+        id_vars=["slug", "year"], value_vars=["pole", "fastest"], var_name="metric"
+    )
+    circuits = fit_groups(long[["slug", "metric"]], long["year"], long["value"])
+
+    drivers = driver_agg.dropna(subset=["circuitRef"])
+    # *_driver_laps.json と同じく小数 3 桁に丸めた値に当てはめる
+    driver_times = np.array([round(x, 3) for x in drivers["lap_sec"].tolist()])
+    driver_fits = fit_groups(
+        drivers[["circuitRef", "session", "driverCode"]], drivers["year"], driver_times
+    )
+
+    constructor_fits = fit_groups(
+        constructor_agg[["circuitKey", "session", "constructorName"]],
+        constructor_agg["year"],
+        constructor_agg["lapTimeSec"],
+    )
+
+    return {
+        "fields": list(FIELDS),
+        "circuits": _nest(circuits, ["slug", "metric"]),
+        "drivers": _nest(driver_fits, ["circuitRef", "session", "driverCode"]),
+        "constructors": _nest(
+            constructor_fits, ["circuitKey", "session", "constructorName"]
+        ),
+    }
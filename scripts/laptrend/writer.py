@@ -0,0 +1,164 @@
+"""列（配列）から直接 JSON 配列を書き出すライター。
+
+``json.dump([{...}, ...], ensure_ascii=False, indent=2)`` と同じバイト列を、
+行ごとの dict / Series を作らずに列単位でエンコードして組み立てる。
+indent=None にすると空白なしのコンパクト形式（separators=(",", ":") 相当）。
+
+書き込みはすべて write_bytes() を通り、サイズと SHA-256 を返す。
+precompress=True なら同じバイト列から .gz（brotli があれば .br も）を並べて書く。
+"""
+import gzip
+import hashlib
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - 環境依存
+    brotli = None
+
+_encode_str = json.encoder.encode_basestring  # ensure_ascii=False と同じ
+
+
+def _encode_float(x: float) -> str:
+    if math.isfinite(x):
+        return float.__repr__(x)
+    if x != x:
+        return "NaN"
+    return "Infinity" if x > 0 else "-Infinity"
+
+
+def encode_column(values, null_nan: bool = False) -> list[str]:
+    """1 列分の値を JSON 表現の文字列リストにする。
+
+    整数 dtype → 整数、浮動小数 dtype → float の repr、それ以外は文字列。
+    null_nan=True なら浮動小数の NaN を null にする（値の無いセル）。
+    文字列はユニーク値ごとに 1 回だけエンコードする。
+    """
+    arr = values.to_numpy() if isinstance(values, pd.Series) else np.asarray(values)
+    kind = arr.dtype.kind
+    if kind in "iu":
+        return list(map(str, arr.tolist()))
+    if kind == "b":
+        return ["true" if v else "false" for v in arr.tolist()]
+    if kind == "f":
+        if np.isfinite(arr).all():
+            return list(map(float.__repr__, arr.tolist()))
+        if null_nan:
+            return ["null" if x != x else _encode_float(x) for x in arr.tolist()]
+        return list(map(_encode_float, arr.tolist()))
+
+    codes, uniques = pd.factorize(arr, use_na_sentinel=False)
+    encoded = np.array([_encode_str(str(u)) for u in uniques], dtype=object)
+    return encoded[codes].tolist()
+
+
+def dumps_columns(
+    columns: dict, indent: int | None = 2, nullable: tuple[str, ...] = ()
+) -> str:
+    """{キー: 列} を「キー順のオブジェクトの配列」として JSON 文字列にする。
+
+    nullable の列は NaN を null にする。
+    """
+    keys = list(columns)
+    encoded = [encode_column(columns[k], k in nullable) for k in keys]
+    n = len(encoded[0]) if encoded else 0
+    if n == 0:
+        return "[]"
+
+    # 1 レコード分のテンプレート（値の部分だけ %s）
+    if indent is None:
+        body = ",".join(f"{_encode_str(k)}:%s" for k in keys)
+        template = "{" + body + "}"
+        sep, head, tail = ",", "[", "]"
+    else:
+        pad1 = " " * indent
+        pad2 = pad1 * 2
+        body = ",\n".join(f"{pad2}{_encode_str(k)}: %s" for k in keys)
+        template = f"{pad1}{{\n{body}\n{pad1}}}"
+        sep, head, tail = ",\n", "[\n", "\n]"
+
+    rows = [template % t for t in zip(*encoded)]
+    return head + sep.join(rows) + tail
+
+
+def dumps_object(fields: dict, indent: int | None = 2) -> str:
+    """{キー: 値} を 1 つの JSON オブジェクトにする。
+
+    値が dict なら {キー: 列} とみなして dumps_columns() の配列を埋め込み、
+    それ以外（文字列・数値・リストなど）は同じ indent / separators で json.dumps する。
+    json.dumps(..., indent=indent) と同じバイト列。
+    """
+    separators = (",", ":") if indent is None else None
+    parts = []
+    for key, value in fields.items():
+        if isinstance(value, dict):
+            text = dumps_columns(value, indent)
+        else:
+            text = json.dumps(value, ensure_ascii=False, indent=indent, separators=separators)
+        if indent is not None:
+            text = text.replace("\n", "\n" + " " * indent)
+        parts.append((_encode_str(key), text))
+
+    if not parts:
+        return "{}"
+    if indent is None:
+        return "{" + ",".join(f"{k}:{v}" for k, v in parts) + "}"
+    pad = " " * indent
+    return "{\n" + ",\n".join(f"{pad}{k}: {v}" for k, v in parts) + "\n}"
+
+
+def _sibling(out_path: Path, suffix: str) -> Path:
+    return out_path.with_name(out_path.name + suffix)
+
+
+def write_bytes(data: bytes, out_path: Path, precompress: bool = False) -> dict:
+    """data を書き、{"size", "sha256"[, "gzip", "br"]} を返す。
+
+    precompress=True なら .gz / .br（圧縮後のサイズを返す）も書く。
+    False なら古い .gz / .br が残らないよう消しておく。
+    """
+    out_path.write_bytes(data)
+    info = {"size": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+
+    if not precompress:
+        for suffix in (".gz", ".br"):
+            _sibling(out_path, suffix).unlink(missing_ok=True)
+        return info
+
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    _sibling(out_path, ".gz").write_bytes(gz)
+    info["gzip"] = len(gz)
+    if brotli is not None:
+        br = brotli.compress(data, quality=11)
+        _sibling(out_path, ".br").write_bytes(br)
+        info["br"] = len(br)
+    return info
+
+
+def write_text(text: str, out_path: Path, precompress: bool = False) -> dict:
+    """text を UTF-8 で書く（write_bytes() と同じ dict を返す）。"""
+    return write_bytes(text.encode("utf-8"), out_path, precompress)
+
+
+def write_columns(
+    columns: dict,
+    out_path: Path,
+    indent: int | None = 2,
+    precompress: bool = False,
+    nullable: tuple[str, ...] = (),
+) -> dict:
+    return write_text(dumps_columns(columns, indent, nullable), out_path, precompress)
+
+
+def write_json(
+    obj, out_path: Path, indent: int | None = 2, precompress: bool = False
+) -> dict:
+    """dict などをそのまま JSON にする（列形式でない出力用）。"""
+    separators = (",", ":") if indent is None else None
+    text = json.dumps(obj, ensure_ascii=False, indent=indent, separators=separators)
+    return write_text(text, out_path, precompress)
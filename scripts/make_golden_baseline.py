@@ -0,0 +1,134 @@
+"""check_golden.py の baseline モードで使う固定データを作る。
+
+    python scripts/make_golden_baseline.py [--rev COMMIT] [--circuits 4] [--laps 12]
+
+合成データ（make_synthetic_kaggle.py）を --from-year 以降のレース、
+--circuits 個のサーキット（circuitId を割り振り直す）、各レース先頭 --laps 周の
+lap_times に絞った小さな CSV を scripts/golden/raw に書き、最初のコミット
+（--rev）の 3 本のスクリプト（generate_driver_laps_all.py、
+generate_constructor_laps_all.py、f1-laptrend-data/build_all_circuits_json.py）を
+git から取り出してそのまま実行し、出力を scripts/golden/baseline に置く
+（check_golden.py の出力ツリーと同じ trend/・data/・data/constructors/）。
+どちらもコミットしておき、パイプラインを変えても作り直さない。
+
+baseline から意図して変えた点が結果に出ないよう、次の 2 つを整える
+（それらの検査は legacy モード）。
+  - ドライバーの code は全員に重ならない 3 文字にする。baseline は \\N を
+    コードとして扱い、同じコードのドライバーを 1 人にまとめる（user-010 で直した）。
+  - 予選の 1 分未満のタイム "59.877" は "0:59.877" と書く。baseline の
+    build_all_circuits_json.py は分の無いタイムを欠損にする（user-003 で揃えた）。
+"""
+import argparse
+import itertools
+import shutil
+import string
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from laptrend.load import ROOT
+from make_synthetic_kaggle import generate
+
+GOLDEN_DIR = ROOT / "scripts" / "golden"
+
+# baseline のスクリプト（リポジトリからの相対パス）→ 出力（一時ツリーからの相対）
+BASELINE_SCRIPTS = {
+    "scripts/generate_driver_laps_all.py": ("public/data", "*_driver_laps.json", "data"),
+    "scripts/generate_constructor_laps_all.py": (
+        "public/data/constructors", "*.json", "data/constructors",
+    ),
+    "f1-laptrend-data/build_all_circuits_json.py": (
+        "f1-laptrend-data/circuit_json", "*_lap_times.json", "trend",
+    ),
+}
+
+
+def git(*args: str) -> str:
+    return subprocess.run(
+        ["git", *args], cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout
+
+
+def make_raw(raw_dir: Path, args) -> None:
+    """合成データを小さく絞って raw_dir に書く。"""
+    with tempfile.TemporaryDirectory() as tmp:
+        generate(Path(tmp), args.scale, args.seed)
+        tables = {
+            p.stem: pd.read_csv(p, dtype=str, keep_default_na=False)
+            for p in Path(tmp).glob("*.csv")
+        }
+
+    tables["circuits"] = tables["circuits"].iloc[: args.circuits]
+    races = tables["races"]
+    races = races[races["year"].astype(int) >= args.from_year].copy()
+    races["circuitId"] = ((races["circuitId"].astype(int) - 1) % args.circuits + 1).astype(str)
+    tables["races"] = races
+    for name in ["qualifying", "results", "lap_times"]:
+        df = tables[name]
+        tables[name] = df[df["raceId"].isin(races["raceId"])]
+    laps = tables["lap_times"]
+    tables["lap_times"] = laps[laps["lap"].astype(int) <= args.laps]
+
+    q = tables["qualifying"].copy()
+    for col in ["q1", "q2", "q3"]:
+        sub_minute = q[col].str.fullmatch(r"\d+\.\d+")
+        q.loc[sub_minute, col] = "0:" + q.loc[sub_minute, col]
+    tables["qualifying"] = q
+
+    codes = ("".join(c) for c in itertools.product(string.ascii_uppercase, repeat=3))
+    tables["drivers"]["code"] = list(itertools.islice(codes, len(tables["drivers"])))
+
+    shutil.rmtree(raw_dir, ignore_errors=True)
+    raw_dir.mkdir(parents=True)
+    for name, df in tables.items():
+        df.to_csv(raw_dir / f"{name}.csv", index=False)
+        print(f"  wrote raw/{name}.csv ({len(df)} rows)")
+
+
+def run_baseline(rev: str, raw_dir: Path, out_dir: Path) -> None:
+    """rev のスクリプトを raw_dir の CSV で実行し、出力を out_dir に集める。"""
+    shutil.rmtree(out_dir, ignore_errors=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        tree = Path(tmp)
+        shutil.copytree(raw_dir, tree / "public" / "data" / "f1-kaggle")
+        for script, (written, pattern, dest) in BASELINE_SCRIPTS.items():
+            path = tree / script
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(git("show", f"{rev}:{script}"), encoding="utf-8")
+            # build_all_circuits_json.py は作業ディレクトリからの相対パスで読み書きする
+            proc = subprocess.run(
+                [sys.executable, path.name], cwd=path.parent, capture_output=True, text=True
+            )
+            if proc.returncode != 0:
+                print(proc.stdout + proc.stderr)
+                raise RuntimeError(f"{script} が終了コード {proc.returncode} で失敗しました")
+
+            files = sorted((tree / written).glob(pattern))
+            (out_dir / dest).mkdir(parents=True, exist_ok=True)
+            for f in files:
+                shutil.copy2(f, out_dir / dest / f.name)
+            print(f"  {script}: {len(files)} files -> baseline/{dest}")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rev", help="baseline のコミット（省略時は最初のコミット）")
+    parser.add_argument("--scale", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--from-year", type=int, default=1990)
+    parser.add_argument("--circuits", type=int, default=4)
+    parser.add_argument("--laps", type=int, default=12)
+    parser.add_argument("--golden-dir", type=Path, default=GOLDEN_DIR)
+    args = parser.parse_args(argv)
+
+    rev = args.rev or git("rev-list", "--max-parents=0", "HEAD").split()[0]
+    print(f"baseline: {rev}")
+    make_raw(args.golden_dir / "raw", args)
+    run_baseline(rev, args.golden_dir / "raw", args.golden_dir / "baseline")
+
+
+if __name__ == "__main__":
+    main()
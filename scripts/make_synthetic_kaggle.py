@@ -0,0 +1,290 @@
+"""ベンチマーク用に、Kaggle F1 データセットと同じ形の合成 CSV を作る。
+
+    python scripts/make_synthetic_kaggle.py OUT_DIR [--scale 10] [--seed 0]
+
+races / drivers（と、それに比例して qualifying / results / lap_times）の件数を
+実データ（1950〜2024 年、約 1,100 レース・860 ドライバー・lap_times 約 60 万行）の
+--scale 倍にする。レース数はシーズンあたりのラウンド数を増やして調整する。
+
+列は本物と同じ（使わない列も含む）。タイムは実データと同じ書式の文字列
+（"1:27.452"、1 分未満のサーキットは "59.877"、赤旗などで 10 分超えの "10:02.345"）で、
+欠損は \\N、予選の未出走は空文字にする。ドライバーコードは同じコードを
+持つドライバーや code が \\N のドライバーも混ぜる。
+"""
+import argparse
+import string
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+FIRST_YEAR, LAST_YEAR = 1950, 2024
+BASE_ROUNDS = 15  # 1 シーズンあたり（実データは約 1,125 / 75）
+BASE_DRIVERS = 860
+N_CIRCUITS = 77
+N_CONSTRUCTORS = 212
+ENTRANTS = 22  # 1 レースの出走数
+QUALI_FROM, LAPS_FROM, FASTEST_FROM = 1994, 1996, 2004
+NA = r"\N"
+
+
+def fmt_times(ms: np.ndarray) -> np.ndarray:
+    """ミリ秒を Kaggle と同じ "M:SS.mmm" / "SS.mmm" 形式の文字列にする。"""
+    ms = ms.astype(np.int64)
+    minutes = ms // 60_000
+    sec = (ms % 60_000) // 1000
+    frac = ms % 1000
+    out = np.empty(len(ms), dtype=object)
+    for i, (m, s, f) in enumerate(zip(minutes.tolist(), sec.tolist(), frac.tolist())):
+        out[i] = f"{m}:{s:02d}.{f:03d}" if m else f"{s}.{f:03d}"
+    return out
+
+
+def make_circuits() -> pd.DataFrame:
+    ids = np.arange(1, N_CIRCUITS + 1)
+    refs = [f"circuit_{i}" for i in ids]
+    return pd.DataFrame(
+        {
+            "circuitId": ids,
+            "circuitRef": refs,
+            "name": [f"Synthetic Circuit {i}" for i in ids],
+            "location": "Somewhere",
+            "country": "Nowhere",
+            "lat": 0.0,
+            "lng": 0.0,
+            "alt": 10,
+            "url": [f"http://example.com/{r}" for r in refs],
+        }
+    )
+
+
+def make_races(rng, scale: float) -> pd.DataFrame:
+    rounds = max(1, round(BASE_ROUNDS * scale))
+    years = np.repeat(np.arange(FIRST_YEAR, LAST_YEAR + 1), rounds)
+    n = len(years)
+    round_no = np.tile(np.arange(1, rounds + 1), LAST_YEAR - FIRST_YEAR + 1)
+    df = pd.DataFrame(
+        {
+            "raceId": np.arange(1, n + 1),
+            "year": years,
+            "round": round_no,
+            "circuitId": rng.integers(1, N_CIRCUITS + 1, n),
+            "name": [f"Grand Prix {r}" for r in round_no],
+            "date": [f"{y}-06-01" for y in years],
+            "time": "12:00:00",
+            "url": "http://example.com/race",
+        }
+    )
+    for col in [
+        "fp1_date", "fp1_time", "fp2_date", "fp2_time", "fp3_date", "fp3_time",
+        "quali_date", "quali_time", "sprint_date", "sprint_time",
+    ]:
+        df[col] = NA
+    return df
+
+
+def make_drivers(rng, scale: float) -> pd.DataFrame:
+    n = max(ENTRANTS, round(BASE_DRIVERS * scale))
+    ids = np.arange(1, n + 1)
+    letters = np.array(list(string.ascii_uppercase))
+    # 3 文字の名字（先頭 3 文字がよく重なるよう、少ない語彙から作る）
+    stems = ["".join(rng.choice(letters[:12], 3)) for _ in range(max(50, n // 2))]
+    surname = [rng.choice(stems).capitalize() + "son" for _ in ids]
+    code = np.array([s[:3].upper() for s in surname], dtype=object)
+    # 古いドライバーは code が無い（\N）
+    code[rng.random(n) < 0.6] = NA
+    return pd.DataFrame(
+        {
+            "driverId": ids,
+            "driverRef": [f"driver_{i}" for i in ids],
+            "number": NA,
+            "code": code,
+            "forename": "Test",
+            "surname": surname,
+            "dob": "1980-01-01",
+            "nationality": "Synthetic",
+            "url": "http://example.com/driver",
+        }
+    )
+
+
+def make_constructors() -> pd.DataFrame:
+    ids = np.arange(1, N_CONSTRUCTORS + 1)
+    return pd.DataFrame(
+        {
+            "constructorId": ids,
+            "constructorRef": [f"team_{i}" for i in ids],
+            "name": [f"Team {i}" for i in ids],
+            "nationality": "Synthetic",
+            "url": "http://example.com/team",
+        }
+    )
+
+
+def make_entries(rng, races: pd.DataFrame, n_drivers: int) -> pd.DataFrame:
+    """レースごとの出走者（raceId, driverId, constructorId, 順位）。"""
+    # ドライバーごとに現役期間を決め、その年の現役から ENTRANTS 人を選ぶ
+    start = rng.integers(FIRST_YEAR, LAST_YEAR + 1, n_drivers)
+    length = rng.integers(1, 13, n_drivers)
+    team_of = rng.integers(1, N_CONSTRUCTORS + 1, n_drivers)
+
+    parts = []
+    for year, sub in races.groupby("year"):
+        active = np.flatnonzero((start <= year) & (year < start + length)) + 1
+        if len(active) < ENTRANTS:
+            active = np.concatenate([active, rng.choice(n_drivers, ENTRANTS, replace=False) + 1])
+            active = np.unique(active)
+        k = min(ENTRANTS, len(active))
+        picks = np.array([rng.choice(active, k, replace=False) for _ in range(len(sub))])
+        parts.append(
+            pd.DataFrame(
+                {
+                    "raceId": np.repeat(sub["raceId"].to_numpy(), k),
+                    "year": year,
+                    "circuitId": np.repeat(sub["circuitId"].to_numpy(), k),
+                    "driverId": picks.ravel(),
+                    "position": np.tile(np.arange(1, k + 1), len(sub)),
+                }
+            )
+        )
+    entries = pd.concat(parts, ignore_index=True)
+    entries["constructorId"] = team_of[entries["driverId"].to_numpy() - 1]
+    return entries
+
+
+def base_lap_ms(rng, entries: pd.DataFrame, circuit_base: np.ndarray) -> np.ndarray:
+    """サーキットの基準タイム + 年のトレンド + ドライバー差（ミリ秒）。"""
+    years_ago = LAST_YEAR - entries["year"].to_numpy()
+    return (
+        circuit_base[entries["circuitId"].to_numpy()]
+        + years_ago * 150
+        + entries["position"].to_numpy() * 120
+        + rng.integers(0, 800, len(entries))
+    )
+
+
+def make_qualifying(rng, entries: pd.DataFrame, circuit_base: np.ndarray) -> pd.DataFrame:
+    q = entries[entries["year"] >= QUALI_FROM].reset_index(drop=True)
+    base = base_lap_ms(rng, q, circuit_base)
+    pos = q["position"].to_numpy()
+    out = pd.DataFrame(
+        {
+            "qualifyId": np.arange(1, len(q) + 1),
+            "raceId": q["raceId"],
+            "driverId": q["driverId"],
+            "constructorId": q["constructorId"],
+            "number": pos,
+            "position": pos,
+        }
+    )
+    q1 = fmt_times(base + rng.integers(0, 600, len(q)))
+    q2 = fmt_times(base - rng.integers(0, 400, len(q)))
+    q3 = fmt_times(base - rng.integers(200, 800, len(q)))
+    # Q2 / Q3 はノックアウト方式（2006 年以降）。未出走は \N、記録なしは空文字
+    knockout = q["year"].to_numpy() >= 2006
+    q2[~knockout | (pos > 16)] = NA
+    q3[~knockout | (pos > 10)] = NA
+    q1[rng.random(len(q)) < 0.01] = ""
+    q1[rng.random(len(q)) < 0.005] = NA
+    out["q1"], out["q2"], out["q3"] = q1, q2, q3
+    return out
+
+
+def make_results(rng, entries: pd.DataFrame, circuit_base: np.ndarray) -> pd.DataFrame:
+    n = len(entries)
+    pos = entries["position"].to_numpy()
+    fastest = fmt_times(base_lap_ms(rng, entries, circuit_base) + rng.integers(500, 1500, n))
+    fastest[(entries["year"].to_numpy() < FASTEST_FROM) | (rng.random(n) < 0.08)] = NA
+    laps = rng.integers(45, 71, n)
+    return pd.DataFrame(
+        {
+            "resultId": np.arange(1, n + 1),
+            "raceId": entries["raceId"],
+            "driverId": entries["driverId"],
+            "constructorId": entries["constructorId"],
+            "number": pos,
+            "grid": pos,
+            "position": pos,
+            "positionText": pos.astype(str),
+            "positionOrder": pos,
+            "points": 0,
+            "laps": laps,
+            "time": NA,
+            "milliseconds": NA,
+            "fastestLap": NA,
+            "rank": NA,
+            "fastestLapTime": fastest,
+            "fastestLapSpeed": NA,
+            "statusId": 1,
+        }
+    )
+
+
+def make_lap_times(
+    rng, entries: pd.DataFrame, results: pd.DataFrame, circuit_base: np.ndarray
+) -> pd.DataFrame:
+    mask = (entries["year"] >= LAPS_FROM).to_numpy()
+    sub = entries[mask]
+    n_laps = results["laps"].to_numpy()[mask]
+    idx = np.repeat(np.arange(len(sub)), n_laps)
+    lap_no = np.arange(len(idx)) - np.repeat(np.cumsum(n_laps) - n_laps, n_laps) + 1
+
+    ms = base_lap_ms(rng, sub, circuit_base)[idx] + rng.integers(300, 4_000, len(idx))
+    # たまに赤旗・セーフティカーで極端に遅い周
+    slow = rng.random(len(idx)) < 0.0005
+    ms[slow] += rng.integers(60_000, 600_000, int(slow.sum()))
+
+    return pd.DataFrame(
+        {
+            "raceId": sub["raceId"].to_numpy()[idx],
+            "driverId": sub["driverId"].to_numpy()[idx],
+            "lap": lap_no,
+            "position": sub["position"].to_numpy()[idx],
+            "time": fmt_times(ms),
+            "milliseconds": ms,
+        }
+    )
+
+
+def generate(out_dir: Path, scale: float = 1.0, seed: int = 0) -> dict[str, int]:
+    """out_dir に合成 CSV を書き、{テーブル名: 行数} を返す。"""
+    rng = np.random.default_rng(seed)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    circuits = make_circuits()
+    races = make_races(rng, scale)
+    drivers = make_drivers(rng, scale)
+    constructors = make_constructors()
+    entries = make_entries(rng, races, len(drivers))
+    # サーキットごとの基準ラップ（1 分を切るサーキットも混ぜる）
+    circuit_base = rng.integers(55_000, 110_000, N_CIRCUITS + 1)
+    qualifying = make_qualifying(rng, entries, circuit_base)
+    results = make_results(rng, entries, circuit_base)
+    lap_times = make_lap_times(rng, entries, results, circuit_base)
+
+    tables = {
+        "circuits": circuits,
+        "races": races,
+        "drivers": drivers,
+        "constructors": constructors,
+        "qualifying": qualifying,
+        "results": results,
+        "lap_times": lap_times,
+    }
+    for name, df in tables.items():
+        df.to_csv(out_dir / f"{name}.csv", index=False)
+        print(f"  wrote {name}.csv ({len(df)} rows)")
+    return {name: len(df) for name, df in tables.items()}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    generate(args.out_dir, args.scale, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""静的 JSON の代わりに、同じ形のレスポンスを返すローカル API サーバー。
+
+    python scripts/serve_api.py [--port 8000] [--raw-dir ...] [--cache-size 1024]
+
+起動時に Kaggle CSV を 1 回だけ読み込み・集計し、あとはメモリ上の列から返す
+（エンドポイントとフィルターは laptrend/api.py を参照）。
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from laptrend import aggregate
+from laptrend.api import LapStore, make_server
+from laptrend.frames import build_frames
+from laptrend.load import CACHE_DIR, RAW_DIR, TABLES, load_tables
+
+
+def build_store(raw_dir: Path, cache_root: Path | None, cache_size: int) -> LapStore:
+    tables = load_tables(raw_dir, TABLES, cache_root)
+    frames = build_frames(tables)
+    del tables
+    return LapStore(
+        aggregate.driver_laps(frames),
+        aggregate.constructor_laps(frames),
+        frames,
+        cache_size,
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--raw-dir", type=Path, default=RAW_DIR)
+    parser.add_argument("--cache-dir", type=Path, default=CACHE_DIR)
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--cache-size", type=int, default=1024, help="LRU に持つレスポンス数")
+    parser.add_argument("--quiet", action="store_true", help="アクセスログを出さない")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        store = build_store(
+            args.raw_dir, None if args.no_cache else args.cache_dir, args.cache_size
+        )
+    except FileNotFoundError as e:
+        raise SystemExit(f"error: {e}") from None
+    server = make_server(store, args.host, args.port, args.quiet)
+    print(
+        f"\nServing {sum(len(v) for v in store.columns.values())} circuit files "
+        f"on http://{args.host}:{server.server_address[1]}/data/ "
+        f"(ready in {time.perf_counter() - start:.1f} s)"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())